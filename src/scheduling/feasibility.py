@@ -0,0 +1,135 @@
+'''
+Linear-time feasibility check of a solution.
+Returns the violated constraints instead of a single boolean.
+'''
+from typing import List, Optional
+
+
+class Violation(object):
+    '''
+    Constraint violated by a solution.
+    '''
+
+    UNASSIGNED = 'unassigned'
+    PRECEDENCE = 'precedence'
+    ASSIGNMENT = 'assignment'
+    OVERLAP = 'overlap'
+    SETUP = 'setup'
+    HORIZON = 'horizon'
+
+    def __init__(self, kind: str, message: str, operation_id: Optional[int]=None,
+                 machine_id: Optional[int]=None):
+        '''
+        Constructor
+        @param kind: type of constraint violated (one of the class constants)
+        @param message: human readable description
+        '''
+        self.kind: str = kind
+        self.message: str = message
+        self.operation_id: Optional[int] = operation_id
+        self.machine_id: Optional[int] = machine_id
+
+    def __str__(self):
+        return f"{self.kind}: {self.message}"
+
+    def __repr__(self):
+        return f"Violation({self})"
+
+
+def find_violations(solution, first_only: bool=False) -> List[Violation]:
+    '''
+    Returns the constraints violated by the solution, in O(n + m)
+    (n operations, m machine start/stop pairs).
+    The scheduled operations of each machine are expected to be ordered
+    by start time, as maintained by Machine.add_operation: an unordered
+    sequence is reported as an overlap.
+    @param first_only: stop at the first violation found
+    '''
+    violations: List[Violation] = []
+    inst = solution.inst
+
+    # Toutes les opérations doivent être planifiées
+    for op in inst.operations:
+        if not op.assigned:
+            violations.append(Violation(Violation.UNASSIGNED, f"O{op.operation_id} is not scheduled",
+                                        operation_id=op.operation_id))
+            if first_only:
+                return violations
+
+    # Précédence : une seule passe, chaque arc de précédence est parcouru une fois
+    for op in inst.operations:
+        if not op.assigned:
+            continue
+        start = op.start_time
+        for pred in op.predecessors:
+            pred_end = pred.end_time
+            if pred_end != -1 and start < pred_end:
+                violations.append(Violation(
+                    Violation.PRECEDENCE,
+                    f"O{op.operation_id} starts at {start} before the end of O{pred.operation_id} ({pred_end})",
+                    operation_id=op.operation_id))
+                if first_only:
+                    return violations
+
+    # Machines : chevauchements, fenêtres de démarrage/arrêt et horizon
+    for machine in inst.machines:
+        if _check_machine(machine, violations, first_only) and first_only:
+            return violations
+
+    return violations
+
+
+def _check_machine(machine, violations: List[Violation], first_only: bool) -> bool:
+    '''
+    Adds the violations on the machine to the list.
+    Returns True if a violation was found.
+    '''
+    found = False
+    machine_id = machine.machine_id
+    set_up_time = machine.set_up_time
+    tear_down_time = machine.tear_down_time
+    starts = machine.start_times
+    stops = machine.stop_times
+
+    if starts and (starts[0] < 0 or stops[-1] > machine.max_end_time):
+        violations.append(Violation(
+            Violation.HORIZON,
+            f"M{machine_id} runs outside of [0, {machine.max_end_time}]",
+            machine_id=machine_id))
+        if first_only:
+            return True
+        found = True
+
+    period = 0
+    nb_periods = len(starts)
+    previous_end = None
+    for op in machine.scheduled_operations:
+        op_start = op.start_time
+        op_end = op_start + op.processing_time
+
+        if op.assigned_to != machine_id:
+            violations.append(Violation(
+                Violation.ASSIGNMENT, f"O{op.operation_id} is in the plan of M{machine_id} but assigned elsewhere",
+                operation_id=op.operation_id, machine_id=machine_id))
+            found = True
+        if previous_end is not None and op_start < previous_end:
+            violations.append(Violation(
+                Violation.OVERLAP, f"O{op.operation_id} starts at {op_start} while M{machine_id} is busy",
+                operation_id=op.operation_id, machine_id=machine_id))
+            found = True
+        previous_end = op_end
+
+        # L'opération doit se trouver dans une période de marche, après le set up et avant le tear down
+        while period < nb_periods and stops[period] - tear_down_time < op_end:
+            period += 1
+        if period == nb_periods or op_start < starts[period] + set_up_time:
+            violations.append(Violation(
+                Violation.HORIZON if op_end + tear_down_time > machine.max_end_time else Violation.SETUP,
+                f"O{op.operation_id} [{op_start}, {op_end}] is outside of the running periods of M{machine_id}",
+                operation_id=op.operation_id, machine_id=machine_id))
+            found = True
+
+        if found and first_only:
+            return True
+
+    return found
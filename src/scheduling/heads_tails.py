@@ -0,0 +1,170 @@
+'''
+Heads (earliest start times) and tails of all the operations for a given
+machine sequencing, computed in one forward and one backward pass over a
+topological order of the job and machine arcs.
+
+The values are stored in arrays indexed by the position of the operations
+in instance.operations (see HeadsTails.position).
+It is an analysis tool for complete machine sequencings, reached through
+Solution.heads_tails(); no search uses it. The constructions and the
+neighbourhoods place one operation at a time and keep reading
+Operation.min_start_time, and the feasibility check (feasibility.py) reads
+the start times of the schedule.
+'''
+from array import array
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from src.scheduling.instance.instance import Instance
+
+
+class HeadsTails(object):
+    '''
+    Heads and tails of the operations of an instance.
+    The job arcs are precomputed once; compute() (or compute_solution())
+    then evaluates any machine sequencing in O(n + m).
+
+    For an operation i with duration p_i:
+      - heads[i]: earliest start time given the job predecessors, the previous
+        operation on its machine and the set up of the machine for the first one
+      - tails[i]: length of the longest path from the end of i to the end of the schedule
+    so that heads[i] + p_i + tails[i] == makespan for the critical operations.
+    '''
+
+    def __init__(self, instance: Instance):
+        '''
+        Constructor
+        @param instance: the instance, whose operations are not modified afterwards
+        '''
+        self._instance = instance
+        operations = instance.operations
+        n = len(operations)
+        self.position: Dict[int, int] = {op.operation_id: i for i, op in enumerate(operations)}
+        self._job_predecessors = [tuple(self.position[p.operation_id] for p in op.predecessors) for op in operations]
+        self._job_successors = [tuple(self.position[s.operation_id] for s in op.successors) for op in operations]
+        # Durées par défaut des opérations non affectées : leur durée minimale
+        self._min_durations = [instance.min_duration(op.operation_id) if op.get_machine_options() else 0
+                               for op in operations]
+
+        self.order = array('q', range(n))
+        self.heads = array('q', [0] * n)
+        self.tails = array('q', [0] * n)
+        self.durations = array('q', self._min_durations)
+        self.makespan: int = 0
+
+    def compute(self, sequences: Iterable[Tuple[int, Sequence[int]]],
+                durations: Optional[Dict[int, int]]=None) -> 'HeadsTails':
+        '''
+        Computes the heads and tails for a machine sequencing.
+        @param sequences: (machine_id, operation ids in processing order) for each machine
+        @param durations: operation id -> processing time of the assigned operations
+               (operations without duration count for their minimum duration)
+        @raise ValueError: if the sequencing contains a cycle
+        Returns self.
+        '''
+        n = len(self._min_durations)
+        position = self.position
+        dur = array('q', self._min_durations)
+        if durations:
+            for op_id, duration in durations.items():
+                dur[position[op_id]] = duration
+
+        # Arcs machine : opération précédente / suivante sur la même machine
+        machine_pred = [-1] * n
+        machine_succ = [-1] * n
+        ready = [0] * n
+        for machine_id, op_ids in sequences:
+            previous = -1
+            for op_id in op_ids:
+                i = position[op_id]
+                if previous < 0:
+                    # Première opération de la machine : après le set up
+                    ready[i] = self._instance.get_machine(machine_id).set_up_time
+                else:
+                    machine_pred[i] = previous
+                    machine_succ[previous] = i
+                previous = i
+
+        # Ordre topologique (Kahn)
+        job_preds = self._job_predecessors
+        job_succs = self._job_successors
+        indegree = [len(job_preds[i]) + (machine_pred[i] >= 0) for i in range(n)]
+        order = [i for i in range(n) if indegree[i] == 0]
+        k = 0
+        while k < len(order):
+            i = order[k]
+            k += 1
+            for j in job_succs[i]:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    order.append(j)
+            j = machine_succ[i]
+            if j >= 0:
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    order.append(j)
+        if len(order) < n:
+            raise ValueError("The machine sequencing contradicts the job precedences (cycle).")
+
+        # Passe avant : têtes
+        heads = ready
+        makespan = 0
+        for i in order:
+            head = heads[i]
+            for p in job_preds[i]:
+                end = heads[p] + dur[p]
+                if end > head:
+                    head = end
+            p = machine_pred[i]
+            if p >= 0 and heads[p] + dur[p] > head:
+                head = heads[p] + dur[p]
+            heads[i] = head
+            if head + dur[i] > makespan:
+                makespan = head + dur[i]
+
+        # Passe arrière : queues
+        tails = [0] * n
+        for i in reversed(order):
+            tail = 0
+            for s in job_succs[i]:
+                if dur[s] + tails[s] > tail:
+                    tail = dur[s] + tails[s]
+            s = machine_succ[i]
+            if s >= 0 and dur[s] + tails[s] > tail:
+                tail = dur[s] + tails[s]
+            tails[i] = tail
+
+        self.order = array('q', order)
+        self.heads = array('q', heads)
+        self.tails = array('q', tails)
+        self.durations = dur
+        self.makespan = makespan
+        return self
+
+    def compute_solution(self, solution) -> 'HeadsTails':
+        '''
+        Computes the heads and tails for the machine sequencing of a solution
+        (possibly partial) of the instance. Returns self.
+        '''
+        sequences = [(m.machine_id, [op.operation_id for op in m.scheduled_operations])
+                     for m in solution.inst.machines]
+        durations = {op.operation_id: op.processing_time for op in solution.inst.operations if op.assigned}
+        return self.compute(sequences, durations)
+
+    def head(self, operation_id: int) -> int:
+        '''
+        Returns the earliest start time of the operation
+        '''
+        return self.heads[self.position[operation_id]]
+
+    def tail(self, operation_id: int) -> int:
+        '''
+        Returns the length of the longest path after the end of the operation
+        '''
+        return self.tails[self.position[operation_id]]
+
+    def is_critical(self, operation_id: int) -> bool:
+        '''
+        Returns True if the operation is on a longest path of the sequencing
+        '''
+        i = self.position[operation_id]
+        return self.heads[i] + self.durations[i] + self.tails[i] == self.makespan
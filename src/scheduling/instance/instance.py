@@ -30,6 +30,14 @@ class Instance(object):
         self._job_map: Dict[int, Job] = {}
         self._operation_map: Dict[int, Operation] = {}
 
+        # Tables précalculées par opération (voir compute_lookup_tables), indexées par operation_id
+        self._min_duration: Dict[int, int] = {}
+        self._max_duration: Dict[int, int] = {}
+        self._min_energy: Dict[int, int] = {}
+        self._fastest_machine: Dict[int, int] = {}
+        self._lowest_energy_machine: Dict[int, int] = {}
+        self._tail_work: Dict[int, int] = {}
+
     @classmethod
     def from_file(cls, folderpath):
         inst = cls(os.path.basename(folderpath))
@@ -93,8 +101,48 @@ class Instance(object):
         inst._machines.sort(key=lambda m: m.machine_id)
         inst._operations.sort(key=lambda o: o.operation_id)
 
+        inst.compute_lookup_tables()
+
         return inst
 
+    def compute_lookup_tables(self):
+        '''
+        Precomputes the per-operation tables: minimum and maximum durations,
+        minimum energy, fastest and lowest-energy machines, and tail work
+        (sum of the minimum durations of the operation and of the following
+        operations of its job).
+        Done once by from_file. The accessors also build them when they miss an
+        operation (instance built or extended outside of from_file); to call again
+        if the machine options of existing operations are modified.
+        '''
+        self._min_duration = {}
+        self._max_duration = {}
+        self._min_energy = {}
+        self._fastest_machine = {}
+        self._lowest_energy_machine = {}
+        self._tail_work = {}
+
+        for op in self._operations:
+            options = op.get_machine_options()
+            if not options:
+                continue
+            op_id = op.operation_id
+            # En cas d'égalité sur le critère principal, on départage par l'autre critère puis par l'id de machine
+            fastest = min(options, key=lambda m_id: (options[m_id][0], options[m_id][1], m_id))
+            greenest = min(options, key=lambda m_id: (options[m_id][1], options[m_id][0], m_id))
+            self._fastest_machine[op_id] = fastest
+            self._lowest_energy_machine[op_id] = greenest
+            self._min_duration[op_id] = options[fastest][0]
+            self._min_energy[op_id] = options[greenest][1]
+            self._max_duration[op_id] = max(duration for duration, _ in options.values())
+
+        # Travail restant : parcours de chaque job à rebours
+        for job in self._jobs:
+            remaining = 0
+            for op in reversed(job.operations):
+                remaining += self._min_duration.get(op.operation_id, 0)
+                self._tail_work[op.operation_id] = remaining
+
     @property
     def name(self):
         return self._instance_name
@@ -134,3 +182,66 @@ class Instance(object):
 
     def get_operation(self, operation_id) -> Operation:
         return self._operation_map[operation_id]
+
+    def min_duration(self, operation_id) -> int:
+        '''
+        Returns the minimum processing time of the operation over its machines
+        '''
+        try:
+            return self._min_duration[operation_id]
+        except KeyError:
+            return self._refreshed('_min_duration', operation_id)
+
+    def max_duration(self, operation_id) -> int:
+        '''
+        Returns the maximum processing time of the operation over its machines
+        '''
+        try:
+            return self._max_duration[operation_id]
+        except KeyError:
+            return self._refreshed('_max_duration', operation_id)
+
+    def min_energy(self, operation_id) -> int:
+        '''
+        Returns the minimum energy consumption of the operation over its machines
+        '''
+        try:
+            return self._min_energy[operation_id]
+        except KeyError:
+            return self._refreshed('_min_energy', operation_id)
+
+    def fastest_machine(self, operation_id) -> int:
+        '''
+        Returns the id of the machine with the smallest processing time for the operation
+        '''
+        try:
+            return self._fastest_machine[operation_id]
+        except KeyError:
+            return self._refreshed('_fastest_machine', operation_id)
+
+    def lowest_energy_machine(self, operation_id) -> int:
+        '''
+        Returns the id of the machine with the smallest energy consumption for the operation
+        '''
+        try:
+            return self._lowest_energy_machine[operation_id]
+        except KeyError:
+            return self._refreshed('_lowest_energy_machine', operation_id)
+
+    def tail_work(self, operation_id) -> int:
+        '''
+        Returns the minimum remaining work of the job from the operation
+        (the operation included)
+        '''
+        try:
+            return self._tail_work[operation_id]
+        except KeyError:
+            return self._refreshed('_tail_work', operation_id)
+
+    def _refreshed(self, table: str, operation_id) -> int:
+        '''
+        Rebuilds the lookup tables after a miss and reads the table again
+        (KeyError if the operation is unknown or has no machine option).
+        '''
+        self.compute_lookup_tables()
+        return getattr(self, table)[operation_id]
@@ -3,7 +3,7 @@ Job. It is composed of several operations.
 
 @author: Vassilissa Lehoux
 '''
-from typing import List
+from typing import Dict, List
 
 from src.scheduling.instance.operation import Operation
 
@@ -20,6 +20,8 @@ class Job(object):
         '''
         self._job_id : int = job_id
         self._operations: List[Operation] = []
+        # Position de chaque opération dans le job, par identifiant
+        self._positions: Dict[int, int] = {}
         self._next_op_idx_to_schedule : int = 0
         
     @property
@@ -58,9 +60,31 @@ class Job(object):
     def schedule_operation(self):
         '''
         Updates the next_operation to schedule
+        (skipping the following operations that are still assigned after an unschedule_operation)
         '''
         if not self.planned:
             self._next_op_idx_to_schedule += 1
+            while not self.planned and self._operations[self._next_op_idx_to_schedule].assigned:
+                self._next_op_idx_to_schedule += 1
+
+    def unschedule_operation(self, operation: Operation):
+        '''
+        Updates the next_operation to schedule when an operation of the job
+        is removed from the schedule (in O(1)).
+        '''
+        position = self._positions[operation.operation_id]
+        if position < self._next_op_idx_to_schedule:
+            self._next_op_idx_to_schedule = position
+
+    def update_next_operation(self):
+        '''
+        Recomputes the next operation to schedule from the operations
+        that are already assigned (used when a schedule is loaded in bulk).
+        '''
+        idx = 0
+        while idx < self.operation_nb and self._operations[idx].assigned:
+            idx += 1
+        self._next_op_idx_to_schedule = idx
 
     @property
     def planned(self):
@@ -86,6 +110,7 @@ class Job(object):
             last_op.add_successor(operation)
             operation.add_predecessor(last_op)
 
+        self._positions[operation.operation_id] = len(self._operations)
         self._operations.append(operation)
 
     @property
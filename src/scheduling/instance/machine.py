@@ -3,10 +3,19 @@ Machine on which operation are executed.
 
 @author: Vassilissa Lehoux
 '''
-from typing import List
+from bisect import bisect_right, insort
+from typing import List, Optional, Tuple
 from src.scheduling.instance.operation import Operation
 
 
+def _start_time(operation: Operation) -> int:
+    return operation.start_time
+
+
+def _end_time(operation: Operation) -> int:
+    return operation.end_time
+
+
 class Machine(object):
     '''
     Machine class.
@@ -52,6 +61,33 @@ class Machine(object):
     def tear_down_time(self) -> int:
         return self._tear_down_time
 
+    @property
+    def set_up_energy(self) -> int:
+        return self._set_up_energy
+
+    @property
+    def tear_down_energy(self) -> int:
+        return self._tear_down_energy
+
+    @property
+    def min_consumption(self) -> int:
+        return self._min_consumption
+
+    @property
+    def max_end_time(self) -> int:
+        '''
+        Returns the end of the schedule on this machine: the machine must be
+        shut down before that time.
+        '''
+        return self._max_end_time
+
+    def fits_horizon(self, start_time: int, duration: int) -> bool:
+        '''
+        Returns True if an operation of this duration started at start_time ends early
+        enough for the machine to be torn down before its horizon (O(1)).
+        '''
+        return start_time + duration + self._tear_down_time <= self._max_end_time
+
     @property
     def machine_id(self) -> int:
         return self._machine_id
@@ -88,17 +124,184 @@ class Machine(object):
 
     def add_operation(self, operation: Operation, start_time: int) -> int:
         '''
-        Adds an operation on the machine, at the end of the schedule,
-        as soon as possible after time start_time.
+        Adds an operation on the machine, at its place in the schedule
+        (at the end, or in an idle gap found with find_gap).
         Returns the actual start time.
         '''
         # Note importante : toute la logique métier a été déporté dans l'ochestrateur à savoir
         # la méthode schedule qui se trouve dans solution.py
 
-        self._scheduled_operations.append(operation)
-        self._scheduled_operations.sort(key=lambda op: op.start_time) # On garde les opérations triées par ordre de démarrage
+        # On garde les opérations triées par ordre de démarrage
+        insort(self._scheduled_operations, operation, key=_start_time)
         return start_time
-  
+
+    def remove_operation(self, operation: Operation) -> int:
+        '''
+        Removes a scheduled operation from the machine (before resetting the operation:
+        it is found by its start time). The start and stop times are not modified.
+        Returns the position the operation had on the machine.
+        '''
+        ops = self._scheduled_operations
+        i = bisect_right(ops, operation.start_time, key=_start_time) - 1
+        # Plusieurs opérations peuvent commencer à la même date (opérations de durée nulle)
+        while i >= 0 and ops[i] is not operation:
+            i -= 1
+        if i < 0:
+            raise ValueError(f"{operation} is not scheduled on machine {self.machine_id}.")
+        del ops[i]
+        return i
+
+    def unschedule(self, operation: Operation) -> int:
+        '''
+        Removes a scheduled operation from the machine and resets it. The running
+        period of the operation is removed if it holds no other operation: a machine
+        left without operations is stopped.
+        The operation is found by bisection in O(log k), but the sequence is a list:
+        removing it shifts the operations after it, in O(k) (a memory move, no
+        Python loop).
+        Returns the position the operation had on the machine.
+        '''
+        start_time = operation.start_time
+        position = self.remove_operation(operation)
+        operation.reset()
+
+        starts, stops, ops = self._start_times, self._stop_times, self._scheduled_operations
+        period = bisect_right(starts, start_time) - 1
+        if 0 <= period < len(stops):
+            # Les opérations voisines sont les seules qui peuvent partager la période
+            used = ((position > 0 and ops[position - 1].start_time >= starts[period])
+                    or (position < len(ops) and ops[position].start_time < stops[period]))
+            if not used:
+                del starts[period]
+                del stops[period]
+        return position
+
+    def reinsert(self, operation: Operation, position: int):
+        '''
+        Inserts an operation already scheduled on this machine (Operation.schedule)
+        at the given position in the sequence, without searching it.
+        The machine must already be started for it.
+        The order is checked in O(1); the insertion in the list shifts the
+        operations after the position, in O(k).
+        '''
+        ops = self._scheduled_operations
+        if not 0 <= position <= len(ops):
+            raise ValueError(f"Position {position} out of the sequence of machine {self.machine_id}.")
+        if operation.assigned_to != self.machine_id:
+            raise ValueError(f"{operation} is not scheduled on machine {self.machine_id}.")
+        # L'ordre par date de début doit être conservé
+        if ((position > 0 and ops[position - 1].start_time > operation.start_time)
+                or (position < len(ops) and operation.start_time > ops[position].start_time)):
+            raise ValueError(f"{operation} does not start between the operations around position {position}.")
+        ops.insert(position, operation)
+
+    def find_gap(self, ready_time: int, duration: int) -> Optional[Tuple[int, int]]:
+        '''
+        Returns (position, start time) for the earliest idle gap before the last operation
+        of the machine in which an operation of the given duration, available at ready_time,
+        can be processed; None if there is none (the operation goes at the end).
+        Only the periods during which the machine is on are searched (after its set up):
+        starting the machine earlier would cost more idle energy than the gap saves.
+        One bisect finds the first gap ending after ready_time, then the gaps are scanned
+        in order: O(log k + g) for g gaps examined, O(k) in the worst case.
+        No gap tree is kept: the sequence is a sorted list, whose insertions already
+        cost O(k), and the scan stops after a couple of gaps on the instances of data/.
+        '''
+        ops = self._scheduled_operations
+        starts = self._start_times
+        if not starts:
+            return None
+        set_up_time = self._set_up_time
+        # Premier trou possible : celui qui précède la première opération finissant après ready_time
+        i = bisect_right(ops, ready_time, key=_end_time)
+        if i == len(ops):
+            return None
+        # Période de marche de l'opération suivante, avancée avec le parcours plutôt que recherchée à chaque trou
+        period = max(0, bisect_right(starts, ops[i].start_time) - 1)
+        last_period = len(starts) - 1
+        previous_end = ops[i - 1].end_time if i > 0 else None
+        while i < len(ops):
+            next_start = ops[i].start_time
+            while period < last_period and starts[period + 1] <= next_start:
+                period += 1
+            gap_start = starts[period] + set_up_time
+            if previous_end is not None and previous_end > gap_start:
+                gap_start = previous_end
+
+            start = max(gap_start, ready_time)
+            if start + duration <= next_start:
+                return i, start
+            previous_end = next_start + ops[i].processing_time
+            i += 1
+        return None
+
+    def _gap_start(self, position: int) -> int:
+        '''
+        Début du temps mort qui précède l'opération à cette position : fin de l'opération
+        précédente, ou fin du set up de la période de marche de l'opération.
+        '''
+        ops = self._scheduled_operations
+        period = max(0, bisect_right(self._start_times, ops[position].start_time) - 1)
+        gap_start = self._start_times[period] + self._set_up_time
+        if position > 0 and ops[position - 1].end_time > gap_start:
+            gap_start = ops[position - 1].end_time
+        return gap_start
+
+    def ready_time(self, position: int) -> int:
+        '''
+        Returns the earliest time at which an operation inserted at this position
+        in the sequence of the machine can start, given the operation before it
+        and the set up of the machine (available_time at the end of the sequence).
+        '''
+        if position >= len(self._scheduled_operations):
+            if not self._scheduled_operations and not self._start_times:
+                # Machine arrêtée : elle est démarrée juste à temps (voir Solution.schedule)
+                return self._set_up_time
+            return self.available_time
+        return self._gap_start(position)
+
+    def load(self, operations: List[Operation], start_times: List[int], stop_times: List[int]):
+        '''
+        Replaces the planning of the machine in one go.
+        @param operations: scheduled operations, ordered by start time
+        @param start_times: start times of the machine, in increasing order
+        @param stop_times: matching stop times, in increasing order
+        '''
+        self._scheduled_operations = list(operations)
+        self._start_times = list(start_times)
+        self._stop_times = list(stop_times)
+
+    def power_cycle_idle_gaps(self) -> int:
+        '''
+        Rebuilds the start and stop times from the scheduled operations, in O(k):
+        the machine is started just in time for its first operation, stopped right
+        after its last one, and stopped then restarted during each idle gap where
+        it saves energy (the gap holds a tear down and a set up, and its idle
+        energy exceeds their energies).
+        Returns the energy saved.
+        '''
+        energy_before = self.total_energy_consumption
+        ops = self._scheduled_operations
+        start_times: List[int] = []
+        stop_times: List[int] = []
+        if ops:
+            min_gap = self._tear_down_time + self._set_up_time
+            cycle_energy = self._tear_down_energy + self._set_up_energy
+            start_times.append(max(0, ops[0].start_time - self._set_up_time))
+            previous_end = ops[0].end_time
+            for op in ops[1:]:
+                gap = op.start_time - previous_end
+                # Arrêt puis redémarrage s'ils tiennent dans le trou et coûtent moins que la marche à vide
+                if gap >= min_gap and gap * self._min_consumption > cycle_energy:
+                    stop_times.append(previous_end + self._tear_down_time)
+                    start_times.append(op.start_time - self._set_up_time)
+                previous_end = max(previous_end, op.end_time)
+            stop_times.append(previous_end + self._tear_down_time)
+
+        self._start_times = start_times
+        self._stop_times = stop_times
+        return energy_before - self.total_energy_consumption
+
     def stop(self, at_time):
         """
         Stops the machine at time at_time.
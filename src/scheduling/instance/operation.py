@@ -186,14 +186,16 @@ class Operation(object):
         '''
         Minimum start time given the precedence constraints
         '''
-        if not self.predecessors:
-            return 0
-
-        predecessors_end_times = [p.end_time for p in self.predecessors]
-        if not all(t != -1 for t in predecessors_end_times):
-            return 0
-
-        return max(predecessors_end_times) if predecessors_end_times else 0
+        # Appelée à chaque planification : pas de liste intermédiaire
+        start = 0
+        for pred in self._predecessors:
+            info = pred._schedule_info
+            if info is None:
+                return 0
+            end = info.start_time + info.duration
+            if end > start:
+                start = end
+        return start
 
     def schedule_at_min_time(self, machine_id: int, min_time: int) -> bool:
         '''
@@ -0,0 +1,121 @@
+'''
+Optional instrumentation of the hot paths (solution evaluation, feasibility,
+scheduling, neighborhood exploration).
+
+Instrumentation is disabled by default: as long as no SearchStats is
+active, the only cost is one `is None` test per instrumented call.
+'''
+import functools
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class SearchStats(object):
+    '''
+    Counters collected during a search.
+    Timings are in seconds and inclusive (evaluate includes is_feasible).
+    '''
+
+    TIMED = ('evaluate', 'is_feasible', 'schedule')
+
+    def __init__(self):
+        '''
+        Constructor
+        '''
+        self.neighbors_generated: int = 0
+        self.neighbors_evaluated: int = 0
+        self.deepcopies: int = 0
+        self.improvements: int = 0
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.calls: Dict[str, int] = {name: 0 for name in self.TIMED}
+        self.times: Dict[str, float] = {name: 0.0 for name in self.TIMED}
+
+    @property
+    def schedules(self) -> int:
+        '''
+        Returns the number of operations committed with Solution.schedule
+        '''
+        return self.calls['schedule']
+
+    @property
+    def cache_hit_rate(self) -> float:
+        '''
+        Returns the proportion of neighbor evaluations answered by the evaluation cache
+        '''
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+    def record_time(self, name: str, elapsed: float):
+        '''
+        Adds a timed call to the counters.
+        '''
+        self.calls[name] += 1
+        self.times[name] += elapsed
+
+    def as_dict(self) -> Dict:
+        '''
+        Returns the counters as a flat dictionary (for logs or csv files).
+        '''
+        values = {
+            'neighbors_generated': self.neighbors_generated,
+            'neighbors_evaluated': self.neighbors_evaluated,
+            'deepcopies': self.deepcopies,
+            'improvements': self.improvements,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_rate': self.cache_hit_rate,
+        }
+        for name in self.TIMED:
+            values[f"{name}_calls"] = self.calls[name]
+            values[f"{name}_time_s"] = self.times[name]
+        return values
+
+    def __str__(self):
+        return " ".join(f"{key}={value:.4f}" if isinstance(value, float) else f"{key}={value}"
+                        for key, value in self.as_dict().items())
+
+
+# Compteurs actifs, None lorsque l'instrumentation est désactivée
+current: Optional[SearchStats] = None
+
+
+@contextmanager
+def collecting(stats: Optional[SearchStats]):
+    '''
+    Activates the given counters for the duration of the block.
+    With None, the currently active counters (if any) are kept.
+    '''
+    global current
+    if stats is None:
+        yield current
+        return
+
+    previous = current
+    current = stats
+    try:
+        yield stats
+    finally:
+        current = previous
+
+
+def timed(name: str):
+    '''
+    Decorator counting the calls and the time spent in a function
+    when instrumentation is active.
+    '''
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stats = current
+            if stats is None:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.record_time(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -0,0 +1,66 @@
+'''
+Registry of the available algorithms, by name.
+The names are the ones written in results.csv by script_compare_algos.
+'''
+from typing import Callable, Dict, List
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.constructive import Greedy, NonDeterminist
+from src.scheduling.optim.local_search import FirstNeighborLocalSearch, BestNeighborLocalSearch
+from src.scheduling.optim.neighborhoods import MyNeighborhood1, MyNeighborhood2
+from src.scheduling.optim.grasp import Grasp
+from src.scheduling.optim.beam_search import BeamSearch
+from src.scheduling.optim.exact import ExactSolver
+
+
+def _constructive(HeuristicClass) -> Callable:
+    def run(instance: Instance, params: Dict) -> Solution:
+        return HeuristicClass().run(instance, params)
+    return run
+
+
+def _local_search(SearchClass, NeighborClass) -> Callable:
+    def run(instance: Instance, params: Dict) -> Solution:
+        return SearchClass().run(instance, NonDeterminist, NeighborClass, params)
+    return run
+
+
+def _grasp(NeighborClass) -> Callable:
+    def run(instance: Instance, params: Dict) -> Solution:
+        return Grasp().run(instance, NeighborClass, params)
+    return run
+
+
+# Nom -> fonction (instance, params) -> solution
+ALGORITHMS: Dict[str, Callable] = {
+    'glouton': _constructive(Greedy),
+    'non_deterministe': _constructive(NonDeterminist),
+    'beam_search': _constructive(BeamSearch),
+    'exact': _constructive(ExactSolver),
+    'local_search_voisinage1': _local_search(FirstNeighborLocalSearch, MyNeighborhood1),
+    'local_search_voisinage2': _local_search(FirstNeighborLocalSearch, MyNeighborhood2),
+    'best_local_search_voisinage1': _local_search(BestNeighborLocalSearch, MyNeighborhood1),
+    'best_local_search_voisinage2': _local_search(BestNeighborLocalSearch, MyNeighborhood2),
+    'grasp_voisinage1': _grasp(MyNeighborhood1),
+    'grasp_voisinage2': _grasp(MyNeighborhood2),
+}
+
+
+def algorithm_names() -> List[str]:
+    '''
+    Returns the names of the registered algorithms.
+    '''
+    return list(ALGORITHMS)
+
+
+def run_algorithm(name: str, instance: Instance, params: Dict=dict()) -> Solution:
+    '''
+    Runs the algorithm registered under the given name on the instance.
+    Parameters that an algorithm does not use are ignored (e.g. time_limit for the greedy).
+    '''
+    try:
+        algorithm = ALGORITHMS[name]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm '{name}', expected one of {algorithm_names()}") from None
+    return algorithm(instance, dict(params))
@@ -0,0 +1,302 @@
+'''
+Beam search over the partial schedules of the list scheduling used by the
+constructive heuristics: instead of one greedy choice per step, the B best
+partial schedules are kept and extended at each step.
+'''
+from typing import Dict, List, Optional, Tuple
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution, APPEND
+from src.scheduling.optim.heuristics import Heuristic
+
+
+class _PartialSchedule(object):
+    '''
+    Partial schedule of the beam, in the append decoding: only what the next
+    decisions and the score depend on, in tuples indexed by job and machine position.
+    The decisions are stored as a chain of parent pointers, so that extending a state
+    copies O(jobs + machines) values instead of the whole instance.
+    '''
+
+    __slots__ = ('parent', 'decision', 'next_ops', 'job_ready', 'machine_ready', 'energy', 'remaining_energy',
+                 'job_bound', 'sum_ci_bound', 'machine_sum', 'remaining_work', 'late', 'score')
+
+    def __init__(self, parent, decision, next_ops, job_ready, machine_ready, energy, remaining_energy,
+                 job_bound, sum_ci_bound, machine_sum, remaining_work, late, score):
+        self.parent: Optional['_PartialSchedule'] = parent
+        # (position de l'opération, position de la machine), None pour l'état vide
+        self.decision: Optional[Tuple[int, int]] = decision
+        self.next_ops: Tuple[int, ...] = next_ops
+        self.job_ready: Tuple[int, ...] = job_ready
+        # -1 si la machine n'est pas encore démarrée
+        self.machine_ready: Tuple[int, ...] = machine_ready
+        self.energy: int = energy
+        self.remaining_energy: int = remaining_energy
+        self.job_bound: int = job_bound
+        self.sum_ci_bound: int = sum_ci_bound
+        # Somme des dates de disponibilité des machines et travail minimal restant (borne machine du cmax)
+        self.machine_sum: int = machine_sum
+        self.remaining_work: int = remaining_work
+        # Nombre d'opérations qui finissent trop tard pour arrêter leur machine avant son horizon
+        self.late: int = late
+        self.score = score
+
+    def decisions(self) -> List[Tuple[int, int]]:
+        '''
+        Returns the decisions from the empty schedule to this one.
+        '''
+        decisions = []
+        state = self
+        while state.decision is not None:
+            decisions.append(state.decision)
+            state = state.parent
+        decisions.reverse()
+        return decisions
+
+    def key(self):
+        '''
+        Identifies the states reached by the same decisions in another order.
+        '''
+        return (self.next_ops, self.job_ready, self.machine_ready, self.energy)
+
+
+class ListSchedulingModel(object):
+    '''
+    Tables of an instance for the list scheduling in the append decoding, to extend
+    and score partial schedules (_PartialSchedule) without touching the instance.
+
+    The score of a partial schedule is the current cost plus lower bounds on the rest,
+    weighted by the objective weights:
+      - cmax: max over the jobs of the end of their last scheduled operation plus
+        the minimum duration of their remaining operations (see Instance.tail_work),
+        and at least the minimum remaining work spread over the machines after their
+        availability dates
+      - sum_ci: sum of these job bounds
+      - energy: the energy spent so far (operations, set up and tear down of the started
+        machines, idle time between their operations at the minimum consumption, as if
+        the machines were stopped after their last operation) plus the minimum energy
+        of the remaining operations
+    It is a lower bound of the objective of all the complete schedules of the
+    list scheduling that extend the partial schedule.
+    '''
+
+    def __init__(self, instance: Instance, weights: Dict, power_cycles: bool=False):
+        '''
+        Constructor
+        @param weights: weights of the objective components (all of them, see Solution.weights)
+        @param power_cycles: True if the machines will be turned off during the idle gaps
+               (final_objective then ignores the idle time until the horizons)
+        '''
+        self.operations = instance.operations
+        self.machines = instance.machines
+        self._w_energy, self._w_cmax, self._w_sum_ci = weights['energy'], weights['cmax'], weights['sum_ci']
+        self._power_cycles = power_cycles
+
+        # Tables par position : opérations, machines et jobs de l'instance
+        machines = self.machines
+        operations = self.operations
+        self._nb_machines = len(machines)
+        machine_pos = {m.machine_id: i for i, m in enumerate(machines)}
+        op_pos = {op.operation_id: i for i, op in enumerate(operations)}
+        self._job_ops = [[op_pos[op.operation_id] for op in job.operations] for job in instance.jobs]
+        self._set_up_time = [m.set_up_time for m in machines]
+        self._tear_down_time = [m.tear_down_time for m in machines]
+        self._horizon = [m.max_end_time for m in machines]
+        self._min_consumption = [m.min_consumption for m in machines]
+        self._switch_energy = [m.set_up_energy + m.tear_down_energy for m in machines]
+        self._options = [[(machine_pos[m_id], duration, energy)
+                          for m_id, (duration, energy) in op.get_machine_options().items()]
+                         for op in operations]
+        self._min_duration = [min((d for _, d, _ in opts), default=0) for opts in self._options]
+        self._min_energy = [min((e for _, _, e in opts), default=0) for opts in self._options]
+        self._tail_work = [instance.tail_work(op.operation_id) if self._options[i] else 0
+                           for i, op in enumerate(operations)]
+
+        # Date de fin au plus tard de chaque opération pour que la suite du job tienne avant
+        # les horizons des machines (avec les durées minimales) : au-delà, l'état est en retard
+        self._latest_end = [0] * len(operations)
+        for ops in self._job_ops:
+            deadline = float('inf')
+            for i in reversed(ops):
+                self._latest_end[i] = min(deadline, max((self._horizon[m] - self._tear_down_time[m]
+                                                         for m, _, _ in self._options[i]), default=0))
+                deadline = self._latest_end[i] - self._min_duration[i]
+
+    def _score(self, state_energy, remaining_energy, job_bound, sum_ci_bound, machine_sum, remaining_work):
+        # Borne machine : le travail restant réparti au mieux après les dates de disponibilité
+        cmax_bound = max(job_bound, -(-(machine_sum + remaining_work) // self._nb_machines))
+        return (self._w_energy * (state_energy + remaining_energy) + self._w_cmax * cmax_bound
+                + self._w_sum_ci * sum_ci_bound)
+
+    def root(self) -> _PartialSchedule:
+        '''
+        Returns the empty schedule.
+        '''
+        job_bounds = [self._tail_work[ops[0]] if ops else 0 for ops in self._job_ops]
+        values = (0, sum(self._min_energy), max(job_bounds, default=0), sum(job_bounds),
+                  sum(self._set_up_time), sum(self._min_duration))
+        return _PartialSchedule(None, None, tuple(0 for _ in self._job_ops), tuple(0 for _ in self._job_ops),
+                                tuple(-1 for _ in self.machines), *values, 0, self._score(*values))
+
+    def extensions(self, state: _PartialSchedule, extensions: List):
+        '''
+        Appends to extensions the (late, score, order, state, job, operation, machine, end, values)
+        of every child of the state, without creating the children (see child).
+        late is the number of operations of the child that end too late for the horizon
+        of their machine or for the rest of their job: such a schedule is not feasible.
+        '''
+        options = self._options
+        set_up_time = self._set_up_time
+        min_consumption = self._min_consumption
+        for j, ops in enumerate(self._job_ops):
+            k = state.next_ops[j]
+            if k >= len(ops):
+                continue
+            i = ops[k]
+            ready = state.job_ready[j]
+            next_tail = self._tail_work[ops[k + 1]] if k + 1 < len(ops) else 0
+            old_bound = ready + self._tail_work[i]
+            remaining_energy = state.remaining_energy - self._min_energy[i]
+            remaining_work = state.remaining_work - self._min_duration[i]
+            for m, duration, energy in options[i]:
+                machine_ready = state.machine_ready[m]
+                if machine_ready < 0:
+                    start = max(ready, set_up_time[m])
+                    energy += self._switch_energy[m]
+                    machine_sum = state.machine_sum - set_up_time[m]
+                else:
+                    start = max(ready, machine_ready)
+                    energy += (start - machine_ready) * min_consumption[m]
+                    machine_sum = state.machine_sum - machine_ready
+                end = start + duration
+                machine_sum += end
+                # La borne du job ne peut qu'augmenter : le max se met à jour en O(1)
+                values = (state.energy + energy, remaining_energy, max(state.job_bound, end + next_tail),
+                          state.sum_ci_bound - old_bound + end + next_tail, machine_sum, remaining_work)
+                late = state.late + (end + self._tear_down_time[m] > self._horizon[m] or end > self._latest_end[i])
+                extensions.append((late, self._score(*values), len(extensions), state, j, i, m, end, values))
+        return extensions
+
+    @staticmethod
+    def child(extension) -> _PartialSchedule:
+        '''
+        Creates the child described by an extension.
+        '''
+        late, score, _, state, j, i, m, end, values = extension
+        next_ops = list(state.next_ops)
+        next_ops[j] += 1
+        job_ready = list(state.job_ready)
+        job_ready[j] = end
+        machine_ready = list(state.machine_ready)
+        machine_ready[m] = end
+        return _PartialSchedule(state, (i, m), tuple(next_ops), tuple(job_ready), tuple(machine_ready),
+                                *values, late, score)
+
+    def is_complete(self, state: _PartialSchedule) -> bool:
+        '''
+        Returns True if all the operations are scheduled in the state.
+        '''
+        return all(k == len(ops) for k, ops in zip(state.next_ops, self._job_ops))
+
+    def final_objective(self, state: _PartialSchedule):
+        '''
+        Returns the objective of a complete schedule: its value once evaluated by Solution
+        if it is feasible, an upper bound of it with power cycles.
+        '''
+        # Sans arrêt des machines, elles tournent à vide de leur dernière opération
+        # jusqu'à leur tear down avant l'horizon
+        energy = state.energy
+        if not self._power_cycles:
+            energy += sum((self._horizon[m] - self._tear_down_time[m] - ready) * self._min_consumption[m]
+                          for m, ready in enumerate(state.machine_ready) if ready >= 0)
+        return (self._w_energy * energy + self._w_cmax * max(state.job_ready, default=0)
+                + self._w_sum_ci * sum(state.job_ready))
+
+    def replay(self, solution: Solution, state: _PartialSchedule):
+        '''
+        Schedules the decisions of the state on the (empty) solution with Solution.schedule.
+        '''
+        decoding = solution.decoding
+        solution.decoding = APPEND
+        for i, m in state.decisions():
+            solution.schedule(self.operations[i], self.machines[m])
+        solution.decoding = decoding
+
+
+class BeamSearch(Heuristic):
+    '''
+    Deterministic beam search constructive heuristic.
+
+    At each step every partial schedule of the beam is extended with every
+    (next operation of a job, machine option) pair, the operation being placed at
+    the end of the machine as Solution.schedule does in the append decoding.
+    The beam_width best extensions (duplicates removed) are kept: first those with
+    the fewest operations ending too late for the horizon of their machine or for
+    the rest of their job, then by their lower-bound-plus-current-cost score
+    (see ListSchedulingModel).
+    The complete schedule of the final beam with the best exact objective (idle time
+    until the horizons included when power_cycles is off) is then replayed on the
+    instance with Solution.schedule.
+    The cost is bounded: O(n * beam_width * jobs * machines) score evaluations.
+
+    Parameters (in params):
+      - beam_width: number of partial schedules kept at each step (8 by default, 1 for a greedy)
+      - weights: weights of the objective components (see Solution.weights)
+      - decoding: decoding of the returned solution for later moves (see Solution.decoding);
+        the beam itself always appends the operations
+      - power_cycles: if True, machines are turned off during long idle gaps when
+        the solution is evaluated (see Solution.optimize_power_cycles). False by default.
+      - archive: ParetoArchive to which the solution is proposed
+    '''
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+
+    def run(self, instance: Instance, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+        Implementation should provide default values in the function
+        (the function will be evaluated with an empty dictionary).
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run
+        '''
+        beam_width = max(1, self._param(params, 'beam_width', 8))
+        solution = self._new_solution(instance, params)
+        model = ListSchedulingModel(instance, solution.weights, solution.power_cycles)
+
+        beam = [model.root()]
+        for _ in range(len(instance.operations)):
+            extensions = []
+            for state in beam:
+                model.extensions(state, extensions)
+            if not extensions:
+                break
+            # Les extensions sans retard d'abord, puis par score
+            extensions.sort(key=lambda e: e[:3])
+
+            new_beam = []
+            seen = set()
+            for extension in extensions:
+                child = model.child(extension)
+                key = child.key()
+                if key in seen:
+                    continue
+                seen.add(key)
+                new_beam.append(child)
+                if len(new_beam) >= beam_width:
+                    break
+            beam = new_beam
+
+        # Rejeu du meilleur état complet sur l'instance
+        model.replay(solution, min(beam, key=lambda state: (state.late, model.final_objective(state))))
+
+        if solution.available_operations:
+            raise RuntimeError("Aucune machine trouvée pour les opérations disponibles")
+        self._feed_archive(params, solution)
+        return solution
@@ -4,7 +4,6 @@ Constructive heuristics that returns preferably **feasible** solutions.
 @author: Vassilissa Lehoux
 '''
 from typing import Dict
-import random
 
 from src.scheduling.instance.instance import Instance
 from src.scheduling.solution import Solution
@@ -14,6 +13,14 @@ from src.scheduling.optim.heuristics import Heuristic
 class Greedy(Heuristic):
     '''
     A deterministic greedy method to return a solution.
+
+    Parameters (in params):
+      - weights: weights of the objective components (see Solution.weights)
+      - decoding: 'append' (default) to place each operation at the end of its machine,
+        'active' to place it in the earliest idle gap where it fits (see Solution.decoding)
+      - power_cycles: if True, machines are turned off during long idle gaps when
+        the solution is evaluated (see Solution.optimize_power_cycles). False by default.
+      - archive: ParetoArchive to which the solution is proposed
     '''
 
     def __init__(self, params: Dict=dict()):
@@ -36,13 +43,25 @@ class Greedy(Heuristic):
         # Stratégie de sélection déterministe : trier par ID et prendre la première.
         deterministic_selection = lambda ops: sorted(ops, key=lambda o: o.operation_id)[0]
 
-        return self._construct_solution(instance, deterministic_selection)
+        solution = self._construct_solution(instance, deterministic_selection, params)
+        self._feed_archive(params, solution)
+        return solution
 
 
 class NonDeterminist(Heuristic):
     '''
     Heuristic that returns different values for different runs with the same parameters
     (or different values for different seeds and otherwise same parameters)
+
+    Parameters (in params):
+      - rng: random.Random used for the choices, or seed: seed of a new generator
+        (seeded from the global random module by default)
+      - weights: weights of the objective components (see Solution.weights)
+      - decoding: 'append' (default) to place each operation at the end of its machine,
+        'active' to place it in the earliest idle gap where it fits (see Solution.decoding)
+      - power_cycles: if True, machines are turned off during long idle gaps when
+        the solution is evaluated (see Solution.optimize_power_cycles). False by default.
+      - archive: ParetoArchive to which the solution is proposed
     '''
 
     def __init__(self, params: Dict=dict()):
@@ -64,9 +83,106 @@ class NonDeterminist(Heuristic):
         '''
         # Initialisation de la solution
         # Stratégie de sélection non-déterministe : choisir au hasard.
-        random_selection = lambda ops: random.choice(ops)
+        rng = self._make_rng(params)
+        random_selection = lambda ops: rng.choice(ops)
+
+        solution = self._construct_solution(instance, random_selection, params)
+        self._feed_archive(params, solution)
+        return solution
+
+
+class GraspConstruction(Heuristic):
+    '''
+    Randomized greedy construction of GRASP: at each step, every (available operation,
+    machine option) pair is scored, and the pair scheduled is drawn at random in
+    the restricted candidate list (RCL) of the pairs whose score is at most
+    min + alpha * (max - min).
+    With alpha = 0 only the best pairs are drawn, with alpha = 1 any pair can be.
+
+    The pairs where the operation would end too late for the horizon of the machine
+    (see Machine.fits_horizon) are left out, unless no pair fits.
+    The score of a pair weighs, with the objective weights of the solution, its
+    completion time (cmax and sum_ci weights) and an estimate of its energy increment
+    (energy weight): the energy of the operation, plus the set up and tear down
+    energies for an unused machine, or the idle time before the operation
+    at the minimum consumption for a machine already used.
+
+    Parameters (in params):
+      - alpha: greediness of the RCL, between 0 and 1 (0.2 by default)
+      - rng: random.Random used for the choices, or seed: seed of a new generator
+        (seeded from the global random module by default)
+      - weights: weights of the objective components (see Solution.weights)
+      - decoding: 'append' (default) to place each operation at the end of its machine,
+        'active' to place it in the earliest idle gap where it fits (see Solution.decoding)
+      - power_cycles: if True, machines are turned off during long idle gaps when
+        the solution is evaluated (see Solution.optimize_power_cycles). False by default.
+      - archive: ParetoArchive to which the solution is proposed
+    '''
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
 
-        return self._construct_solution(instance, random_selection)
+    def run(self, instance: Instance, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+        Implementation should provide default values in the function
+        (the function will be evaluated with an empty dictionary).
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run
+        '''
+        alpha = self._param(params, 'alpha', 0.2)
+        if not 0 <= alpha <= 1:
+            raise ValueError(f"alpha must be between 0 and 1, got {alpha}")
+        rng = self._make_rng(params)
+
+        solution = self._new_solution(instance, params)
+        decoding = solution.decoding
+        weights = solution.weights
+        w_time = weights['cmax'] + weights['sum_ci']
+        w_energy = weights['energy']
+
+        while solution.available_operations:
+            candidates = self._candidates(instance, solution.available_operations, decoding, w_time, w_energy)
+            if not candidates:
+                raise RuntimeError("Aucune machine trouvée pour les opérations disponibles")
+
+            # Liste restreinte : les paires dont le score est proche du meilleur
+            scores = [score for score, _, _ in candidates]
+            threshold = min(scores) + alpha * (max(scores) - min(scores))
+            rcl = [(op, machine) for score, op, machine in candidates if score <= threshold]
+            op, machine = rng.choice(rcl)
+            solution.schedule(op, machine)
+
+        self._feed_archive(params, solution)
+        return solution
+
+    def _candidates(self, instance: Instance, operations, decoding: str, w_time, w_energy):
+        '''
+        Retourne les paires (score, opération, machine) des opérations disponibles,
+        en se limitant à celles qui finissent avant l'horizon de la machine s'il y en a.
+        '''
+        candidates = []
+        for op in operations:
+            pred_ready_time = op.min_start_time
+            for machine_id, (duration, energy) in op.get_machine_options().items():
+                machine = instance.get_machine(machine_id)
+                start_time = self._start_time(machine, duration, pred_ready_time, decoding)
+                if not machine.scheduled_operations:
+                    energy += machine.set_up_energy + machine.tear_down_energy
+                elif start_time >= machine.available_time:
+                    # Temps mort créé avant l'opération (aucun dans un trou existant)
+                    energy += (start_time - machine.available_time) * machine.min_consumption
+                candidates.append((w_time * (start_time + duration) + w_energy * energy, op, machine,
+                                   machine.fits_horizon(start_time, duration)))
+        # Les paires qui dépassent l'horizon ne sont gardées que si aucune autre n'est possible
+        fitting = [candidate for candidate in candidates if candidate[3]]
+        return [candidate[:3] for candidate in (fitting or candidates)]
 
 
 if __name__ == "__main__":
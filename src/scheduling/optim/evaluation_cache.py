@@ -0,0 +1,78 @@
+'''
+Bounded cache of the objective components of already evaluated solutions,
+indexed by their schedule.
+'''
+from collections import OrderedDict
+from typing import Tuple
+
+from src.scheduling.solution import Solution
+
+
+class EvaluationCache(object):
+    '''
+    LRU cache schedule -> objective components (energy, cmax, sum_ci).
+    The schedule is identified by the instance, the fingerprint (machine assignment and
+    order), the start times of the operations and of the machines, and power_cycles.
+    The components are re-weighted with the weights of the solution looked up, so the
+    cache can be shared by searches with different weights.
+    '''
+
+    def __init__(self, max_size: int=10000):
+        '''
+        Constructor
+        @param max_size: maximum number of objective values kept
+        '''
+        self._max_size = max(1, max_size)
+        self._values: OrderedDict = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, solution: Solution):
+        return self.key(solution) in self._values
+
+    @staticmethod
+    def key(solution: Solution) -> Tuple:
+        '''
+        Returns the key of the schedule of the solution, computed in O(n + machine periods).
+        '''
+        machines = tuple((tuple(m.start_times), tuple(m.stop_times)) for m in solution.inst.machines)
+        starts = tuple(op.start_time for op in solution.all_operations)
+        return (solution.inst.name, solution.fingerprint, hash((starts, machines)), solution.power_cycles)
+
+    def objective(self, solution: Solution):
+        '''
+        Returns the objective value of the solution, from the cache if the same
+        schedule was already evaluated, by evaluating it otherwise.
+        '''
+        # La clé est calculée avant l'évaluation, qui peut modifier les arrêts des machines (power_cycles)
+        key = self.key(solution)
+        if key in self._values:
+            self.hits += 1
+            self._values.move_to_end(key)
+            components = self._values[key]
+            # Planning non faisable : pas de composantes
+            if components is None:
+                return float('inf')
+            weights = solution.weights
+            return int(sum(weights[name] * value for name, value in components.items()))
+
+        self.misses += 1
+        value = solution.objective
+        self._values[key] = solution.components
+        if len(self._values) > self._max_size:
+            self._values.popitem(last=False)
+        return value
+
+    @property
+    def hit_rate(self) -> float:
+        '''
+        Returns the proportion of lookups answered by the cache
+        '''
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self):
+        return f"EvaluationCache(size={len(self)}, hits={self.hits}, misses={self.misses}, hit_rate={self.hit_rate:.2%})"
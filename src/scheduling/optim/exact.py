@@ -0,0 +1,265 @@
+'''
+Exact solving of small instances under a time limit, to get reference optima:
+with the CP-SAT solver of OR-Tools when it is installed, with a built-in branch
+and bound over the list schedules otherwise.
+The returned solution tells whether it is proven optimal, and its optimality gap.
+'''
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.heuristics import Heuristic
+from src.scheduling.optim.beam_search import BeamSearch, ListSchedulingModel
+from src.scheduling.optim.lower_bounds import LowerBounds
+
+BACKENDS = ('auto', 'cp_sat', 'branch_and_bound')
+
+
+def cp_sat_available() -> bool:
+    '''
+    Returns True if the CP-SAT solver of OR-Tools can be imported.
+    '''
+    try:
+        from ortools.sat.python import cp_model  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ExactSolver(Heuristic):
+    '''
+    Exact solver for small instances, stopped at a time limit.
+
+    Backends:
+      - cp_sat: model of the schedules where each machine runs in one period, from the
+        set up before its first operation to its horizon (the schedules of Solution.schedule
+        and load_schedule without power cycles); the operations can start at any time.
+      - branch_and_bound: depth-first search over the list schedules (each operation
+        appended at the end of its machine as early as possible, see ListSchedulingModel),
+        pruned by the lower-bound-plus-current-cost scores and by dominance between
+        partial schedules reached in different orders.
+    Both start from the solution of a beam search (or the given initial_solution).
+
+    Parameters (in params):
+      - backend: 'cp_sat', 'branch_and_bound' or 'auto' (default: cp_sat if OR-Tools is installed)
+      - time_limit: maximum duration of the search in seconds (10 by default)
+      - workers: number of search workers of CP-SAT (1 by default, for reproducible runs)
+      - initial_solution: first incumbent, a solution of the instance (BeamSearch by default)
+      - weights: weights of the objective components (see Solution.weights)
+      - power_cycles: if True, the machines are turned off during long idle gaps when the
+        solution is evaluated (see Solution.optimize_power_cycles). The models do not
+        include it: only LowerBounds is then used as lower bound. False by default.
+
+    The returned solution has the attributes:
+      - lower_bound: lower bound of the objective, the one of LowerBounds raised by the
+        bound of CP-SAT. The branch and bound only covers the list schedules, whose
+        machines run from the start of the search to their horizon: its bound is no
+        bound on the other schedules and is left out.
+      - optimal: True if the objective reaches lower_bound
+      - gap: relative optimality gap (objective - lower_bound) / objective
+      - backend_bound: lower bound proved by the backend over its own schedules
+      - backend_optimal: True if the objective reaches backend_bound, i.e. no schedule
+        of the backend is better (for the branch and bound: no list schedule)
+    Without feasible schedule, optimal and backend_optimal are False and gap is infinite;
+    backend_bound is then infinite if the backend proved that none of its schedules is
+    feasible, and so is lower_bound for CP-SAT.
+    '''
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+
+    def run(self, instance: Instance, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run
+        '''
+        start_time = time.perf_counter()
+        backend = self._param(params, 'backend', 'auto')
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        if backend == 'auto':
+            backend = 'cp_sat' if cp_sat_available() else 'branch_and_bound'
+        time_limit = self._param(params, 'time_limit', 10)
+        deadline = start_time + time_limit
+
+        initial = self._param(params, 'initial_solution', None)
+        if initial is None:
+            initial = BeamSearch().run(instance, params)
+        initial_obj, initial_rows = initial.objective, initial.export_schedule()
+        solution = self._new_solution(instance, params)
+
+        if backend == 'cp_sat':
+            rows, bound = self._solve_cp_sat(instance, solution.weights, initial_rows, deadline, params)
+        else:
+            rows, bound = self._branch_and_bound(instance, solution, initial_obj, deadline)
+
+        solution.load_schedule(*(rows if rows is not None else initial_rows))
+        objective = solution.objective
+        lower_bound = LowerBounds(instance).objective(solution.weights)
+        if backend == 'cp_sat' and not solution.power_cycles:
+            # La borne de CP-SAT ne vaut que pour les plannings sans arrêt des machines ;
+            # celle du branch and bound ne vaut que pour les plannings de liste
+            lower_bound = max(lower_bound, bound)
+
+        solution.backend_bound = bound
+        if objective == math.inf:
+            # Aucun planning réalisable trouvé : rien n'est prouvé optimal
+            solution.lower_bound = lower_bound
+            solution.optimal = False
+            solution.backend_optimal = False
+            solution.gap = math.inf
+        else:
+            lower_bound = min(lower_bound, objective)
+            solution.lower_bound = lower_bound
+            solution.optimal = objective == lower_bound
+            solution.backend_optimal = objective <= bound
+            solution.gap = 0.0 if solution.optimal else (objective - lower_bound) / objective
+        self._feed_archive(params, solution)
+        return solution
+
+    def _branch_and_bound(self, instance: Instance, solution: Solution, upper_bound,
+                          deadline: float) -> Tuple[Optional[Tuple[List, None]], int]:
+        '''
+        Parcours en profondeur des plannings de liste, meilleur score d'abord.
+        Retourne les lignes du meilleur planning trouvé (None si aucun n'améliore upper_bound)
+        et une borne inférieure sur ces plannings (math.inf si aucun n'est réalisable).
+        '''
+        model = ListSchedulingModel(instance, solution.weights, solution.power_cycles)
+        best = None
+        # Dominance : pour des dates de disponibilité identiques, seule la plus petite énergie compte
+        best_energy: Dict = {}
+        stack = [model.root()]
+        nodes = 0
+        while stack:
+            if nodes % 256 == 0 and time.perf_counter() >= deadline:
+                break
+            state = stack.pop()
+            nodes += 1
+            if state.score >= upper_bound:
+                continue
+            if model.is_complete(state):
+                objective = model.final_objective(state)
+                if objective < upper_bound:
+                    upper_bound, best = objective, state
+                continue
+
+            children = []
+            for extension in model.extensions(state, []):
+                late, score = extension[0], extension[1]
+                if late or score >= upper_bound:
+                    continue
+                child = model.child(extension)
+                key = child.key()[:3]
+                if best_energy.get(key, math.inf) <= child.energy:
+                    continue
+                best_energy[key] = child.energy
+                children.append(child)
+            # Le meilleur score est dépilé en premier
+            children.sort(key=lambda child: child.score, reverse=True)
+            stack.extend(children)
+
+        # Les sous-arbres non explorés sont bornés par leur score ; une borne infinie
+        # signifie qu'aucun planning de liste ne respecte les horizons
+        bound = min([upper_bound] + [state.score for state in stack])
+        if bound < math.inf:
+            bound = math.ceil(bound)
+        if best is None:
+            return None, bound
+        model.replay(solution, best)
+        return solution.export_schedule(), bound
+
+    def _solve_cp_sat(self, instance: Instance, weights: Dict, initial_rows, deadline: float,
+                      params: Dict) -> Tuple[Optional[Tuple[List, None]], int]:
+        '''
+        Résout le modèle CP-SAT (une période de marche par machine, jusqu'à son horizon).
+        Retourne les lignes des opérations de la meilleure solution (None si aucune)
+        et la borne inférieure prouvée par le solveur (math.inf si le modèle est irréalisable).
+        '''
+        from ortools.sat.python import cp_model
+
+        # CP-SAT veut des coefficients entiers
+        scale = 1 if all(float(w).is_integer() for w in weights.values()) else 1000
+        w_energy, w_cmax, w_sum_ci = (round(weights[name] * scale) for name in ('energy', 'cmax', 'sum_ci'))
+
+        model = cp_model.CpModel()
+        horizon = max((m.max_end_time for m in instance.machines), default=0)
+        starts, ends, presences = {}, {}, {}
+        machine_intervals = {m.machine_id: [] for m in instance.machines}
+        machine_ops = {m.machine_id: [] for m in instance.machines}
+        for op in instance.operations:
+            op_id = op.operation_id
+            starts[op_id] = model.NewIntVar(0, horizon, f"s{op_id}")
+            ends[op_id] = model.NewIntVar(0, horizon, f"e{op_id}")
+            literals = []
+            for machine_id, (duration, _) in op.get_machine_options().items():
+                presence = model.NewBoolVar(f"p{op_id}_{machine_id}")
+                presences[op_id, machine_id] = presence
+                literals.append(presence)
+                machine_intervals[machine_id].append(
+                    model.NewOptionalFixedSizeIntervalVar(starts[op_id], duration, presence, f"i{op_id}_{machine_id}"))
+                model.Add(ends[op_id] == starts[op_id] + duration).OnlyEnforceIf(presence)
+                machine_ops[machine_id].append(op)
+            model.AddExactlyOne(literals)
+            for pred in op.predecessors:
+                model.Add(starts[op_id] >= ends[pred.operation_id])
+
+        energy_terms = []
+        for machine in instance.machines:
+            machine_id = machine.machine_id
+            ops = machine_ops[machine_id]
+            model.AddNoOverlap(machine_intervals[machine_id])
+            last_end = machine.max_end_time - machine.tear_down_time
+            # first : début de la première opération, la machine est démarrée set_up_time avant
+            first = model.NewIntVar(machine.set_up_time, max(machine.set_up_time, last_end), f"first{machine_id}")
+            used = model.NewBoolVar(f"used{machine_id}")
+            for op in ops:
+                presence = presences[op.operation_id, machine_id]
+                model.AddImplication(presence, used)
+                model.Add(starts[op.operation_id] >= first).OnlyEnforceIf(presence)
+                model.Add(ends[op.operation_id] <= last_end).OnlyEnforceIf(presence)
+            model.AddBoolOr([presences[op.operation_id, machine_id] for op in ops]).OnlyEnforceIf(used)
+            model.Add(first == max(machine.set_up_time, last_end)).OnlyEnforceIf(used.Not())
+
+            # Énergie : démarrage et arrêt, marche à vide jusqu'au tear down avant l'horizon,
+            # et pour chaque opération son énergie moins la marche à vide qu'elle remplace
+            c = machine.min_consumption
+            energy_terms.append((machine.set_up_energy + machine.tear_down_energy) * used)
+            energy_terms.append(c * (max(machine.set_up_time, last_end) - first))
+            for op in ops:
+                duration, energy = op.get_machine_options()[machine_id]
+                energy_terms.append((energy - c * duration) * presences[op.operation_id, machine_id])
+
+        completions = [ends[job.operations[-1].operation_id] for job in instance.jobs if job.operations]
+        cmax = model.NewIntVar(0, horizon, "cmax")
+        model.AddMaxEquality(cmax, completions)
+        model.Minimize(w_energy * sum(energy_terms) + w_cmax * cmax + w_sum_ci * sum(completions))
+
+        # La solution initiale guide la recherche
+        for op_id, machine_id, start in initial_rows[0]:
+            model.AddHint(starts[op_id], start)
+            for option in instance.get_operation(op_id).get_machine_options():
+                model.AddHint(presences[op_id, option], option == machine_id)
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max(0.0, deadline - time.perf_counter())
+        solver.parameters.num_workers = self._param(params, 'workers', 1)
+        status = solver.Solve(model)
+        if status == cp_model.INFEASIBLE:
+            return None, math.inf
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return None, 0
+
+        rows = [(op.operation_id, machine_id, solver.Value(starts[op.operation_id]))
+                for op in instance.operations
+                for machine_id in op.get_machine_options()
+                if solver.Value(presences[op.operation_id, machine_id])]
+        return (rows, None), math.ceil(solver.BestObjectiveBound() / scale - 1e-9)
@@ -0,0 +1,95 @@
+'''
+GRASP (Greedy Randomized Adaptive Search Procedure): many fast randomized
+greedy constructions (GraspConstruction), each one improved by a local search,
+the best solution over all the starts being returned.
+'''
+import time
+from typing import Dict
+
+from src.scheduling import instrumentation
+from src.scheduling.instrumentation import SearchStats
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.heuristics import Heuristic
+from src.scheduling.optim.constructive import GraspConstruction
+from src.scheduling.optim.local_search import FirstNeighborLocalSearch
+
+
+class Grasp(Heuristic):
+    '''
+    Multi-start GRASP: each start builds a solution with GraspConstruction and
+    improves it with a local search from that solution.
+
+    Parameters (in params):
+      - iterations: number of starts (20 by default)
+      - time_limit: maximum duration in seconds; no new start is made after it
+        and the running search is stopped at it (no limit by default)
+      - alpha: greediness of the restricted candidate lists (see GraspConstruction, 0.2 by default)
+      - search: class of the local search run from each construction (FirstNeighborLocalSearch
+        by default), None to only construct
+      - rng: random.Random shared by the constructions and the searches, or seed: seed
+        of a new generator (see Heuristic._make_rng)
+      - trace: if True (or a capacity, or a ConvergenceTrace), records one point per new best
+        solution over all the starts (ConvergenceTrace) in the trace attribute of the returned solution
+      - weights, decoding, power_cycles, archive: given to the constructions and the searches
+      - any other parameter is given to the searches (max_iterations, cache, stop_at_bound...)
+    '''
+
+    # Paramètres propres au GRASP, qui ne sont pas transmis aux recherches locales
+    OWN_PARAMS = ('iterations', 'time_limit', 'alpha', 'search', 'trace')
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+
+    def run(self, instance: Instance, NeighborClass, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param NeighborClass: the class of neighborhood used by the local searches
+        @param params: the parameters for the run
+        '''
+        start_time = time.perf_counter()
+        iterations = self._param(params, 'iterations', 20)
+        time_limit = self._param(params, 'time_limit', None)
+        deadline = start_time + time_limit if time_limit is not None else None
+        SearchClass = self._param(params, 'search', FirstNeighborLocalSearch)
+        rng = self._make_rng(params)
+        trace = self._make_trace(params)
+        # La trace compte les évaluations de tous les départs
+        stats = SearchStats() if trace is not None else None
+
+        run_params = dict(self.params, **params)
+        for name in self.OWN_PARAMS:
+            run_params.pop(name, None)
+        run_params['rng'] = rng
+        construction = GraspConstruction({'alpha': self._param(params, 'alpha', 0.2)})
+        search = SearchClass() if SearchClass is not None else None
+
+        best_obj, best_rows = float('inf'), None
+        with instrumentation.collecting(stats):
+            for _ in range(iterations):
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                sol = construction.run(instance, run_params)
+                if search is not None:
+                    search_params = dict(run_params, initial_solution=sol)
+                    if deadline is not None:
+                        search_params['time_limit'] = max(0, deadline - time.perf_counter())
+                    sol = search.run(instance, None, NeighborClass, search_params)
+                # Les lignes sont extraites tout de suite : l'instance est réutilisée par le départ suivant
+                if sol.objective < best_obj or best_rows is None:
+                    best_obj, best_rows = sol.objective, sol.export_schedule()
+                    if trace is not None:
+                        trace.record_solution(stats.calls['evaluate'], sol)
+
+        solution = self._new_solution(instance, run_params)
+        if best_rows is not None:
+            solution.load_schedule(*best_rows)
+        solution.trace = trace
+        return solution
@@ -3,12 +3,14 @@ Mother class for heuristics.
 
 @author: Vassilissa Lehoux
 '''
-from typing import Dict, Callable, List
+from typing import Dict, Callable, List, Optional
 import random
 
 from src.scheduling.instance.instance import Instance
-from src.scheduling.solution import Solution
+from src.scheduling.solution import Solution, APPEND, ACTIVE
 from src.scheduling.instance.operation import Operation
+from src.scheduling.optim.trace import ConvergenceTrace
+from src.scheduling.optim.rng import make_rng
 
 class Heuristic(object):
     '''
@@ -33,8 +35,64 @@ class Heuristic(object):
         '''
         raise NotImplementedError("Cette méthode doit être implémentée par les classes filles.")
 
+    def _param(self, params: Dict, name: str, default=None):
+        '''
+        Retourne la valeur d'un paramètre : en priorité celle passée à run,
+        puis celle donnée au constructeur, et sinon la valeur par défaut.
+        '''
+        if name in params:
+            return params[name]
+        return self.params.get(name, default)
+
+    def _make_trace(self, params: Dict) -> Optional[ConvergenceTrace]:
+        '''
+        Crée la trace de convergence demandée par le paramètre 'trace' :
+        True, une capacité initiale (int) ou une ConvergenceTrace existante.
+        Retourne None si aucune trace n'est demandée.
+        '''
+        trace = self._param(params, 'trace', False)
+        # Une trace existante vide est « fausse » (len == 0) : elle est testée en premier
+        if isinstance(trace, ConvergenceTrace):
+            trace.start()
+            return trace
+        if not trace:
+            return None
+        if trace is True:
+            return ConvergenceTrace()
+        return ConvergenceTrace(int(trace))
+
+    def _make_rng(self, params: Dict) -> random.Random:
+        '''
+        Retourne le générateur aléatoire du run : celui du paramètre 'rng',
+        sinon un nouveau générateur initialisé avec le paramètre 'seed' (voir rng.make_rng).
+        '''
+        rng = self._param(params, 'rng', None)
+        if rng is not None:
+            return rng
+        return make_rng(self._param(params, 'seed', None))
+
+    def _feed_archive(self, params: Dict, solution: Solution):
+        '''
+        Propose la solution à l'archive de Pareto donnée par le paramètre 'archive', s'il y en a une.
+        '''
+        archive = self._param(params, 'archive', None)
+        if archive is not None:
+            archive.add_solution(solution)
+
+    def _new_solution(self, instance: Instance, params: Dict) -> Solution:
+        '''
+        Crée une solution vide (l'instance est réinitialisée) avec les réglages des paramètres :
+        weights (pondérations de l'objectif, voir Solution.weights), decoding et power_cycles.
+        '''
+        solution = Solution(instance, self._param(params, 'weights', None))
+        solution.reset()
+        solution.decoding = self._param(params, 'decoding', APPEND)
+        solution.power_cycles = self._param(params, 'power_cycles', False)
+        return solution
+
     def _construct_solution(self, instance: Instance,
-                            selection_strategy: Callable[[List[Operation]], Operation]) -> Solution:
+                            selection_strategy: Callable[[List[Operation]], Operation],
+                            params: Dict=dict()) -> Solution:
         """
         Méthode qui contient la logique commune de construction d'une solution pour les heuristiques se
         trouvant dans le fichier constructive.py.
@@ -44,9 +102,11 @@ class Heuristic(object):
         @param selection_strategy: une fonction qui prend une liste d'opérations
                disponibles et en retourne une seule selon une stratégie précise
                (ex: la première, une au hasard, etc.).
+        @param params: les paramètres de l'heuristique (réglages de la solution, voir _new_solution).
         """
-        # Initialisation de la solution
-        solution = Solution(instance)
+        # Initialisation de la solution, en effaçant toute planification précédente de l'instance
+        solution = self._new_solution(instance, params)
+        decoding = solution.decoding
 
         # Tant qu'il y a des opérations disponibles à planifier
         while len(solution.available_operations) > 0:
@@ -54,29 +114,7 @@ class Heuristic(object):
             op_to_schedule = selection_strategy(solution.available_operations)
 
             # Le reste du code est la logique commune de recherche de la meilleure machine
-            best_machine = None
-            earliest_completion_time = float('inf')
-
-            # On va parcourir les machines disponibles pour cette opération et trouver la première sur laquelle on peut la planifier
-            for machine_id in op_to_schedule.get_machine_options().keys():
-                machine = instance.get_machine(machine_id)
-
-                # On calcule le temps de début possible pour l'opération en fonction de la disponibilité de la machine et du temps de préparation
-                pred_ready_time = op_to_schedule.min_start_time
-                if not machine.scheduled_operations:
-                    machine_ready_time = machine.set_up_time
-                else:
-                    machine_ready_time = machine.available_time
-                start_time = max(pred_ready_time, machine_ready_time)
-
-                # On calcule la durée de l'opération sur cette machine
-                duration = op_to_schedule.get_processing_time_on_machine(machine_id)
-                # On calcule le temps de fin de l'opération
-                completion_time = start_time + duration
-                # On cherche la machine qui permet de finir l'opération le plus tôt
-                if completion_time < earliest_completion_time:
-                    earliest_completion_time = completion_time
-                    best_machine = machine
+            best_machine = self._best_machine(instance, op_to_schedule, decoding)
 
             # Si on a trouvé une machine, on planifie l'opération dessus
             if best_machine:
@@ -85,4 +123,51 @@ class Heuristic(object):
                 raise RuntimeError(f"Aucune machine trouvée pour l'opération {op_to_schedule.operation_id}")
 
         return solution
-        
+
+    def _best_machine(self, instance: Instance, operation: Operation, decoding: str=APPEND):
+        '''
+        Retourne la machine sur laquelle l'opération, planifiée à la suite des opérations
+        déjà placées (ou dans un temps mort avec le décodage ACTIVE), finirait le plus tôt
+        parmi celles où elle finit avant l'horizon (tear down compris).
+        Si elle ne tient sur aucune, retourne celle où elle finit le plus tôt
+        (None si elle n'a aucune machine possible).
+        '''
+        best_machine = None
+        earliest_completion_time = float('inf')
+        best_fits = False
+
+        # Date de disponibilité due aux prédécesseurs, commune à toutes les machines
+        pred_ready_time = operation.min_start_time
+
+        # On va parcourir les machines disponibles pour cette opération et trouver la première sur laquelle on peut la planifier
+        for machine_id, (duration, _) in operation.get_machine_options().items():
+            machine = instance.get_machine(machine_id)
+
+            # On calcule le temps de début possible pour l'opération en fonction de la disponibilité de la machine et du temps de préparation
+            start_time = self._start_time(machine, duration, pred_ready_time, decoding)
+
+            # On calcule le temps de fin de l'opération
+            completion_time = start_time + duration
+            # On cherche la machine qui permet de finir l'opération le plus tôt, en priorité avant l'horizon
+            fits = machine.fits_horizon(start_time, duration)
+            if (fits, -completion_time) > (best_fits, -earliest_completion_time):
+                earliest_completion_time = completion_time
+                best_machine = machine
+                best_fits = fits
+
+        return best_machine
+
+    def _start_time(self, machine, duration: int, pred_ready_time: int, decoding: str=APPEND) -> int:
+        '''
+        Retourne la date à laquelle Solution.schedule placerait sur la machine une opération
+        de cette durée disponible à pred_ready_time.
+        '''
+        if decoding == ACTIVE and machine.scheduled_operations:
+            gap = machine.find_gap(pred_ready_time, duration)
+            if gap is not None:
+                return gap[1]
+        if not machine.scheduled_operations:
+            machine_ready_time = machine.set_up_time
+        else:
+            machine_ready_time = machine.available_time
+        return max(pred_ready_time, machine_ready_time)
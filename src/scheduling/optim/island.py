@@ -0,0 +1,211 @@
+'''
+Island model: several searches run in separate processes on the same
+instance and periodically send their best solution to the next island
+(ring topology).
+'''
+import multiprocessing
+import os
+import queue
+import random
+import traceback
+from typing import Dict
+
+from src.scheduling import instrumentation
+from src.scheduling.instrumentation import SearchStats
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.heuristics import Heuristic
+from src.scheduling.optim.local_search import FirstNeighborLocalSearch
+from src.scheduling.optim.rng import spawn
+
+
+# Délai d'attente des résultats des îles (s), entre deux vérifications de leurs processus
+_POLL_INTERVAL = 0.5
+
+
+def _island_main(index: int, instance: Instance, SearchClass, InitClass, NeighborClass,
+                 search_params: Dict, epochs: int, migration_interval: int, rng: random.Random,
+                 inbox, outbox, results, report: bool=False):
+    '''
+    Processus d'une île : le résultat ('done', index, objectif, lignes) est mis dans results,
+    ou ('error', index, traceback) si la recherche lève une exception.
+    Avec report, chaque nouvelle meilleure solution de l'île est aussi signalée :
+    ('incumbent', index, objectif, cmax, énergie, nombre d'évaluations de l'île).
+    '''
+    # Les derniers migrants peuvent ne jamais être lus : on ne bloque pas la fin du processus pour eux
+    outbox.cancel_join_thread()
+    try:
+        stats = SearchStats() if report else None
+        with instrumentation.collecting(stats):
+            best_obj, best_rows = _island_loop(index, instance, SearchClass, InitClass, NeighborClass,
+                                               search_params, epochs, migration_interval, rng,
+                                               inbox, outbox, results, stats)
+    except Exception:
+        results.put(('error', index, traceback.format_exc()))
+        return
+    results.put(('done', index, best_obj, best_rows))
+
+
+def _island_loop(index: int, instance: Instance, SearchClass, InitClass, NeighborClass,
+                 search_params: Dict, epochs: int, migration_interval: int, rng: random.Random,
+                 inbox, outbox, results, stats):
+    '''
+    Boucle d'une île : à chaque époque, au plus migration_interval pas de recherche depuis la
+    solution courante, puis envoi de la meilleure solution à l'île suivante et intégration
+    des migrants reçus. Retourne la meilleure solution (objectif, lignes).
+    '''
+    search = SearchClass()
+    # Chaque île tire dans son propre flux, sinon toutes les îles feraient les mêmes tirages
+    params = dict(search_params, max_iterations=migration_interval, rng=rng)
+
+    best_obj, best_rows = float('inf'), None
+    start_rows = None
+    for epoch in range(epochs):
+        start_sol = None
+        if start_rows is not None:
+            start_sol = Solution(instance, search_params.get('weights'))
+            start_sol.load_schedule(*start_rows)
+        start_obj = start_sol.objective if start_sol is not None else float('inf')
+
+        sol = search.run(instance, InitClass, NeighborClass, dict(params, initial_solution=start_sol))
+        # Les lignes sont extraites tout de suite : l'instance sera réutilisée par la suite
+        sol_obj, sol_rows = sol.objective, sol.export_schedule()
+        if sol_obj < best_obj:
+            best_obj, best_rows = sol_obj, sol_rows
+            if stats is not None:
+                results.put(('incumbent', index, sol_obj, sol.cmax, sol.total_energy_consumption,
+                             stats.calls['evaluate']))
+
+        # Si la recherche a progressé on la poursuit, sinon on redémarre d'une nouvelle solution
+        start_rows = sol_rows if sol_obj < start_obj else None
+
+        if epoch == epochs - 1:
+            break
+
+        # Migration : meilleure solution vers l'île suivante, meilleur migrant reçu adopté
+        if best_rows is not None:
+            outbox.put((best_obj, best_rows))
+        while True:
+            try:
+                migrant_obj, migrant_rows = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if migrant_obj < best_obj:
+                best_obj, best_rows = migrant_obj, migrant_rows
+                start_rows = migrant_rows
+
+    return best_obj, best_rows
+
+
+class IslandModel(Heuristic):
+    '''
+    Runs one search per process on the same instance, with periodic
+    migration of the best solutions between the islands.
+
+    Parameters (in params):
+      - islands: number of islands / processes (number of CPUs by default)
+      - epochs: number of migration rounds (10 by default)
+      - migration_interval: maximum number of search steps between two migrations (20 by default)
+      - search: class of the search run on each island, with the signature of
+        the local searches (FirstNeighborLocalSearch by default)
+      - search_params: parameters given to the search of each island
+      - rng: random.Random from which one independent stream per island is spawned,
+        or seed: seed of a new generator (see Heuristic._make_rng)
+      - trace: if True (or a capacity, or a ConvergenceTrace), records one point per new best
+        solution over all the islands (ConvergenceTrace, the evaluations being summed over
+        the islands) in the trace attribute of the returned solution
+
+    A RuntimeError is raised if an island fails (exception in its search, or process killed).
+    '''
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+
+    def run(self, instance: Instance, InitClass, NeighborClass, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param InitClass: the class for the heuristic computing the initialization
+        @param NeighborClass: the class of neighborhood used by the searches
+        @param params: the parameters for the run
+        '''
+        nb_islands = self._param(params, 'islands', os.cpu_count() or 1)
+        epochs = self._param(params, 'epochs', 10)
+        migration_interval = self._param(params, 'migration_interval', 20)
+        SearchClass = self._param(params, 'search', FirstNeighborLocalSearch)
+        search_params = self._param(params, 'search_params', {})
+        rngs = spawn(self._make_rng(params), nb_islands)
+        trace = self._make_trace(params)
+
+        ctx = multiprocessing.get_context()
+        inboxes = [ctx.Queue() for _ in range(nb_islands)]
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(target=_island_main,
+                        args=(i, instance, SearchClass, InitClass, NeighborClass, search_params, epochs,
+                              migration_interval, rngs[i], inboxes[i], inboxes[(i + 1) % nb_islands], results,
+                              trace is not None))
+            for i in range(nb_islands)
+        ]
+        for process in processes:
+            process.start()
+
+        try:
+            best_rows = self._collect(processes, results, trace)
+        except BaseException:
+            for process in processes:
+                process.terminate()
+            raise
+        finally:
+            for process in processes:
+                process.join()
+
+        solution = self._new_solution(instance, search_params)
+        if best_rows is not None:
+            solution.load_schedule(*best_rows)
+        solution.trace = trace
+        return solution
+
+    @staticmethod
+    def _collect(processes, results, trace):
+        '''
+        Récupère les résultats des îles avant d'attendre les processus, pour ne pas bloquer
+        sur les files. Lève RuntimeError si une île échoue ou meurt sans résultat.
+        Retourne les lignes de la meilleure solution (None si aucune).
+        '''
+        best_obj, best_rows = float('inf'), None
+        trace_obj = float('inf')
+        evaluations = [0] * len(processes)
+        done = set()
+        while len(done) < len(processes):
+            try:
+                message = results.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                # Un processus tué ne met rien dans la file : on vérifie que les îles sont vivantes
+                for index, process in enumerate(processes):
+                    if index not in done and not process.is_alive() and process.exitcode != 0:
+                        raise RuntimeError(f"Island {index} died (exit code {process.exitcode}).")
+                continue
+
+            kind, index = message[0], message[1]
+            if kind == 'error':
+                raise RuntimeError(f"Island {index} failed:\n{message[2]}")
+            if kind == 'incumbent':
+                island_obj, cmax, energy, island_evaluations = message[2:]
+                evaluations[index] = island_evaluations
+                if trace is not None and island_obj < trace_obj:
+                    trace_obj = island_obj
+                    trace.record(sum(evaluations), island_obj, cmax, energy)
+                continue
+
+            done.add(index)
+            island_obj, island_rows = message[2], message[3]
+            if island_rows is not None and (best_rows is None or island_obj < best_obj):
+                best_obj, best_rows = island_obj, island_rows
+        return best_rows
@@ -4,26 +4,60 @@ then improve it.
 
 @author: Vassilissa Lehoux
 '''
-from typing import Dict
+import time
+from typing import Dict, Optional
 
 from src.scheduling.optim.heuristics import Heuristic
 from src.scheduling.instance.instance import Instance
 from src.scheduling.solution import Solution
 from src.scheduling.optim.constructive import NonDeterminist
-from src.scheduling.optim.neighborhoods import MyNeighborhood1
+from src.scheduling.optim.neighborhoods import Neighborhood, ExplorableNeighborhood, MyNeighborhood1
+from src.scheduling.optim.parallel import ParallelNeighborEvaluator
+from src.scheduling.optim.lower_bounds import LowerBounds
+from src.scheduling.optim.evaluation_cache import EvaluationCache
+from src.scheduling import instrumentation
+from src.scheduling.instrumentation import SearchStats
 
 
-class FirstNeighborLocalSearch(Heuristic):
+class LocalSearch(Heuristic):
     '''
-    Vanilla local search will first create a solution,
-    then at each step try and improve it by looking at
-    solutions in its neighborhood.
-    The first solution found that improves over the current solution
-    replaces it.
-    The algorithm stops when no solution is better than the current solution
-    in its neighborhood.
+    Logique commune des recherches locales : création d'une solution initiale
+    puis amélioration par pas successifs dans un voisinage.
+    Le choix du voisin à chaque pas est délégué aux classes filles (_step).
+
+    Paramètres reconnus (dans params) :
+      - instrument : si True, collecte des compteurs (SearchStats) exposés
+        dans l'attribut stats de la solution retournée.
+      - trace : si True (ou une capacité, ou une ConvergenceTrace), enregistre
+        la convergence (ConvergenceTrace) exposée dans l'attribut trace
+        de la solution retournée. Un point par amélioration de la solution courante.
+      - stop_at_bound : si True (défaut), arrête la recherche dès que la solution
+        courante atteint la borne inférieure de l'objectif (LowerBounds).
+      - cache : taille du cache d'évaluation (EvaluationCache) partagé avec le voisinage,
+        ou un EvaluationCache existant (par exemple entre plusieurs redémarrages).
+        Le taux de succès est reporté dans les compteurs (cache_hits, cache_misses).
+      - initial_solution : solution de départ ; InitClass n'est alors pas utilisée.
+      - weights : pondérations de l'objectif (voir Solution.weights), données aussi à InitClass.
+        Par défaut celles de la solution de départ.
+      - decoding : placement des opérations replanifiées, 'append' ou 'active' (voir Solution.decoding),
+        donné aussi à InitClass. Par défaut celui de la solution de départ.
+      - power_cycles : si True, arrêt des machines pendant les longs temps morts à l'évaluation
+        (voir Solution.optimize_power_cycles), donné aussi à InitClass. Par défaut comme la solution de départ.
+      - max_iterations : nombre maximal de pas d'amélioration (pas de limite par défaut).
+      - time_limit : durée maximale de la recherche en secondes ; à l'échéance la meilleure
+        solution trouvée est retournée (pas de limite par défaut).
+      - archive : ParetoArchive (cmax, énergie) alimentée par la solution initiale
+        et par les voisins évalués.
+      - rng : random.Random partagé par InitClass et le voisinage, ou seed : graine
+        d'un nouveau générateur (voir Heuristic._make_rng).
+      - workers : nombre de processus pour évaluer les voisins en parallèle
+        (recherches dont les pas explorent tout le voisinage, voir PARALLEL_STEPS,
+        avec un voisinage dérivé d'ExplorableNeighborhood). 1 par défaut.
     '''
 
+    # Vrai si chaque pas évalue tout le voisinage, et peut donc être parallélisé
+    PARALLEL_STEPS = False
+
     def __init__(self, params: Dict=dict()):
         '''
         Constructor
@@ -34,7 +68,7 @@ class FirstNeighborLocalSearch(Heuristic):
 
     def run(self, instance: Instance, InitClass, NeighborClass, params: Dict=dict()) -> Solution:
         '''
-        Compute a solution for the given instance.
+        Computes a solution for the given instance.
         Implementation should provide default values in the function
         (the function will be evaluated with an empty dictionary).
 
@@ -43,36 +77,114 @@ class FirstNeighborLocalSearch(Heuristic):
         @param NeighborClass: the class of neighborhood used in the vanilla local search
         @param params: the parameters for the run
         '''
-        # Création d'une solution initiale avec l'heuristique fournie
-        init_heuristic = InitClass()
-        current_sol = init_heuristic.run(instance)
-        current_obj = current_sol.objective
-
-        # Instanciation du voisinage
-        neighborhood = NeighborClass(instance)
-
-        # Boucle permettant d'améliorer la solution
-        while True:
-            # On cherche le premier voisin qui améliore la solution
-            neighbor = neighborhood.first_better_neighbor(current_sol)
-
-            if neighbor.objective < current_obj:
-                # Si on en trouve un, il devient notre nouvelle solution
-                current_sol = neighbor
-                current_obj = neighbor.objective
+        start_time = time.perf_counter()
+        trace = self._make_trace(params)
+        # La trace a besoin du nombre d'évaluations, donc des compteurs
+        instrument = self._param(params, 'instrument', False) or trace is not None
+        stats = SearchStats() if instrument else None
+
+        with instrumentation.collecting(stats):
+            # Création d'une solution initiale avec l'heuristique fournie (sauf si elle est donnée)
+            rng = self._make_rng(params)
+            current_sol = self._param(params, 'initial_solution', None)
+            settings = {name: self._param(params, name) for name in ('weights', 'decoding', 'power_cycles')
+                        if self._param(params, name) is not None}
+            if current_sol is None:
+                init_heuristic = InitClass()
+                current_sol = init_heuristic.run(instance, dict(settings, rng=rng))
             else:
-                # Sinon, on a atteint un optimum local et on arrête
-                break
-
+                for name, value in settings.items():
+                    setattr(current_sol, name, value)
+            current_obj = current_sol.objective
+            archive = self._param(params, 'archive', None)
+            if archive is not None:
+                archive.add_solution(current_sol)
+            if trace is not None:
+                trace.record_solution(stats.calls['evaluate'], current_sol)
+
+            # Instanciation du voisinage, avec le cache d'évaluation, l'archive et l'évaluateur parallèle éventuels
+            neighborhood_params = {'rng': rng}
+            if archive is not None:
+                neighborhood_params['archive'] = archive
+            cache = self._make_cache(params)
+            if cache is not None:
+                neighborhood_params['cache'] = cache
+            hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+            workers = self._param(params, 'workers', 1)
+            evaluator = None
+            if self.PARALLEL_STEPS and workers > 1 and issubclass(NeighborClass, ExplorableNeighborhood):
+                evaluator = ParallelNeighborEvaluator(instance, NeighborClass, workers)
+                neighborhood_params['evaluator'] = evaluator
+            neighborhood = NeighborClass(instance, neighborhood_params)
+
+            # Borne inférieure : une solution qui l'atteint est optimale
+            bound = None
+            if self._param(params, 'stop_at_bound', True):
+                bound = LowerBounds(instance).objective(current_sol.weights)
+
+            # Boucle permettant d'améliorer la solution
+            max_iterations = self._param(params, 'max_iterations', None)
+            time_limit = self._param(params, 'time_limit', None)
+            deadline = start_time + time_limit if time_limit is not None else None
+            iteration = 0
+            try:
+                while bound is None or current_obj > bound:
+                    if max_iterations is not None and iteration >= max_iterations:
+                        break
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        break
+                    iteration += 1
+                    neighbor = self._step(neighborhood, current_sol)
+
+                    if neighbor.objective < current_obj:
+                        # Si le voisin est meilleur, il devient notre nouvelle solution
+                        current_sol = neighbor
+                        current_obj = neighbor.objective
+                        if stats is not None:
+                            stats.improvements += 1
+                        if trace is not None:
+                            trace.record_solution(stats.calls['evaluate'], current_sol)
+                    else:
+                        # Sinon, on a atteint un optimum local et on arrête
+                        break
+            finally:
+                if evaluator is not None:
+                    evaluator.close()
+
+        if stats is not None and cache is not None:
+            stats.cache_hits += cache.hits - hits
+            stats.cache_misses += cache.misses - misses
+
+        current_sol.stats = stats
+        current_sol.trace = trace
         return current_sol
 
+    def _make_cache(self, params: Dict) -> Optional[EvaluationCache]:
+        '''
+        Crée (ou reprend) le cache d'évaluation demandé par le paramètre 'cache'.
+        '''
+        cache = self._param(params, 'cache', None)
+        if isinstance(cache, EvaluationCache):
+            return cache
+        if not cache:
+            return None
+        if cache is True:
+            return EvaluationCache()
+        return EvaluationCache(int(cache))
+
+    def _step(self, neighborhood: Neighborhood, current_sol: Solution) -> Solution:
+        '''
+        Retourne le voisin retenu pour ce pas (ou la solution elle-même).
+        '''
+        raise NotImplementedError("Cette méthode doit être implémentée par les classes filles.")
+
 
-class BestNeighborLocalSearch(Heuristic):
+class FirstNeighborLocalSearch(LocalSearch):
     '''
     Vanilla local search will first create a solution,
     then at each step try and improve it by looking at
     solutions in its neighborhood.
-    The best solution found that improves over the current solution
+    The first solution found that improves over the current solution
     replaces it.
     The algorithm stops when no solution is better than the current solution
     in its neighborhood.
@@ -86,39 +198,36 @@ class BestNeighborLocalSearch(Heuristic):
         '''
         super().__init__(params)
 
-    def run(self, instance: Instance, InitClass, NeighborClass, params: Dict=dict()) -> Solution:
-        '''
-        Computes a solution for the given instance.
-        Implementation should provide default values in the function
-        (the function will be evaluated with an empty dictionary).
+    def _step(self, neighborhood: Neighborhood, current_sol: Solution) -> Solution:
+        # On cherche le premier voisin qui améliore la solution
+        return neighborhood.first_better_neighbor(current_sol)
 
-        @param instance: the instance to solve
-        @param InitClass: the class for the heuristic computing the initialization
-        @param NeighborClass: the class of neighborhood used in the vanilla local search
-        @param params: the parameters for the run
+
+class BestNeighborLocalSearch(LocalSearch):
+    '''
+    Vanilla local search will first create a solution,
+    then at each step try and improve it by looking at
+    solutions in its neighborhood.
+    The best solution found that improves over the current solution
+    replaces it.
+    The algorithm stops when no solution is better than the current solution
+    in its neighborhood.
+    With params['workers'] > 1, the neighbors are evaluated in parallel.
+    '''
+
+    PARALLEL_STEPS = True
+
+    def __init__(self, params: Dict=dict()):
         '''
-        # Création d'une solution initiale
-        init_heuristic = InitClass()
-        current_sol = init_heuristic.run(instance)
-        current_obj = current_sol.objective
-
-        # Instanciation du voisinage
-        neighborhood = NeighborClass(instance)
-
-        # Boucle permettant d'améliorer la solution
-        while True:
-            # On explore tout le voisinage pour trouver le meilleur voisin
-            best_neighbor = neighborhood.best_neighbor(current_sol)
-
-            if best_neighbor.objective < current_obj:
-                # S'il est meilleur, il devient notre nouvelle solution
-                current_sol = best_neighbor
-                current_obj = best_neighbor.objective
-            else:
-                # Sinon, aucun voisin n'est meilleur, on arrête
-                break
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
 
-        return current_sol
+    def _step(self, neighborhood: Neighborhood, current_sol: Solution) -> Solution:
+        # On explore tout le voisinage pour trouver le meilleur voisin
+        return neighborhood.best_neighbor(current_sol)
 
 
 if __name__ == "__main__":
@@ -130,10 +239,11 @@ if __name__ == "__main__":
     print("--- Lancement de FirstNeighborLocalSearch avec MyNeighborhood1 ---")
 
     heur = FirstNeighborLocalSearch()
-    sol = heur.run(inst, NonDeterminist, MyNeighborhood1)
+    sol = heur.run(inst, NonDeterminist, MyNeighborhood1, {'instrument': True})
 
     print("\nSolution finale trouvée :")
     print(sol)
+    print(sol.stats)
 
     plt = sol.gantt("tab20")
     plt.savefig("gantt_MyNeighborhood1_LocalSearch.png")
@@ -0,0 +1,115 @@
+'''
+Fast lower bounds on the makespan, the sum of completion times and the
+energy consumption of an instance, used to stop searches early and to
+report optimality gaps.
+'''
+import math
+from typing import Dict, Optional
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import DEFAULT_WEIGHTS
+
+
+class LowerBounds(object):
+    '''
+    Lower bounds computed once for an instance, in O(n) using the
+    precomputed tables of the instance.
+    '''
+
+    def __init__(self, instance: Instance):
+        '''
+        Constructor
+        '''
+        self._instance = instance
+        self._job_bounds: Dict[int, int] = {}
+        self._cmax: int = 0
+        self._energy: int = 0
+        self._compute()
+
+    def _compute(self):
+        inst = self._instance
+        if not inst.operations:
+            return
+
+        # Borne par job : une opération ne démarre qu'après le set up de sa machine,
+        # puis le job doit encore exécuter tout son travail restant
+        for job in inst.jobs:
+            if not job.operations:
+                continue
+            first_op = job.operations[0]
+            # Une opération sans machine possible ne contraint rien (comme dans HeadsTails)
+            min_set_up = min((inst.get_machine(m_id).set_up_time for m_id in first_op.get_machine_options()),
+                             default=0)
+            self._job_bounds[job.job_id] = min_set_up + inst.tail_work(first_op.operation_id)
+        job_bound = max(self._job_bounds.values(), default=0)
+
+        # Borne par machine : la charge minimale totale répartie au mieux sur les machines,
+        # après le plus court set up
+        total_work = sum(inst.min_duration(op.operation_id) for op in inst.operations
+                         if op.get_machine_options())
+        min_set_up = min(m.set_up_time for m in inst.machines)
+        machine_bound = min_set_up + math.ceil(total_work / inst.nb_machines)
+
+        self._cmax = max(job_bound, machine_bound)
+
+        # Énergie : chaque opération au moins à sa consommation minimale,
+        # plus le démarrage et l'arrêt des machines obligatoires
+        processing_energy = sum(inst.min_energy(op.operation_id) for op in inst.operations
+                                if op.get_machine_options())
+        mandatory = {next(iter(op.get_machine_options())) for op in inst.operations
+                     if len(op.get_machine_options()) == 1}
+        if mandatory:
+            switch_energy = sum(self._switch_energy(inst.get_machine(m_id)) for m_id in mandatory)
+        else:
+            # Au moins une machine doit être démarrée
+            switch_energy = min(self._switch_energy(m) for m in inst.machines)
+        self._energy = processing_energy + switch_energy
+
+    @staticmethod
+    def _switch_energy(machine) -> int:
+        return machine.set_up_energy + machine.tear_down_energy
+
+    @property
+    def cmax(self) -> int:
+        '''
+        Returns a lower bound on the makespan
+        '''
+        return self._cmax
+
+    @property
+    def sum_ci(self) -> int:
+        '''
+        Returns a lower bound on the sum of the completion times of the jobs
+        '''
+        return sum(self._job_bounds.values())
+
+    @property
+    def energy(self) -> int:
+        '''
+        Returns a lower bound on the total energy consumption
+        '''
+        return self._energy
+
+    def objective(self, weights: Optional[Dict]=None) -> int:
+        '''
+        Returns a lower bound on the objective value for the given weights
+        (the default weights of the solutions if None).
+        '''
+        if weights is None:
+            weights = DEFAULT_WEIGHTS
+        # Comme pour Solution.weights, une composante absente pèse 0
+        value = (weights.get('energy', 0) * self.energy +
+                 weights.get('cmax', 0) * self.cmax +
+                 weights.get('sum_ci', 0) * self.sum_ci)
+        return int(value)
+
+    def gap(self, objective_value, weights: Optional[Dict]=None) -> float:
+        '''
+        Returns the relative optimality gap (value - bound) / value of
+        an objective value: 0 means the value is proven optimal.
+        '''
+        if objective_value == float('inf'):
+            return float('inf')
+        if objective_value <= 0:
+            return 0.0
+        return max(0.0, (objective_value - self.objective(weights)) / objective_value)
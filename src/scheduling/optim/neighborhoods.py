@@ -5,11 +5,12 @@ They must derive from the Neighborhood class.
 @author: Vassilissa Lehoux
 '''
 import copy
-import random
-from typing import Dict, Iterator
+from typing import Dict, Iterator, Optional, Tuple
 
 from src.scheduling.instance.instance import Instance
 from src.scheduling.solution import Solution
+from src.scheduling import instrumentation
+from src.scheduling.optim.rng import make_rng
 
 
 class Neighborhood(object):
@@ -39,9 +40,21 @@ class Neighborhood(object):
         raise "Not implemented error"
 
 
-class MyNeighborhood1(Neighborhood):
+class ExplorableNeighborhood(Neighborhood):
     '''
-    Échange de deux opérations adjacentes sur la même machine.
+    Voisinage défini par des mouvements : _iter_moves décrit les mouvements possibles
+    depuis une solution par des tuples compacts, _apply_move construit le voisin correspondant.
+    Contient la logique commune d'exploration (meilleur voisin, premier voisin améliorant).
+
+    Paramètres reconnus (dans params) :
+      - cache : EvaluationCache consulté avant d'évaluer un voisin, pour ne pas
+        réévaluer un planning déjà rencontré.
+      - evaluator : ParallelNeighborEvaluator utilisé par best_neighbor pour évaluer
+        les mouvements en parallèle.
+      - rng : random.Random utilisé pour les tirages du voisinage, ou seed : graine d'un
+        nouveau générateur (initialisé depuis le module random global par défaut).
+      - archive : ParetoArchive (cmax, énergie) alimentée par chaque voisin évalué
+        (avec l'évaluateur parallèle, seulement par le voisin retenu).
     '''
 
     def __init__(self, instance: Instance, params: Dict=dict()):
@@ -49,17 +62,25 @@ class MyNeighborhood1(Neighborhood):
         Constructor
         '''
         super().__init__(instance, params)
+        self._cache = params.get('cache')
+        self._evaluator = params.get('evaluator')
+        self._archive = params.get('archive')
+        self._rng = params['rng'] if params.get('rng') is not None else make_rng(params.get('seed'))
 
     def best_neighbor(self, sol: Solution) -> Solution:
         '''
         Returns the best solution in the neighborhood of the solution.
         Can be the solution itself.
         '''
+        if self._evaluator is not None:
+            return self._best_neighbor_parallel(sol)
+
         best_sol = sol
-        best_obj = sol.objective
+        best_obj = self._objective(sol)
         for neighbor in self._iter_neighbors(sol):
-            if neighbor.objective < best_obj:
-                best_obj = neighbor.objective
+            neighbor_obj = self._neighbor_objective(neighbor)
+            if neighbor_obj < best_obj:
+                best_obj = neighbor_obj
                 best_sol = neighbor
         return best_sol
 
@@ -68,67 +89,182 @@ class MyNeighborhood1(Neighborhood):
         Returns the first solution in the neighborhood of the solution
         that improves other it and the solution itself if none is better.
         '''
-        current_obj = sol.objective
+        current_obj = self._objective(sol)
         for neighbor in self._iter_neighbors(sol):
-            if neighbor.objective < current_obj:
+            if self._neighbor_objective(neighbor) < current_obj:
                 return neighbor
         return sol
 
+    def _best_neighbor_parallel(self, sol: Solution) -> Solution:
+        '''
+        Évalue tous les mouvements par l'évaluateur parallèle, puis ne construit
+        localement que le meilleur voisin.
+        '''
+        moves = list(self._iter_moves(sol))
+        objectives = self._evaluator.evaluate(sol, moves)
+
+        stats = instrumentation.current
+        if stats is not None:
+            stats.neighbors_generated += len(moves)
+            stats.neighbors_evaluated += len(moves)
+
+        best_obj = self._objective(sol)
+        best_move = None
+        for move, objective in zip(moves, objectives):
+            if objective < best_obj:
+                best_obj = objective
+                best_move = move
+        if best_move is None:
+            return sol
+
+        neighbor = self._apply_move(sol, best_move)
+        if neighbor is None:
+            return sol
+        if self._archive is not None:
+            self._archive.add_solution(neighbor)
+        return neighbor
+
+    def _neighbor_objective(self, neighbor: Solution) -> int:
+        '''
+        Retourne l'objectif d'un voisin généré en le comptabilisant si l'instrumentation est active.
+        '''
+        stats = instrumentation.current
+        if stats is not None:
+            stats.neighbors_evaluated += 1
+        if self._archive is None:
+            return self._objective(neighbor)
+
+        # Un planning trouvé dans le cache a déjà été proposé à l'archive
+        hits = self._cache.hits if self._cache is not None else 0
+        objective = self._objective(neighbor)
+        if self._cache is None or self._cache.hits == hits:
+            self._archive.add_solution(neighbor)
+        return objective
+
+    def _objective(self, sol: Solution) -> int:
+        '''
+        Retourne l'objectif d'une solution, en passant par le cache s'il y en a un.
+        '''
+        if self._cache is None:
+            return sol.objective
+        return self._cache.objective(sol)
+
+    def _copy_solution(self, sol: Solution) -> Solution:
+        '''
+        Copie profonde d'une solution (et de son instance) pour construire un voisin.
+        '''
+        stats = instrumentation.current
+        if stats is not None:
+            stats.deepcopies += 1
+        return copy.deepcopy(sol)
+
+    @staticmethod
+    def _schedule(sol: Solution, operation, machine) -> bool:
+        '''
+        Replanifie l'opération sur la machine (Solution.reinsert) et retourne False si elle
+        finit trop tard pour l'horizon de la machine : le voisin ne sera jamais réalisable,
+        inutile de finir de le construire et de l'évaluer.
+        '''
+        sol.reinsert(operation, machine)
+        return machine.fits_horizon(operation.start_time, operation.processing_time)
+
     def _iter_neighbors(self, sol: Solution) -> Iterator[Solution]:
+        '''
+        Génère les voisins de la solution.
+        '''
+        for move in self._iter_moves(sol):
+            neighbor_sol = self._apply_move(sol, move)
+            if neighbor_sol is None:
+                continue
+
+            stats = instrumentation.current
+            if stats is not None:
+                stats.neighbors_generated += 1
+            yield neighbor_sol
+
+    def _iter_moves(self, sol: Solution) -> Iterator[Tuple]:
+        '''
+        Génère les descripteurs (tuples d'entiers) des mouvements possibles depuis la solution.
+        '''
+        raise NotImplementedError("Cette méthode doit être implémentée par les classes filles.")
+
+    def _apply_move(self, sol: Solution, move: Tuple, in_place: bool=False) -> Optional[Solution]:
+        '''
+        Construit le voisin obtenu en appliquant le mouvement à la solution.
+        Retourne None si le mouvement ne peut pas être appliqué, ou si une opération
+        replanifiée dépasse l'horizon de sa machine (voir _schedule).
+        @param in_place: si True, modifie directement la solution au lieu d'une copie
+        '''
+        raise NotImplementedError("Cette méthode doit être implémentée par les classes filles.")
+
+
+class MyNeighborhood1(ExplorableNeighborhood):
+    '''
+    Échange de deux opérations adjacentes sur la même machine.
+    Mouvement : (machine_id, position de la première opération échangée).
+    '''
+
+    def __init__(self, instance: Instance, params: Dict=dict()):
+        '''
+        Constructor
+        '''
+        super().__init__(instance, params)
+
+    def _iter_moves(self, sol: Solution) -> Iterator[Tuple]:
         """
-        Génère les voisins en échangeant deux opérations adjacentes sur UNE SEULE machine
+        Génère les échanges de deux opérations adjacentes sur UNE SEULE machine
         choisie au hasard.
-        Version finale intégrant la suggestion de l'utilisateur et la replanification robuste.
         """
         # On s'assure de ne pas choisir une machine avec moins de 2 opérations
-        possible_machines = [m for m in self._instance.machines if len(m.scheduled_operations) >= 2]
+        possible_machines = [m for m in sol.inst.machines if len(m.scheduled_operations) >= 2]
         if not possible_machines:
             # S'il n'y a aucune machine éligible, on ne peut générer aucun voisin.
             return
 
-        machine = random.choice(possible_machines)
+        machine = self._rng.choice(possible_machines)
 
         # On parcourt les opérations planifiées sur la machine choisie
         for i in range(len(machine.scheduled_operations) - 1):
-            op1_original = machine.scheduled_operations[i]
-            op2_original = machine.scheduled_operations[i + 1]
+            op1 = machine.scheduled_operations[i]
+            op2 = machine.scheduled_operations[i + 1]
 
             # Condition de base pour un échange potentiellement valide
-            if op2_original.min_start_time <= op1_original.start_time:
-                # Création d'une copie de la solution pour éviter les modifications directes
-                neighbor_sol = copy.deepcopy(sol)
-                m_copy = neighbor_sol.inst.get_machine(machine.machine_id)
+            if op2.min_start_time <= op1.start_time:
+                yield (machine.machine_id, i)
 
-                # On identifie et réinitialise les opérations affectées
-                ops_to_reschedule = list(m_copy.scheduled_operations[i:])
+    def _apply_move(self, sol: Solution, move: Tuple, in_place: bool=False) -> Optional[Solution]:
+        machine_id, i = move
 
-                for op in ops_to_reschedule:
-                    m_copy.scheduled_operations.remove(op)
-                    op.reset()
+        # Création d'une copie de la solution pour éviter les modifications directes
+        neighbor_sol = sol if in_place else self._copy_solution(sol)
+        m_copy = neighbor_sol.inst.get_machine(machine_id)
 
-                # On replanifie avec la méthode fiable solution.schedule()
-                try:
-                    op1_reschedule = ops_to_reschedule[0]
-                    op2_reschedule = ops_to_reschedule[1]
+        # On identifie et retire les opérations affectées, en partant de la fin de la machine
+        ops_to_reschedule = list(m_copy.scheduled_operations[i:])
 
-                    # On les replanifie dans l'ordre inverse
-                    neighbor_sol.schedule(op2_reschedule, m_copy)
-                    neighbor_sol.schedule(op1_reschedule, m_copy)
+        for op in reversed(ops_to_reschedule):
+            neighbor_sol.unschedule(op)
 
-                    # On replanifie le reste
-                    for op_following in ops_to_reschedule[2:]:
-                        neighbor_sol.schedule(op_following, m_copy)
-                except Exception:
-                    continue
+        # On replanifie avec la méthode fiable solution.schedule()
+        try:
+            op1_reschedule = ops_to_reschedule[0]
+            op2_reschedule = ops_to_reschedule[1]
 
-                # On fournit le voisin valide
-                yield neighbor_sol
+            # On les replanifie dans l'ordre inverse, puis le reste
+            for op_reschedule in [op2_reschedule, op1_reschedule] + ops_to_reschedule[2:]:
+                if not self._schedule(neighbor_sol, op_reschedule, m_copy):
+                    return None
+        except Exception:
+            return None
 
+        return neighbor_sol
 
-class MyNeighborhood2(Neighborhood):
+
+class MyNeighborhood2(ExplorableNeighborhood):
     '''
     Déplace une opération vers une autre machine.
     Oon choisit une opération au hasard et on teste toutes ses autres machines possibles
+    Mouvement : (operation_id, id de la nouvelle machine).
     '''
 
     def __init__(self, instance: Instance, params: Dict=dict()):
@@ -137,72 +273,45 @@ class MyNeighborhood2(Neighborhood):
         '''
         super().__init__(instance, params)
 
-    def best_neighbor(self, sol: Solution) -> Solution:
-        '''
-        Returns the best solution in the neighborhood of the solution.
-        Can be the solution itself.
-        '''
-        best_sol = sol
-        best_obj = sol.objective
-        for neighbor in self._iter_neighbors(sol):
-            if neighbor.objective < best_obj:
-                best_obj = neighbor.objective
-                best_sol = neighbor
-        return best_sol
-
-    def first_better_neighbor(self, sol: Solution) -> Solution:
-        '''
-        Returns the first solution in the neighborhood of the solution
-        that improves other it and the solution itself if none is better.
-        '''
-        current_obj = sol.objective
-        for neighbor in self._iter_neighbors(sol):
-            if neighbor.objective < current_obj:
-                return neighbor
-        return sol
-
-    def _iter_neighbors(self, sol: Solution) -> Iterator[Solution]:
-        """Méthode qui contient la logique métier de déplacement d'une opération vers une autre machine."""
-
+    def _iter_moves(self, sol: Solution) -> Iterator[Tuple]:
         # On choisit une opération au hasard dans la solution
-        op_to_move = random.choice(sol.all_operations)
+        op_to_move = self._rng.choice(sol.all_operations)
         current_machine_id = op_to_move.assigned_to
 
         for new_machine_id in op_to_move.get_machine_options():
             # On ne peut pas déplacer l'opération sur la même machine
-            if new_machine_id == current_machine_id:
-                continue
+            if new_machine_id != current_machine_id:
+                yield (op_to_move.operation_id, new_machine_id)
 
-            # Création d'une copie pour la modification
-            neighbor_sol = copy.deepcopy(sol)
-            op_copy = neighbor_sol.inst.get_operation(op_to_move.operation_id)
-            old_machine_copy = neighbor_sol.inst.get_machine(current_machine_id)
-            new_machine_copy = neighbor_sol.inst.get_machine(new_machine_id)
-
-            # On retire l'opération et tous ses successeurs du même job
-            ops_to_reschedule = []
-            curr_op = op_copy
-            while curr_op is not None:
-                ops_to_reschedule.append(curr_op)
-                # On retire l'op de sa machine actuelle dans la copie
-                if curr_op.assigned:
-                    m = neighbor_sol.inst.get_machine(curr_op.assigned_to)
-                    if curr_op in m.scheduled_operations:
-                        m.scheduled_operations.remove(curr_op)
-                # On la réinitialise
-                curr_op.reset()
-                curr_op = curr_op.successors[0] if curr_op.successors else None
-
-            # Il faut replanifier l'opération sur la nouvelle machine
-            neighbor_sol.schedule(op_copy, new_machine_copy)
-
-            # Il faut aussi replanifier toutes les opérations qui étaient planifiées après l'opération déplacée
-            # On le fait sur la machine d'origine pour la simplicité
-            for op_reschedule in ops_to_reschedule[1:]:
-                original_machine_id_for_op = sol.inst.get_operation(op_reschedule.operation_id).assigned_to
-                machine_to_use = neighbor_sol.inst.get_machine(original_machine_id_for_op)
-                neighbor_sol.schedule(op_reschedule, machine_to_use)
-
-            neighbor_sol._objective_value = None
-
-            yield neighbor_sol
\ No newline at end of file
+    def _apply_move(self, sol: Solution, move: Tuple, in_place: bool=False) -> Optional[Solution]:
+        """Méthode qui contient la logique métier de déplacement d'une opération vers une autre machine."""
+        operation_id, new_machine_id = move
+
+        # Création d'une copie pour la modification
+        neighbor_sol = sol if in_place else self._copy_solution(sol)
+        op_copy = neighbor_sol.inst.get_operation(operation_id)
+        new_machine_copy = neighbor_sol.inst.get_machine(new_machine_id)
+
+        # On retire l'opération et tous ses successeurs du même job,
+        # en retenant la machine d'origine de chacun
+        ops_to_reschedule = []
+        curr_op = op_copy
+        while curr_op is not None:
+            ops_to_reschedule.append((curr_op, curr_op.assigned_to))
+            # On retire l'op de sa machine actuelle dans la copie
+            if curr_op.assigned:
+                neighbor_sol.unschedule(curr_op)
+            curr_op = curr_op.successors[0] if curr_op.successors else None
+
+        # Il faut replanifier l'opération sur la nouvelle machine
+        if not self._schedule(neighbor_sol, op_copy, new_machine_copy):
+            return None
+
+        # Il faut aussi replanifier toutes les opérations qui étaient planifiées après l'opération déplacée
+        # On le fait sur la machine d'origine pour la simplicité
+        for op_reschedule, original_machine_id in ops_to_reschedule[1:]:
+            machine_to_use = neighbor_sol.inst.get_machine(original_machine_id)
+            if not self._schedule(neighbor_sol, op_reschedule, machine_to_use):
+                return None
+
+        return neighbor_sol
@@ -0,0 +1,97 @@
+'''
+Parallel evaluation of the moves of a neighborhood.
+Each worker process keeps its own copy of the instance (sent once, at start up)
+and receives the current solution as rows (Solution.export_schedule) along
+with compact move descriptors; only the objective values are sent back.
+'''
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+
+
+# État des processus de travail, initialisé par _init_worker
+_worker_solution: Optional[Solution] = None
+_worker_neighborhood = None
+
+
+def _init_worker(instance: Instance, neighborhood_class, neighborhood_params: Dict):
+    global _worker_solution, _worker_neighborhood
+    _worker_solution = Solution(instance)
+    _worker_neighborhood = neighborhood_class(instance, neighborhood_params)
+
+
+def _evaluate_moves(rows: Tuple[List, List], weights: Dict, decoding: str, power_cycles: bool,
+                    moves: Sequence[Tuple]) -> List:
+    '''
+    Returns the objective value of each move applied to the solution described by rows.
+    '''
+    sol = _worker_solution
+    sol.weights = weights
+    sol.decoding = decoding
+    sol.power_cycles = power_cycles
+    op_rows, machine_rows = rows
+
+    objectives = []
+    for move in moves:
+        # On repart de la solution courante avant chaque mouvement : le rechargement
+        # est linéaire, bien moins coûteux qu'une copie profonde
+        sol.load_schedule(op_rows, machine_rows)
+        neighbor = _worker_neighborhood._apply_move(sol, move, in_place=True)
+        objectives.append(neighbor.objective if neighbor is not None else float('inf'))
+    return objectives
+
+
+class ParallelNeighborEvaluator(object):
+    '''
+    Pool of worker processes evaluating the moves of an ExplorableNeighborhood.
+    To be used as a context manager (or closed with close()).
+    '''
+
+    def __init__(self, instance: Instance, neighborhood_class, workers: Optional[int]=None,
+                 neighborhood_params: Dict=dict(), chunks_per_worker: int=4):
+        '''
+        Constructor
+        @param instance: the instance, copied once in each worker
+        @param neighborhood_class: the ExplorableNeighborhood whose moves are evaluated
+        @param workers: number of processes (number of CPUs if None)
+        @param chunks_per_worker: the moves of a step are split in workers * chunks_per_worker tasks
+        '''
+        self._workers = workers or os.cpu_count() or 1
+        self._chunks = self._workers * max(1, chunks_per_worker)
+        self._executor = ProcessPoolExecutor(max_workers=self._workers, initializer=_init_worker,
+                                             initargs=(instance, neighborhood_class, dict(neighborhood_params)))
+
+    def evaluate(self, sol: Solution, moves: Sequence[Tuple]) -> List:
+        '''
+        Returns the objective values of the neighbors of sol obtained by the moves,
+        in the order of the moves (infinity for a move that cannot be applied).
+        '''
+        if not moves:
+            return []
+
+        rows = sol.export_schedule()
+        weights = dict(sol.weights)
+        size = -(-len(moves) // self._chunks)
+        futures = [self._executor.submit(_evaluate_moves, rows, weights, sol.decoding, sol.power_cycles,
+                                          moves[i:i + size])
+                   for i in range(0, len(moves), size)]
+
+        objectives = []
+        for future in futures:
+            objectives.extend(future.result())
+        return objectives
+
+    def close(self):
+        '''
+        Stops the worker processes.
+        '''
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
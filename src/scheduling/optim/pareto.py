@@ -0,0 +1,134 @@
+'''
+Archive of the non-dominated solutions for (cmax, energy), fed during
+the searches, from which the trade-off curve can be exported and the best
+solution for any weighting of the two criteria can be picked afterwards.
+'''
+import csv
+import math
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+
+
+class ParetoArchive(object):
+    '''
+    Bounded set of non-dominated points (cmax, energy), both minimized.
+
+    The points are kept sorted by increasing cmax, hence by strictly decreasing
+    energy: the dominance check of a new point is a binary search.
+    When the archive is full, the interior point with the smallest crowding
+    distance is dropped (the two extremes of the front are always kept).
+    Each point keeps the schedule of its solution as rows (Solution.export_schedule).
+    '''
+
+    COLUMNS = ('cmax', 'energy', 'sum_ci')
+
+    def __init__(self, max_size: int=100):
+        '''
+        Constructor
+        @param max_size: maximum number of points kept (at least 2)
+        '''
+        self._max_size = max(2, max_size)
+        self._cmax: List[int] = []
+        self._energy: List[int] = []
+        self._sum_ci: List[int] = []
+        self._rows: List[Optional[Tuple[List, List]]] = []
+
+    def __len__(self):
+        return len(self._cmax)
+
+    def dominated(self, cmax: int, energy: int) -> bool:
+        '''
+        Returns True if a point of the archive is at least as good on both criteria.
+        '''
+        # Parmi les points de cmax <= cmax, le dernier a la plus petite énergie
+        i = bisect_right(self._cmax, cmax)
+        return i > 0 and self._energy[i - 1] <= energy
+
+    def add(self, cmax: int, energy: int, sum_ci: int=0, rows: Optional[Tuple[List, List]]=None) -> bool:
+        '''
+        Adds a point if it is not dominated, and removes the points it dominates.
+        Returns True if the point was added.
+        '''
+        if self.dominated(cmax, energy):
+            return False
+
+        # Les points dominés par le nouveau sont contigus : même cmax ou plus, énergie supérieure ou égale
+        lo = bisect_left(self._cmax, cmax)
+        hi = lo
+        while hi < len(self._cmax) and self._energy[hi] >= energy:
+            hi += 1
+        for values, value in ((self._cmax, cmax), (self._energy, energy),
+                              (self._sum_ci, sum_ci), (self._rows, rows)):
+            values[lo:hi] = [value]
+
+        if len(self._cmax) > self._max_size:
+            self._remove_most_crowded()
+        return True
+
+    def add_solution(self, solution: Solution) -> bool:
+        '''
+        Adds an evaluated solution if it is feasible and not dominated.
+        The schedule is exported only if the solution enters the archive.
+        '''
+        if math.isinf(solution.objective):
+            return False
+        cmax, energy = solution.cmax, solution.total_energy_consumption
+        if self.dominated(cmax, energy):
+            return False
+        return self.add(cmax, energy, solution.sum_ci, solution.export_schedule())
+
+    def _remove_most_crowded(self):
+        n = len(self._cmax)
+        cmax_range = (self._cmax[-1] - self._cmax[0]) or 1
+        energy_range = (self._energy[0] - self._energy[-1]) or 1
+        most_crowded = min(range(1, n - 1),
+                           key=lambda i: (self._cmax[i + 1] - self._cmax[i - 1]) / cmax_range
+                           + (self._energy[i - 1] - self._energy[i + 1]) / energy_range)
+        for values in (self._cmax, self._energy, self._sum_ci, self._rows):
+            del values[most_crowded]
+
+    def front(self) -> List[Tuple[int, int]]:
+        '''
+        Returns the points (cmax, energy) by increasing cmax.
+        '''
+        return list(zip(self._cmax, self._energy))
+
+    def best(self, weights: Dict) -> int:
+        '''
+        Returns the index of the point minimizing the weighted objective
+        (same weights as Solution.weights: a missing component weighs 0), -1 if the archive is empty.
+        '''
+        if not self._cmax:
+            return -1
+        w_energy = weights.get('energy', 0)
+        w_cmax = weights.get('cmax', 0)
+        w_sum_ci = weights.get('sum_ci', 0)
+        return min(range(len(self._cmax)),
+                   key=lambda i: w_energy * self._energy[i] + w_cmax * self._cmax[i] + w_sum_ci * self._sum_ci[i])
+
+    def solution(self, index: int, instance: Instance, weights: Optional[Dict]=None) -> Solution:
+        '''
+        Rebuilds the solution of a point on the instance (whose current schedule is replaced),
+        with the given objective weights (see Solution.weights).
+        '''
+        rows = self._rows[index]
+        if rows is None:
+            raise ValueError(f"No schedule stored for the point {index} of the archive.")
+        solution = Solution(instance, weights)
+        solution.load_schedule(*rows)
+        return solution
+
+    def to_csv(self, filepath):
+        '''
+        Writes the front to a csv file, one point per line by increasing cmax.
+        '''
+        with open(filepath, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.COLUMNS)
+            writer.writerows(zip(self._cmax, self._energy, self._sum_ci))
+
+    def __str__(self):
+        return f"ParetoArchive(size={len(self)}, front={self.front()})"
@@ -0,0 +1,234 @@
+'''
+Algorithm portfolio: the algorithms of the registry (see algorithms.py) are
+chosen for an instance from their past results (results.csv written by
+script_compare_algos) on the instances with the closest features.
+'''
+import csv
+import math
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.heuristics import Heuristic
+from src.scheduling.optim.algorithms import algorithm_names, run_algorithm
+
+# Caractéristiques calculées par instance_features, dans cet ordre
+FEATURES = ('nb_operations', 'nb_machines', 'flexibility', 'duration_cv', 'horizon_tightness')
+
+
+def instance_features(instance: Instance) -> Dict[str, float]:
+    '''
+    Returns the features of an instance:
+      - nb_operations, nb_machines
+      - flexibility: mean number of machine options per operation, divided by the number of machines
+      - duration_cv: coefficient of variation (standard deviation / mean) of the processing times
+        over all the machine options
+      - horizon_tightness: minimum total work divided by the time the machines can work
+        before their end_time (after a set up, before a tear down); above 1 the instance
+        cannot be scheduled
+    '''
+    operations = instance.operations
+    nb_machines = instance.nb_machines
+    durations = [duration for op in operations for duration, _ in op.get_machine_options().values()]
+
+    flexibility = 0.0
+    if operations and nb_machines:
+        flexibility = len(durations) / len(operations) / nb_machines
+
+    duration_cv = 0.0
+    if durations:
+        mean = sum(durations) / len(durations)
+        variance = sum((d - mean) ** 2 for d in durations) / len(durations)
+        duration_cv = math.sqrt(variance) / mean if mean else 0.0
+
+    capacity = sum(max(0, m.max_end_time - m.set_up_time - m.tear_down_time) for m in instance.machines)
+    total_work = sum(instance.min_duration(op.operation_id) for op in operations if op.get_machine_options())
+    horizon_tightness = total_work / capacity if capacity else math.inf
+
+    return {'nb_operations': float(len(operations)), 'nb_machines': float(nb_machines),
+            'flexibility': flexibility, 'duration_cv': duration_cv, 'horizon_tightness': horizon_tightness}
+
+
+class PerformanceModel(object):
+    '''
+    k nearest neighbours model of the performance of the algorithms:
+    for a new instance, the optimality gap and the running time of each algorithm
+    are predicted as their mean over the k past instances with the closest features
+    (features standardized over the history).
+    An infeasible result counts as a gap of 1.
+    '''
+
+    def __init__(self, history: Dict[str, Tuple[Dict[str, float], Dict[str, Tuple[float, float]]]], k: int=5):
+        '''
+        Constructor
+        @param history: instance name -> (features, algorithm name -> (gap, time in seconds))
+        @param k: number of neighbours
+        '''
+        self._k = max(1, k)
+        self._names = list(history)
+        self._results = [history[name][1] for name in self._names]
+        rows = [[history[name][0][f] for f in FEATURES] for name in self._names]
+
+        # Centrage et réduction de chaque caractéristique sur l'historique
+        n = len(rows)
+        self._means = [sum(row[c] for row in rows) / n if n else 0.0 for c in range(len(FEATURES))]
+        self._stds = []
+        for c, mean in enumerate(self._means):
+            std = math.sqrt(sum((row[c] - mean) ** 2 for row in rows) / n) if n else 0.0
+            self._stds.append(std or 1.0)
+        self._points = [self._standardize(row) for row in rows]
+
+    @classmethod
+    def from_results(cls, results_file, data_dir, k: int=5) -> 'PerformanceModel':
+        '''
+        Builds the model from a results.csv file written by script_compare_algos
+        (instance, algorithme, valeur_objectif, temps_execution_s, borne_inferieure, ecart_optimalite),
+        the features being computed on the instances of data_dir. temps_execution_s is the
+        time of one run (the mean over the runs of the repeated algorithms).
+        The instances that cannot be read are ignored.
+        '''
+        results: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        with open(results_file, newline='') as f:
+            for row in csv.DictReader(f):
+                gap = float(row['ecart_optimalite'])
+                results.setdefault(row['instance'], {})[row['algorithme']] = (
+                    min(gap, 1.0), float(row['temps_execution_s']))
+
+        history = {}
+        for name, algorithms in results.items():
+            try:
+                instance = Instance.from_file(os.path.join(data_dir, name))
+            except FileNotFoundError:
+                continue
+            history[name] = (instance_features(instance), algorithms)
+        return cls(history, k)
+
+    def __len__(self):
+        return len(self._names)
+
+    def _standardize(self, row: List[float]) -> List[float]:
+        return [(value - mean) / std for value, mean, std in zip(row, self._means, self._stds)]
+
+    def neighbours(self, features: Dict[str, float]) -> List[str]:
+        '''
+        Returns the names of the k past instances closest to the features.
+        '''
+        point = self._standardize([features[f] for f in FEATURES])
+        distances = [(sum((a - b) ** 2 for a, b in zip(point, other)), i) for i, other in enumerate(self._points)]
+        distances.sort()
+        return [self._names[i] for _, i in distances[:self._k]]
+
+    def predict(self, features: Dict[str, float]) -> Dict[str, Tuple[float, float]]:
+        '''
+        Returns algorithm name -> (predicted gap, predicted time in seconds),
+        for the algorithms run on at least one of the neighbours.
+        '''
+        names = set(self.neighbours(features))
+        values: Dict[str, List[Tuple[float, float]]] = {}
+        for name, results in zip(self._names, self._results):
+            if name in names:
+                for algorithm, result in results.items():
+                    values.setdefault(algorithm, []).append(result)
+        return {algorithm: (sum(gap for gap, _ in results) / len(results),
+                            sum(t for _, t in results) / len(results))
+                for algorithm, results in values.items()}
+
+    def rank(self, features: Dict[str, float], algorithms: Optional[List[str]]=None,
+             time_budget: Optional[float]=None) -> List[str]:
+        '''
+        Returns the algorithms by increasing predicted gap (then time).
+        With a time budget, the algorithms predicted to need more time come last.
+        '''
+        predictions = self.predict(features)
+        if algorithms is not None:
+            predictions = {a: p for a, p in predictions.items() if a in algorithms}
+
+        def key(algorithm):
+            gap, t = predictions[algorithm]
+            return (time_budget is not None and t > time_budget, gap, t, algorithm)
+        return sorted(predictions, key=key)
+
+
+class Portfolio(Heuristic):
+    '''
+    Runs the algorithms predicted to be the best for the instance by a PerformanceModel.
+
+    Parameters (in params):
+      - model: the PerformanceModel, or results and data_dir: results.csv file and
+        data folder to build it from (see PerformanceModel.from_results)
+      - k: number of neighbours of the model built from results (5 by default)
+      - algorithms: names of the candidate algorithms (all the registered ones by default)
+      - portfolio_size: number of algorithms run, the best predicted first (1 by default);
+        the time_limit is split between them (the time left by an algorithm goes to the next ones)
+      - time_limit: total time in seconds given to the algorithms (no limit by default)
+      - any other parameter is given to the algorithms (weights, seed, decoding...)
+    Without model or history for the candidates, the candidates are run in the given order.
+    The returned solution is the best one found, with the names of the algorithms run
+    in its algorithms attribute.
+    '''
+
+    # Paramètres propres au portefeuille, qui ne sont pas transmis aux algorithmes
+    OWN_PARAMS = ('model', 'results', 'data_dir', 'k', 'algorithms', 'portfolio_size')
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+
+    def choose(self, instance: Instance, params: Dict=dict()) -> List[str]:
+        '''
+        Returns the candidate algorithms for the instance, the best predicted first.
+        '''
+        algorithms = self._param(params, 'algorithms', None) or algorithm_names()
+        model = self._param(params, 'model', None)
+        if model is None and self._param(params, 'results', None) is not None:
+            model = PerformanceModel.from_results(self._param(params, 'results'),
+                                                  self._param(params, 'data_dir', '.'),
+                                                  self._param(params, 'k', 5))
+        if model is None or len(model) == 0:
+            return list(algorithms)
+
+        size = max(1, self._param(params, 'portfolio_size', 1))
+        time_limit = self._param(params, 'time_limit', None)
+        budget = time_limit / size if time_limit is not None else None
+        ranked = model.rank(instance_features(instance), algorithms, budget)
+        # Les algorithmes sans historique passent après ceux qui en ont
+        return ranked + [a for a in algorithms if a not in ranked]
+
+    def run(self, instance: Instance, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run
+        '''
+        size = max(1, self._param(params, 'portfolio_size', 1))
+        time_limit = self._param(params, 'time_limit', None)
+        chosen = self.choose(instance, params)[:size]
+
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+
+        run_params = dict(self.params, **params)
+        for name in self.OWN_PARAMS:
+            run_params.pop(name, None)
+
+        best_obj, best_rows = math.inf, None
+        for index, algorithm in enumerate(chosen):
+            if deadline is not None:
+                # Le temps laissé par un algorithme plus rapide que prévu revient aux suivants
+                run_params['time_limit'] = max(0.0, deadline - time.perf_counter()) / (len(chosen) - index)
+            sol = run_algorithm(algorithm, instance, run_params)
+            # Les lignes sont extraites tout de suite : l'instance est réutilisée par l'algorithme suivant
+            if best_rows is None or sol.objective < best_obj:
+                best_obj, best_rows = sol.objective, sol.export_schedule()
+
+        solution = self._new_solution(instance, run_params)
+        if best_rows is not None:
+            solution.load_schedule(*best_rows)
+        solution.algorithms = chosen
+        return solution
@@ -0,0 +1,138 @@
+'''
+Incremental re-optimization: repairs the solution of a previous planning cycle
+for a slightly modified instance (operations added, cancelled, or with new
+durations) instead of solving the new instance from scratch.
+'''
+from typing import Dict
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.heuristics import Heuristic
+from src.scheduling.optim.local_search import FirstNeighborLocalSearch
+from src.scheduling.optim.neighborhoods import MyNeighborhood2
+
+
+class IncrementalRepair(Heuristic):
+    '''
+    Repairs the previous schedule on the modified instance, then improves it
+    with a bounded local search.
+
+    The operations are matched by operation id. The previous schedule is loaded as is
+    for the operations still present on the same machine, the cancelled ones being
+    dropped. The new operations, those whose duration changed or whose machine is no
+    longer an option, and the job successors they push back are re-inserted (in the
+    order of their previous start times) in the first idle gap where they fit, or at the
+    end: on their previous machine if they still end before its horizon there, on the
+    machine where they finish the earliest otherwise.
+
+    Parameters (in params):
+      - search: class of the local search run from the repaired schedule (FirstNeighborLocalSearch by default)
+      - neighborhood: neighborhood class of that search (MyNeighborhood2 by default)
+      - max_iterations: maximum number of search steps (50 by default, 0 to only repair)
+      - any other parameter is given to the search (time_limit, cache, instrument...)
+    '''
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        super().__init__(params)
+
+    def run(self, instance: Instance, previous: Solution, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the modified instance from the previous solution.
+
+        @param instance: the modified instance
+        @param previous: the solution of the previous instance (it is not modified)
+        @param params: the parameters for the run
+        '''
+        SearchClass = self._param(params, 'search', FirstNeighborLocalSearch)
+        NeighborClass = self._param(params, 'neighborhood', MyNeighborhood2)
+        max_iterations = self._param(params, 'max_iterations', 50)
+
+        solution = self.repair(instance, previous, params)
+        if max_iterations == 0:
+            return solution
+
+        search_params = dict(self.params, **params)
+        for name in ('search', 'neighborhood'):
+            search_params.pop(name, None)
+        search_params.update(initial_solution=solution, max_iterations=max_iterations)
+        return SearchClass().run(instance, None, NeighborClass, search_params)
+
+    def repair(self, instance: Instance, previous: Solution, params: Dict=dict()) -> Solution:
+        '''
+        Returns the previous schedule repaired on the modified instance, without local search.
+        The weights, decoding and power_cycles parameters set up the new solution
+        (see Heuristic._new_solution).
+        Only the new operations, the operations whose duration or machine changed and the job
+        successors they push back are re-inserted: O(n) to load the schedule, then for the
+        p re-inserted operations O(p²) plus one Machine.find_gap per machine option.
+        '''
+        # Planning précédent par identifiant d'opération : (machine, date de début)
+        previous_rows = {op_id: (machine_id, start) for op_id, machine_id, start in previous.export_schedule()[0]}
+
+        solution = self._new_solution(instance, params)
+        # Les opérations conservées sont rechargées telles quelles (les annulées n'existent plus)
+        kept_rows = [(op.operation_id,) + previous_rows[op.operation_id] for op in instance.operations
+                     if op.operation_id in previous_rows
+                     and previous_rows[op.operation_id][0] in op.get_machine_options()]
+        solution.load_schedule(kept_rows)
+
+        pending = {op.operation_id: op for op in instance.operations if not op.assigned}
+        for op in instance.operations:
+            if op.assigned:
+                previous_duration = previous.inst.get_operation(op.operation_id).processing_time
+                if op.processing_time != previous_duration:
+                    solution.unschedule(op)
+                    pending[op.operation_id] = op
+
+        def priority(op):
+            # Les opérations conservées gardent leur ordre relatif ; une nouvelle opération
+            # passe au plus tôt après son prédécesseur dans le job
+            row = previous_rows.get(op.operation_id)
+            return (row[1] if row is not None else op.min_start_time, op.operation_id)
+
+        while pending:
+            ready = [op for op in pending.values() if all(pred.assigned for pred in op.predecessors)]
+            op = min(ready, key=priority)
+            del pending[op.operation_id]
+
+            row = previous_rows.get(op.operation_id)
+            machine, position = self._insertion(instance, op, row[0] if row is not None else None)
+            if machine is None:
+                raise RuntimeError(f"Aucune machine trouvée pour l'opération {op.operation_id}")
+            solution.reinsert(op, machine, position)
+
+            # Les successeurs qui commencent avant la fin de l'opération sont décalés à leur tour
+            for succ in op.successors:
+                if succ.assigned and succ.start_time < op.end_time:
+                    solution.unschedule(succ)
+                    pending[succ.operation_id] = succ
+
+        return solution
+
+    @staticmethod
+    def _insertion(instance: Instance, operation, previous_machine_id):
+        '''
+        Retourne (machine, position) pour réinsérer l'opération : dans le premier temps mort
+        de la machine où elle tient, sinon à la fin. Sa machine précédente est gardée si
+        l'opération y finit avant l'horizon ; sinon la machine où elle finit le plus tôt,
+        de préférence avant l'horizon.
+        '''
+        ready_time = operation.min_start_time
+        best, best_key = (None, None), None
+        for machine_id, (duration, _) in operation.get_machine_options().items():
+            machine = instance.get_machine(machine_id)
+            position = len(machine.scheduled_operations)
+            start = max(ready_time, machine.ready_time(position))
+            gap = machine.find_gap(ready_time, duration) if machine.scheduled_operations else None
+            if gap is not None:
+                position, start = gap
+            fits = machine.fits_horizon(start, duration)
+            key = (fits, fits and machine_id == previous_machine_id, -(start + duration))
+            if best_key is None or key > best_key:
+                best, best_key = (machine, position), key
+        return best
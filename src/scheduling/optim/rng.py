@@ -0,0 +1,25 @@
+'''
+Random number generators of the heuristics.
+Each run draws from its own random.Random, given in the params ('rng')
+or created from a seed ('seed'), so that runs in parallel are reproducible.
+'''
+import random
+from typing import List
+
+
+def make_rng(seed=None) -> random.Random:
+    '''
+    Returns a new generator for the given seed (int, str...).
+    Without seed, the generator is seeded from the global random module,
+    so that random.seed still makes a sequence of runs reproducible.
+    '''
+    if seed is None:
+        seed = random.getrandbits(64)
+    return random.Random(seed)
+
+
+def spawn(rng: random.Random, n: int) -> List[random.Random]:
+    '''
+    Returns n independent generators derived from rng (e.g. one per worker process).
+    '''
+    return [random.Random(rng.getrandbits(128)) for _ in range(n)]
@@ -8,19 +8,26 @@ from src.scheduling.instance.instance import Instance
 from src.scheduling.optim.constructive import Greedy, NonDeterminist
 from src.scheduling.optim.local_search import FirstNeighborLocalSearch
 from src.scheduling.optim.neighborhoods import MyNeighborhood1, MyNeighborhood2
+from src.scheduling.optim.lower_bounds import LowerBounds
+from src.scheduling.optim.rng import make_rng
 
 # --- Paramètres ---
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
 DATA_ROOT_DIR = PROJECT_ROOT / 'data'
 RESULTS_FILE = PROJECT_ROOT / 'results.csv'
 NON_DETERMINISTIC_RUNS = 10
+# Graine des runs : chaque couple (instance, algorithme) a son propre flux, dérivé de SEED
+SEED = 0
+# Pondérations de l'objectif (voir Solution.weights), par exemple {'energy': 1} pour l'énergie seule
+OBJECTIVE_WEIGHTS = {'energy': 1, 'cmax': 1, 'sum_ci': 0}
 
 
 def main():
 
     with open(RESULTS_FILE, 'w', newline='') as f:
         writer = csv.writer(f)
-        writer.writerow(['instance', 'algorithme', 'valeur_objectif', 'temps_execution_s'])
+        writer.writerow(['instance', 'algorithme', 'valeur_objectif', 'temps_execution_s',
+                         'borne_inferieure', 'ecart_optimalite'])
 
     if not DATA_ROOT_DIR.exists():
         print(f"[ERREUR] Le dossier de données '{DATA_ROOT_DIR}' est introuvable.")
@@ -39,48 +46,59 @@ def main():
             print(f"  [Erreur] Fichiers non trouvés ou invalides dans {instance_dir}. Passage à la suivante.")
             continue
 
+        # Borne inférieure de l'objectif pour mesurer l'écart à l'optimum
+        bounds = LowerBounds(inst)
+
         # Partie algorithme glouton (inchangée)
         print(f"  [1/3] Exécution de l'algorithme glouton...")
         reset_instance(inst)
         start_time = time.perf_counter()
-        greedy_solution = greedy_solver.run(inst)
+        greedy_solution = greedy_solver.run(inst, {'weights': OBJECTIVE_WEIGHTS})
         end_time = time.perf_counter()
 
         greedy_objectif_value = greedy_solution.objective
         greedy_time = end_time - start_time
-        save_result(instance_name, 'glouton', greedy_objectif_value, greedy_time)
+        save_result(instance_name, 'glouton', greedy_objectif_value, greedy_time, bounds)
 
         # Partie recherche locale via échange d'opération ---
         print(f"  [2/3] Exécution de la recherche locale 1 ({NON_DETERMINISTIC_RUNS} runs)...")
         best_objectif_value_nd1 = float('inf')
+        rng = make_rng(f"{SEED}:{instance_name}:local_search_voisinage1")
         total_time_start_nd1 = time.perf_counter()
 
         for _ in range(NON_DETERMINISTIC_RUNS):
             reset_instance(inst)
-            solution_nd1 = local_search_solver.run(inst, NonDeterminist, MyNeighborhood1)
+            solution_nd1 = local_search_solver.run(inst, NonDeterminist, MyNeighborhood1,
+                                                  {'weights': OBJECTIVE_WEIGHTS, 'rng': rng})
             current_objectif_value_nd1 = solution_nd1.objective
             if current_objectif_value_nd1 < best_objectif_value_nd1:
                 best_objectif_value_nd1 = current_objectif_value_nd1
 
         total_time_end_nd1 = time.perf_counter()
         total_time_nd1 = total_time_end_nd1 - total_time_start_nd1
-        save_result(instance_name, 'local_search_voisinage1', best_objectif_value_nd1, total_time_nd1)
+        # Temps d'un run (moyenne), comparable à celui du glouton et lu ainsi par le portefeuille
+        save_result(instance_name, 'local_search_voisinage1', best_objectif_value_nd1,
+                    total_time_nd1 / NON_DETERMINISTIC_RUNS, bounds)
 
         # Partie recherche locale via changement de machine ---
         print(f"  [3/3] Exécution de la recherche locale 2 ({NON_DETERMINISTIC_RUNS} runs)...")
         best_objectif_value_nd2 = float('inf')
+        rng = make_rng(f"{SEED}:{instance_name}:local_search_voisinage2")
         total_time_start_nd2 = time.perf_counter()
 
         for _ in range(NON_DETERMINISTIC_RUNS):
             reset_instance(inst)
-            solution_nd2 = local_search_solver.run(inst, NonDeterminist, MyNeighborhood2)
+            solution_nd2 = local_search_solver.run(inst, NonDeterminist, MyNeighborhood2,
+                                                  {'weights': OBJECTIVE_WEIGHTS, 'rng': rng})
             current_objectif_value_nd2 = solution_nd2.objective
             if current_objectif_value_nd2 < best_objectif_value_nd2:
                 best_objectif_value_nd2 = current_objectif_value_nd2
 
         total_time_end_nd2 = time.perf_counter()
         total_time_nd2 = total_time_end_nd2 - total_time_start_nd2
-        save_result(instance_name, 'local_search_voisinage2', best_objectif_value_nd2, total_time_nd2)
+        # Temps d'un run (moyenne), comparable à celui du glouton et lu ainsi par le portefeuille
+        save_result(instance_name, 'local_search_voisinage2', best_objectif_value_nd2,
+                    total_time_nd2 / NON_DETERMINISTIC_RUNS, bounds)
 
 
 def reset_instance(instance: Instance):
@@ -90,10 +108,11 @@ def reset_instance(instance: Instance):
     for machine in instance.machines:
         machine.reset()
 
-def save_result(instance, algo, makespan, exec_time):
+def save_result(instance, algo, makespan, exec_time, bounds: LowerBounds):
     with open(RESULTS_FILE, 'a', newline='') as f:
         writer = csv.writer(f)
-        writer.writerow([instance, algo, makespan, exec_time])
+        writer.writerow([instance, algo, makespan, exec_time, bounds.objective(OBJECTIVE_WEIGHTS),
+                         bounds.gap(makespan, OBJECTIVE_WEIGHTS)])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,99 @@
+'''
+Convergence trace of a heuristic: one point per incumbent update
+(elapsed time, number of evaluations, objective, cmax, energy).
+'''
+import csv
+import time
+from array import array
+from typing import Dict, List
+
+
+class ConvergenceTrace(object):
+    '''
+    Compact trace stored in preallocated arrays.
+    The capacity is doubled when it is reached.
+    '''
+
+    COLUMNS = ('elapsed_s', 'evaluations', 'objective', 'cmax', 'energy')
+
+    def __init__(self, capacity: int=256):
+        '''
+        Constructor
+        @param capacity: number of points preallocated
+        '''
+        self._capacity = max(1, capacity)
+        self._size = 0
+        self._elapsed = array('d', bytes(8 * self._capacity))
+        self._evaluations = array('q', bytes(8 * self._capacity))
+        # L'objectif vaut l'infini pour une solution non faisable, d'où des flottants
+        self._objective = array('d', bytes(8 * self._capacity))
+        self._cmax = array('q', bytes(8 * self._capacity))
+        self._energy = array('q', bytes(8 * self._capacity))
+        self._start = time.perf_counter()
+
+    def start(self):
+        '''
+        (Re)starts the clock used for the elapsed times.
+        '''
+        self._start = time.perf_counter()
+
+    def record(self, evaluations: int, objective, cmax: int, energy: int):
+        '''
+        Adds a point to the trace.
+        '''
+        if self._size == self._capacity:
+            self._grow()
+
+        i = self._size
+        self._elapsed[i] = time.perf_counter() - self._start
+        self._evaluations[i] = evaluations
+        self._objective[i] = objective
+        self._cmax[i] = cmax
+        self._energy[i] = energy
+        self._size += 1
+
+    def record_solution(self, evaluations: int, solution):
+        '''
+        Adds a point for the given (evaluated) solution.
+        '''
+        self.record(evaluations, solution.objective, solution.cmax, solution.total_energy_consumption)
+
+    def _grow(self):
+        for name in ('_elapsed', '_evaluations', '_objective', '_cmax', '_energy'):
+            values = getattr(self, name)
+            values.extend(array(values.typecode, bytes(values.itemsize * self._capacity)))
+        self._capacity *= 2
+
+    def __len__(self):
+        return self._size
+
+    def columns(self) -> Dict[str, array]:
+        '''
+        Returns the recorded values, one array per column.
+        '''
+        values = (self._elapsed, self._evaluations, self._objective, self._cmax, self._energy)
+        return {name: column[:self._size] for name, column in zip(self.COLUMNS, values)}
+
+    def rows(self) -> List[tuple]:
+        '''
+        Returns the recorded points as tuples.
+        '''
+        return list(zip(*self.columns().values()))
+
+    def to_csv(self, filepath):
+        '''
+        Saves the trace to a csv file, one line per point.
+        '''
+        with open(filepath, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.COLUMNS)
+            writer.writerows(self.rows())
+
+    def to_npz(self, filepath):
+        '''
+        Saves the trace to a numpy .npz file, one array per column.
+        Requires numpy.
+        '''
+        import numpy as np
+
+        np.savez(filepath, **{name: np.asarray(column) for name, column in self.columns().items()})
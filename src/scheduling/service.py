@@ -0,0 +1,257 @@
+'''
+Local solve service.
+
+Requests (instance folder + algorithm name + deadline) are run on a pool of
+worker processes, which stay alive between requests and keep the instances
+they already loaded. Requests for the same instance received within a short
+window are sent to a worker as a single batch, so the instance is read once.
+
+The deadline of a request is turned into a time_limit for the algorithm:
+the searches stop at the deadline and return their incumbent.
+
+Usable in-process (SolveService.solve, from asyncio code) or as a localhost
+server speaking JSON lines:
+    python -m src.scheduling.service --port 8765
+    -> {"id": 1, "instance": "data/jsp1", "algorithm": "local_search_voisinage1", "deadline": 2.0}
+    <- {"id": 1, "status": "ok", "objective": ..., "operations": [...], "machines": [...], ...}
+'''
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.algorithms import run_algorithm
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+
+# Côté processus de travail : instances déjà chargées, les plus récemment utilisées en dernier
+_MAX_CACHED_INSTANCES = 8
+_instances: OrderedDict = OrderedDict()
+
+
+def _load_instance(folderpath: str) -> Instance:
+    instance = _instances.get(folderpath)
+    if instance is None:
+        instance = Instance.from_file(folderpath)
+        _instances[folderpath] = instance
+        if len(_instances) > _MAX_CACHED_INSTANCES:
+            _instances.popitem(last=False)
+    else:
+        _instances.move_to_end(folderpath)
+    return instance
+
+
+def _json_number(value):
+    # Infinity n'existe pas en JSON : une solution non réalisable a un objectif null
+    return None if isinstance(value, float) and math.isinf(value) else value
+
+
+def _solve_batch(folderpath: str, requests: List[Tuple[str, Optional[float], Dict]]) -> List[Dict]:
+    '''
+    Runs the requests (algorithm, absolute deadline or None, params) of a batch
+    on the same instance, by increasing deadline, and returns one result per request.
+    '''
+    try:
+        instance = _load_instance(folderpath)
+    except (OSError, ValueError, KeyError) as error:
+        return [{'status': 'error', 'message': f"cannot load instance {folderpath}: {error}"}
+                for _ in requests]
+
+    results: List[Optional[Dict]] = [None] * len(requests)
+    order = sorted(range(len(requests)),
+                   key=lambda i: math.inf if requests[i][1] is None else requests[i][1])
+    for rank, i in enumerate(order):
+        algorithm, deadline, params = requests[i]
+        params = dict(params or {})
+        start = time.time()
+        if deadline is not None:
+            # Les requêtes étant traitées l'une après l'autre, chacune laisse aux suivantes
+            # une part du temps restant avant leur propre échéance
+            budget = deadline - start
+            for later_rank, j in enumerate(order[rank + 1:], start=2):
+                if requests[j][1] is not None:
+                    budget = min(budget, (requests[j][1] - start) / later_rank)
+            params['time_limit'] = max(0.0, budget)
+
+        try:
+            solution = run_algorithm(algorithm, instance, params)
+        except Exception as error:
+            results[i] = {'status': 'error', 'message': f"{type(error).__name__}: {error}"}
+            continue
+
+        end = time.time()
+        op_rows, machine_rows = solution.export_schedule()
+        results[i] = {
+            'status': 'ok',
+            'instance': instance.name,
+            'algorithm': algorithm,
+            'objective': _json_number(solution.objective),
+            'cmax': solution.cmax,
+            'energy': solution.total_energy_consumption,
+            'feasible': solution.is_feasible,
+            'elapsed_s': end - start,
+            'deadline_met': deadline is None or end <= deadline,
+            'operations': op_rows,
+            'machines': machine_rows,
+        }
+    return results
+
+
+class SolveService(object):
+    '''
+    Asyncio front end of a pool of solver processes.
+    To be used as an async context manager (or closed with close()).
+    '''
+
+    def __init__(self, workers: Optional[int]=None, batch_window: float=0.01, max_batch_size: int=16):
+        '''
+        Constructor
+        @param workers: number of solver processes (number of CPUs if None)
+        @param batch_window: delay (in seconds) during which requests for the same instance are grouped
+        @param max_batch_size: a batch is sent as soon as it holds this many requests
+        '''
+        self._workers = workers or os.cpu_count() or 1
+        self._batch_window = batch_window
+        self._max_batch_size = max(1, max_batch_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Chemin de l'instance -> requêtes en attente d'envoi, avec leur future
+        self._pending: Dict[str, List] = {}
+        self._tasks = set()
+        # Nombre de lots envoyés aux processus (pour le suivi)
+        self.batches: int = 0
+
+    async def solve(self, instance: str, algorithm: str, deadline: Optional[float]=None,
+                    params: Optional[Dict]=None) -> Dict:
+        '''
+        Solves the instance stored in the given folder and returns the result as a dictionary
+        (status, objective, cmax, energy, feasible, elapsed_s, deadline_met, operations, machines),
+        with status 'error' and a message if the request could not be run.
+        @param algorithm: a name from optim.algorithms
+        @param deadline: time (in seconds from now) at which the incumbent is returned
+        @param params: additional parameters for the algorithm
+        '''
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+
+        key = os.path.abspath(instance)
+        absolute_deadline = time.time() + deadline if deadline is not None else None
+        future = loop.create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append(((algorithm, absolute_deadline, params), future))
+        if len(batch) >= self._max_batch_size:
+            self._flush(key)
+        elif len(batch) == 1:
+            loop.call_later(self._batch_window, self._flush, key)
+        return await future
+
+    def _flush(self, key: str):
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        self.batches += 1
+        task = asyncio.ensure_future(self._run_batch(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, key: str, batch: List):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, _solve_batch, key,
+                                                 [request for request, _ in batch])
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        '''
+        Sends the pending requests, waits for the running batches and stops the worker processes.
+        '''
+        for key in list(self._pending):
+            self._flush(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def serve(self, host: str=DEFAULT_HOST, port: int=DEFAULT_PORT) -> asyncio.AbstractServer:
+        '''
+        Starts a JSON lines server: one request object per line, one response object per line
+        (responses are sent as soon as they are ready, with the id of their request).
+        '''
+        return await asyncio.start_server(self._handle_client, host, port)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks = set()
+
+        async def answer(line: bytes):
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get('id')
+                response = await self.solve(request['instance'], request['algorithm'],
+                                            request.get('deadline'), request.get('params'))
+            except Exception as error:
+                response = {'status': 'error', 'message': f"{type(error).__name__}: {error}"}
+            response = dict(response, id=request_id)
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(answer(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+
+async def _serve_forever(host: str, port: int, workers: Optional[int]):
+    async with SolveService(workers) as service:
+        server = await service.serve(host, port)
+        print(f"Solve service listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local solve service (JSON lines over TCP)")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve_forever(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -5,13 +5,31 @@ Object containing the solution to the optimization problem.
 '''
 import csv
 import os
-from typing import List, Optional
-from matplotlib import pyplot as plt
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
 from src.scheduling.instance.instance import Instance
 from src.scheduling.instance.operation import Operation
 
-from matplotlib import colormaps
 from src.scheduling.instance.machine import Machine
+from src.scheduling.instrumentation import timed
+from src.scheduling.feasibility import find_violations, Violation
+from src.scheduling.heads_tails import HeadsTails
+
+# Pondérations par défaut de l'objectif
+DEFAULT_WEIGHTS = {'energy': 1, 'cmax': 1, 'sum_ci': 0}
+
+# Décodages : placement de chaque opération à la fin de la machine, ou dans
+# le premier trou assez long de la machine (ordonnancement actif)
+APPEND = 'append'
+ACTIVE = 'active'
+DECODINGS = (APPEND, ACTIVE)
+
+# Format binaire des solutions (voir Solution.to_binary)
+_BINARY_HEADER = '<4sBII'
+_BINARY_MAGIC = b'JSPS'
+_BINARY_VERSION = 1
 
 
 class Solution(object):
@@ -19,14 +37,30 @@ class Solution(object):
     Solution class
     '''
 
-    def __init__(self, instance: Instance):
+    def __init__(self, instance: Instance, weights: Optional[Dict]=None):
         '''
         Constructor
+        @param weights: weights of the objective components (see the weights property),
+               DEFAULT_WEIGHTS if None
         '''
         self._instance = instance
         self._objective_value: Optional[int] = None
+        self._fingerprint: Optional[int] = None
+        # Composantes (énergie, cmax, sum_ci) de la dernière évaluation, None si à recalculer ou non faisable
+        self._components: Optional[Tuple[int, int, int]] = None
+        # Arcs des jobs précalculés au premier appel de heads_tails
+        self._heads_tails: Optional[HeadsTails] = None
 
-        self._weights = {'energy': 1, 'cmax': 1, 'sum_ci': 0}
+        self._weights = dict(DEFAULT_WEIGHTS)
+        if weights is not None:
+            self.weights = weights
+        self._decoding = APPEND
+        self.power_cycles: bool = False
+
+        # Compteurs d'instrumentation et trace de convergence de la recherche
+        # qui a produit la solution (si activés)
+        self.stats = None
+        self.trace = None
 
 
     @property
@@ -37,6 +71,69 @@ class Solution(object):
         return self._instance
 
 
+    @property
+    def weights(self) -> Dict:
+        '''
+        Returns (a copy of) the weights of the objective components (energy, cmax, sum_ci)
+        '''
+        return dict(self._weights)
+
+    @weights.setter
+    def weights(self, weights: Dict):
+        '''
+        Sets the weights of the objective components; a missing component weighs 0
+        (e.g. {'energy': 1} for an energy-only objective).
+        An evaluated solution is re-weighted in O(1), without being evaluated again.
+        '''
+        unknown = set(weights) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown objective components {sorted(unknown)}, expected {list(DEFAULT_WEIGHTS)}")
+        self._weights = {name: weights.get(name, 0) for name in DEFAULT_WEIGHTS}
+        if self._components is not None:
+            self._objective_value = self._weighted(self._components)
+        elif self._objective_value is not None and self._objective_value != float('inf'):
+            self._objective_value = None
+
+    def reweight(self, weights: Dict) -> int:
+        '''
+        Changes the weights of the objective and returns the new objective value.
+        '''
+        self.weights = weights
+        return self.objective
+
+    @property
+    def components(self) -> Optional[Dict[str, int]]:
+        '''
+        Returns the values of the objective components (energy, cmax, sum_ci)
+        of the evaluated solution, None if it is not feasible.
+        '''
+        if self._objective_value is None:
+            self.evaluate
+        if self._components is None:
+            return None
+        return dict(zip(DEFAULT_WEIGHTS, self._components))
+
+    def _weighted(self, components: Tuple[int, int, int]) -> int:
+        energy, cmax, sum_ci = components
+        value = (self._weights['energy'] * energy +
+                 self._weights['cmax'] * cmax +
+                 self._weights['sum_ci'] * sum_ci)
+        return int(value)
+
+    @property
+    def decoding(self) -> str:
+        '''
+        Returns how schedule places the operations on a machine:
+        APPEND (at the end) or ACTIVE (in the earliest idle gap where it fits, at the end otherwise)
+        '''
+        return self._decoding
+
+    @decoding.setter
+    def decoding(self, decoding: str):
+        if decoding not in DECODINGS:
+            raise ValueError(f"Unknown decoding '{decoding}', expected one of {DECODINGS}")
+        self._decoding = decoding
+
     def reset(self):
         '''
         Resets the solution: everything needs to be replanned
@@ -47,37 +144,68 @@ class Solution(object):
         for machine in self.inst.machines:
             machine.reset()
 
+        self._invalidate()
+
+    def _invalidate(self):
+        '''
+        The schedule changed: the cached objective and fingerprint are no longer valid
+        '''
         self._objective_value = None
+        self._fingerprint = None
+        self._components = None
 
     @property
+    @timed('is_feasible')
     def is_feasible(self) -> bool:
         '''
         Returns True if the solution respects the constraints.
         To call this function, all the operations must be planned.
         '''
-        # Il faut s'assurer que toutes les opérations sont planifiées
-        if any(not op.assigned for op in self.all_operations):
-            return False
+        # Vérification linéaire qui s'arrête à la première contrainte violée
+        return not find_violations(self, first_only=True)
 
-        # Il faut s'assurer que toutes les opérations ont un temps de début valide
-        for op in self.all_operations:
-            if op.start_time < op.min_start_time:
-                return False
+    @property
+    def violations(self) -> List[Violation]:
+        '''
+        Returns all the constraints violated by the solution
+        (unscheduled operations, precedence, overlaps, set up windows, machine horizons).
+        '''
+        return find_violations(self)
 
-        # Il faut respecter les contraintes de précédence entre les opérations
-        for machine in self.inst.machines:
-            ops = sorted(machine.scheduled_operations, key=lambda o: o.start_time)
-            for i in range(len(ops) - 1):
-                if ops[i].end_time > ops[i + 1].start_time:
-                    return False
+    def optimize_power_cycles(self) -> int:
+        '''
+        Stops each machine right after its last operation and turns it off during
+        the idle gaps where a tear down and a set up cost less than staying on
+        (see Machine.power_cycle_idle_gaps). The operations are not moved.
+        Returns the energy saved.
+        '''
+        saved = self._optimize_machines()
+        self._invalidate()
+        return saved
+
+    def _optimize_machines(self) -> int:
+        return sum(machine.power_cycle_idle_gaps() for machine in self.inst.machines)
 
-        return True
+    def heads_tails(self) -> HeadsTails:
+        '''
+        Returns the heads (earliest start times) and tails of the operations
+        for the machine sequencing of the solution, in O(n + m).
+        The job arcs are precomputed at the first call: the same HeadsTails
+        is recomputed and returned by the next calls.
+        '''
+        if self._heads_tails is None:
+            self._heads_tails = HeadsTails(self.inst)
+        return self._heads_tails.compute_solution(self)
 
     @property
+    @timed('evaluate')
     def evaluate(self) -> int:
         '''
         Computes the value of the solution
+        (after optimize_power_cycles if power_cycles is True)
         '''
+        if self.power_cycles:
+            self._optimize_machines()
 
         # Si la solution n'est pas faisable, on retourne un score infini
         if not self.is_feasible:
@@ -97,16 +225,9 @@ class Solution(object):
                 last_op_time = machine.available_time
                 machine.stop(last_op_time)
 
-        # On calcule la valeur de l'objectif (C'est à nous de définir les pondérations?)
-        w_energy = self._weights.get('energy', 1)
-        w_cmax = self._weights.get('cmax', 1)
-        w_sum_ci = self._weights.get('sum_ci', 0)
-
-        value = (w_energy * self.total_energy_consumption +
-                 w_cmax * self.cmax +
-                 w_sum_ci * self.sum_ci)
-
-        self._objective_value = int(value)
+        # On garde les composantes : changer les pondérations ne demande pas de réévaluer
+        self._components = (self.total_energy_consumption, self.cmax, self.sum_ci)
+        self._objective_value = self._weighted(self._components)
         return self._objective_value
 
     @property
@@ -119,6 +240,19 @@ class Solution(object):
 
         return self._objective_value
 
+    @property
+    def fingerprint(self) -> int:
+        '''
+        Returns a hash of the machine assignment and of the order of the operations
+        on each machine: two solutions with the same fingerprint are (with a very
+        high probability) the same schedule.
+        Computed in one pass and kept until the schedule changes.
+        '''
+        if self._fingerprint is None:
+            self._fingerprint = hash(tuple(tuple(op.operation_id for op in m.scheduled_operations)
+                                           for m in self.inst.machines))
+        return self._fingerprint
+
     @property
     def cmax(self) -> int:
         '''
@@ -148,7 +282,58 @@ class Solution(object):
         '''
         return ""
 
-    def to_csv(self):
+    def export_schedule(self) -> Tuple[List[Tuple[int, int, int]], List[Tuple[int, int, int]]]:
+        '''
+        Returns the schedule as two lists of rows:
+          operations: (operation_id, machine_id, start_time) for the assigned operations,
+            in the order of the instance (by operation id)
+          machines: (machine_id, start_time, stop_time) for each start of a machine
+        '''
+        op_rows = [(op.operation_id, op.assigned_to, op.start_time)
+                   for op in self.all_operations if op.assigned]
+        machine_rows = []
+        for m in self.inst.machines:
+            stops = m.stop_times
+            for i, start in enumerate(m.start_times):
+                machine_rows.append((m.machine_id, start, stops[i] if i < len(stops) else -1))
+        return op_rows, machine_rows
+
+    def load_schedule(self, op_rows: Iterable[Tuple[int, int, int]],
+                      machine_rows: Optional[Iterable[Tuple[int, int, int]]]=None):
+        '''
+        Rebuilds the solution in one pass from stored start times
+        (the rows returned by export_schedule), without replanning.
+        If machine_rows is None, each used machine is started just in time for its
+        first operation and stopped at its horizon, as Solution.schedule does.
+        '''
+        self.reset()
+
+        machine_ops: Dict[int, List[Operation]] = {m.machine_id: [] for m in self.inst.machines}
+        for op_id, machine_id, start_time in op_rows:
+            op = self.inst.get_operation(op_id)
+            op.schedule(machine_id, start_time, check_success=False)
+            machine_ops[machine_id].append(op)
+
+        machine_times: Dict[int, List[Tuple[int, int]]] = {m.machine_id: [] for m in self.inst.machines}
+        if machine_rows is not None:
+            for machine_id, start_time, stop_time in machine_rows:
+                machine_times[machine_id].append((start_time, stop_time))
+
+        for machine in self.inst.machines:
+            ops = machine_ops[machine.machine_id]
+            ops.sort(key=lambda o: o.start_time)
+            times = machine_times[machine.machine_id]
+            if machine_rows is None and ops:
+                times.append((max(0, ops[0].start_time - machine.set_up_time), machine.max_end_time))
+            times.sort()
+            machine.load(ops, [start for start, _ in times],
+                         [stop if stop != -1 else machine.max_end_time for _, stop in times])
+
+        for job in self.inst.jobs:
+            job.update_next_operation()
+        self._invalidate()
+
+    def to_csv(self, output_dir="output"):
         '''
         Save the solution to a csv files with the following formats:
         Operation file:
@@ -158,53 +343,78 @@ class Solution(object):
         Machine file:
           One line per pair of (start time, stop time) for the machine
           header: "machine_id, start_time, stop_time"
+        @param output_dir: folder in which the files are written (created if needed)
+        Returns the paths of the operation file and of the machine file.
         '''
-        output_dir = "output"
         os.makedirs(output_dir, exist_ok=True)
+        op_rows, machine_rows = self.export_schedule()
 
         op_filepath = os.path.join(output_dir, f"{self.inst.name}_solution_operations.csv")
         with open(op_filepath, 'w', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(["operation_id", "machine_id", "start_time"])
-            sorted_ops = sorted(self.all_operations, key=lambda o: o.operation_id)
-            for op in sorted_ops:
-                if op.assigned:
-                    writer.writerow([op.operation_id, op.assigned_to, op.start_time])
+            writer.writerows(op_rows)
 
         mach_filepath = os.path.join(output_dir, f"{self.inst.name}_solution_machines.csv")
         with open(mach_filepath, 'w', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(["machine_id", "start_time", "stop_time"])
-            for m in self.inst.machines:
-                starts = m.start_times
-                stops = m.stop_times
-                for i in range(len(starts)):
-                    writer.writerow([m.machine_id, starts[i], stops[i] if i < len(stops) else -1])
+            writer.writerows(machine_rows)
+
+        return op_filepath, mach_filepath
 
     def from_csv(self, inst_folder, operation_file, machine_file):
         '''
-        Reads a solution from the instance folder
+        Reads a solution from the instance folder.
+        The stored start times are loaded as is (see load_schedule). If the machine
+        file does not exist, machines are started just in time for their first operation.
         '''
-        self.reset()
-        op_path = os.path.join(inst_folder, operation_file)
-
-        ops_data = []
-        with open(op_path, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                ops_data.append({
-                    "op_id": int(row['operation_id']),
-                    "machine_id": int(row['machine_id']),
-                    "start_time": int(row['start_time'])
-                })
-
-        ops_data.sort(key=lambda x: x['start_time'])
+        with open(os.path.join(inst_folder, operation_file), 'r') as f:
+            reader = csv.reader(f)
+            next(reader)
+            op_rows = [(int(op_id), int(machine_id), int(start)) for op_id, machine_id, start in reader]
+
+        machine_rows = None
+        mach_path = os.path.join(inst_folder, machine_file)
+        if os.path.exists(mach_path):
+            with open(mach_path, 'r') as f:
+                reader = csv.reader(f)
+                next(reader)
+                machine_rows = [(int(machine_id), int(start), int(stop)) for machine_id, start, stop in reader]
+
+        self.load_schedule(op_rows, machine_rows)
+
+    def to_binary(self, filepath):
+        '''
+        Saves the solution to a compact binary file: a header (magic, version,
+        number of operation rows, number of machine rows) followed by the rows
+        of export_schedule as little-endian 32 bits integers.
+        '''
+        op_rows, machine_rows = self.export_schedule()
+        values = array('i', [value for row in op_rows for value in row])
+        values.extend(value for row in machine_rows for value in row)
+        if sys.byteorder == 'big':
+            values.byteswap()
 
-        for data in ops_data:
-            op = self.inst.get_operation(data['op_id'])
-            machine = self.inst.get_machine(data['machine_id'])
+        with open(filepath, 'wb') as f:
+            f.write(struct.pack(_BINARY_HEADER, _BINARY_MAGIC, _BINARY_VERSION, len(op_rows), len(machine_rows)))
+            values.tofile(f)
 
-            self.schedule(op, machine)
+    def from_binary(self, filepath):
+        '''
+        Reads a solution saved with to_binary.
+        '''
+        with open(filepath, 'rb') as f:
+            magic, version, nb_ops, nb_machines = struct.unpack(_BINARY_HEADER, f.read(struct.calcsize(_BINARY_HEADER)))
+            if magic != _BINARY_MAGIC or version != _BINARY_VERSION:
+                raise ValueError(f"{filepath} is not a solution file (version {_BINARY_VERSION}).")
+            values = array('i')
+            values.fromfile(f, 3 * (nb_ops + nb_machines))
+        if sys.byteorder == 'big':
+            values.byteswap()
+
+        rows = list(zip(values[0::3], values[1::3], values[2::3]))
+        self.load_schedule(rows[:nb_ops], rows[nb_ops:])
 
     @property
     def available_operations(self)-> List[Operation]:
@@ -222,15 +432,34 @@ class Solution(object):
         return self.inst.operations
 
 
+    @timed('schedule')
     def schedule(self, operation: Operation, machine: Machine):
         '''
-        Schedules the operation at the end of the planning of the machine.
+        Schedules the operation at the end of the planning of the machine,
+        or in its earliest idle gap where the operation fits with the ACTIVE decoding.
         Starts the machine if stopped.
         @param operation: an operation that is available for scheduling
         '''
         # On cherche à savoir quand l'opération peut commencer
         pred_ready_time = operation.min_start_time
 
+        if self._decoding == ACTIVE and machine.scheduled_operations:
+            gap = machine.find_gap(pred_ready_time, operation.get_processing_time_on_machine(machine.machine_id))
+            if gap is not None:
+                # L'opération est insérée dans un temps mort de la machine
+                _, gap_start_time = gap
+                self._commit(operation, machine, gap_start_time)
+                return
+
+        self._commit(operation, machine, self._append_start(operation, machine))
+
+    def _append_start(self, operation: Operation, machine: Machine) -> int:
+        '''
+        Date de début de l'opération ajoutée à la fin de la machine.
+        Démarre la machine si elle est arrêtée.
+        '''
+        pred_ready_time = operation.min_start_time
+
         # On cherche à savoir quand la machine est prête en fonction de si elle a ou non une opération planifiée
         if not machine.scheduled_operations:
             # C'est la première opération sur cette machine.
@@ -248,98 +477,100 @@ class Solution(object):
             # Pour que l'opération démarre à `final_start_time`, le setup a dû commencer avant.
             setup_start_time = final_start_time - machine.set_up_time
             machine.start(max(0, setup_start_time))
+        elif (machine.stop_times and machine.stop_times[-1] < machine.max_end_time
+              and final_start_time + operation.get_processing_time_on_machine(machine.machine_id)
+              + machine.tear_down_time > machine.stop_times[-1]):
+            # La machine a été arrêtée juste après sa dernière opération (optimize_power_cycles) :
+            # elle reste en marche jusqu'à l'horizon
+            machine.stop(machine.max_end_time)
 
+        return final_start_time
+
+    def unschedule(self, operation: Operation) -> int:
+        '''
+        Removes a scheduled operation from the schedule: from its machine (its running
+        period is removed if it holds no other operation, see Machine.unschedule) and
+        from the progress of its job. The operations after it are not moved.
+        O(k) for k operations on the machine (see Machine.unschedule).
+        Returns the position the operation had on its machine.
+        '''
+        if not operation.assigned:
+            raise ValueError(f"{operation} is not scheduled.")
+        position = self.inst.get_machine(operation.assigned_to).unschedule(operation)
+        self.inst.get_job(operation.job_id).unschedule_operation(operation)
+        self._invalidate()
+        return position
+
+    def reinsert(self, operation: Operation, machine: Machine, position: Optional[int]=None) -> int:
+        '''
+        Schedules back an operation removed with unschedule.
+        @param position: position in the sequence of the machine. The operation starts as
+          early as possible after its predecessors and the operation before it, and must end
+          before the start of the operation at that position (ValueError otherwise).
+          None to place it as Solution.schedule does (at the end, or in a gap with ACTIVE).
+        With a position, no search is made, but the insertion is O(k) for k operations
+        on the machine (see Machine.reinsert).
+        Returns the start time of the operation.
+        '''
+        if operation.assigned:
+            raise ValueError(f"{operation} is already scheduled.")
+        ops = machine.scheduled_operations
+        if position is None:
+            self.schedule(operation, machine)
+            return operation.start_time
+        if not 0 <= position <= len(ops):
+            raise ValueError(f"Position {position} out of the sequence of machine {machine.machine_id}.")
+        if position == len(ops):
+            self._commit(operation, machine, self._append_start(operation, machine), position)
+            return operation.start_time
+
+        start_time = max(operation.min_start_time, machine.ready_time(position))
+        duration = operation.get_processing_time_on_machine(machine.machine_id)
+        if start_time + duration > ops[position].start_time:
+            raise ValueError(f"{operation} does not fit before {ops[position]} on machine {machine.machine_id}.")
+        self._commit(operation, machine, start_time, position)
+        return start_time
+
+    def _commit(self, operation: Operation, machine: Machine, start_time: int, position: Optional[int]=None):
+        '''
+        Records the operation on the machine at the given start time
+        (at the given position in its sequence if known).
+        '''
         # On planifie l'opération sur la machine
-        operation.schedule(machine.machine_id, final_start_time, check_success=False)
-        machine.add_operation(operation, final_start_time)
+        operation.schedule(machine.machine_id, start_time, check_success=False)
+        if position is None:
+            machine.add_operation(operation, start_time)
+        else:
+            machine.reinsert(operation, position)
+        # La planification a changé, l'objectif en cache n'est plus valide
+        self._invalidate()
 
         # On met à jour les temps de début et de fin de l'opération
         job = self.inst.get_job(operation.job_id)
         if job.next_operation and job.next_operation.operation_id == operation.operation_id:
             job.schedule_operation()
 
-    def gantt(self, colormapname):
+    def gantt(self, colormapname, min_label_width: float=0.0):
         """
         Generate a plot of the planning.
         Standard colormaps can be found at https://matplotlib.org/stable/users/explain/colors/colormaps.html
+        @param min_label_width: bars narrower than this width (in time units) are not labelled
         """
+        # matplotlib n'est importé qu'au moment de tracer : construire et évaluer
+        # des solutions ne paie pas son coût d'import
+        from matplotlib import pyplot as plt
+        from src.scheduling.visualization import draw_gantt
+
         fig, ax = plt.subplots()
-        colormap = colormaps[colormapname]
-        for machine in self.inst.machines:
-            machine_operations = sorted(machine.scheduled_operations, key=lambda op: op.start_time)
-            for operation in machine_operations:
-                operation_start = operation.start_time
-                operation_end = operation.end_time
-                operation_duration = operation_end - operation_start
-                operation_label = f"O{operation.operation_id}_J{operation.job_id}"
-    
-                # Set color based on job ID
-                color_index = operation.job_id + 2
-                if color_index >= colormap.N:
-                    color_index = color_index % colormap.N
-                color = colormap(color_index)
-    
-                ax.broken_barh(
-                    [(operation_start, operation_duration)],
-                    (machine.machine_id - 0.4, 0.8),
-                    facecolors=color,
-                    edgecolor='black'
-                )
-
-                middle_of_operation = operation_start + operation_duration / 2
-                ax.text(
-                    middle_of_operation,
-                    machine.machine_id,
-                    operation_label,
-                    rotation=90,
-                    ha='center',
-                    va='center',
-                    fontsize=8
-                )
-            set_up_time = machine.set_up_time
-            tear_down_time = machine.tear_down_time
-            for (start, stop) in zip(machine.start_times, machine.stop_times):
-                start_label = "set up"
-                stop_label = "tear down"
-                ax.broken_barh(
-                    [(start, set_up_time)],
-                    (machine.machine_id - 0.4, 0.8),
-                    facecolors=colormap(0),
-                    edgecolor='black'
-                )
-                ax.broken_barh(
-                    [(stop, tear_down_time)],
-                    (machine.machine_id - 0.4, 0.8),
-                    facecolors=colormap(1),
-                    edgecolor='black'
-                )
-                ax.text(
-                    start + set_up_time / 2.0,
-                    machine.machine_id,
-                    start_label,
-                    rotation=90,
-                    ha='center',
-                    va='center',
-                    fontsize=8
-                )
-                ax.text(
-                    stop + tear_down_time / 2.0,
-                    machine.machine_id,
-                    stop_label,
-                    rotation=90,
-                    ha='center',
-                    va='center',
-                    fontsize=8
-                )          
-
-        fig = ax.figure
         fig.set_size_inches(12, 6)
-    
-        ax.set_yticks(range(self._instance.nb_machines))
-        ax.set_yticklabels([f'M{machine_id+1}' for machine_id in range(self.inst.nb_machines)])
-        ax.set_xlabel('Time')
-        ax.set_ylabel('Machine')
-        ax.set_title('Gantt Chart')
-        ax.grid(True)
-    
+        draw_gantt(ax, self, colormapname, min_label_width)
+
         return plt
+
+    def save_gantt(self, filepath, colormapname='tab20', min_label_width: float=0.0):
+        """
+        Saves the Gantt chart to a file (png, svg...) without using the pyplot global state.
+        """
+        from src.scheduling.visualization import save_gantt
+
+        save_gantt(self, filepath, colormapname, min_label_width)
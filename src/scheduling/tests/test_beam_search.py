@@ -0,0 +1,40 @@
+'''
+Tests for the beam search constructive heuristic.
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.beam_search import BeamSearch
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestBeamSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+
+    def tearDown(self):
+        pass
+
+    def test_feasible(self):
+        for beam_width in (1, 4):
+            sol = BeamSearch().run(self.inst, {'beam_width': beam_width})
+            self.assertTrue(sol.is_feasible)
+            self.assertEqual(len(sol.available_operations), 0)
+
+    def test_deterministic(self):
+        first = BeamSearch().run(self.inst).export_schedule()
+        second = BeamSearch().run(self.inst).export_schedule()
+        self.assertEqual(first, second)
+
+    def test_better_than_greedy(self):
+        greedy = Greedy().run(self.inst, {'power_cycles': True}).objective
+        sol = BeamSearch().run(self.inst, {'power_cycles': True})
+        self.assertLessEqual(sol.objective, greedy)
+        self.assertTrue(sol.power_cycles)
+
+
+if __name__ == "__main__":
+    unittest.main()
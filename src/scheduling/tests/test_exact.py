@@ -0,0 +1,108 @@
+'''
+Tests for the exact solver backends.
+'''
+import unittest
+import csv
+import math
+import os
+import tempfile
+import time
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.exact import ExactSolver, cp_sat_available
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestExactSolver(unittest.TestCase):
+
+    def setUp(self):
+        self.small = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        self.inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+
+    def tearDown(self):
+        pass
+
+    def test_branch_and_bound_optimal(self):
+        sol = ExactSolver().run(self.small, {'backend': 'branch_and_bound'})
+        self.assertTrue(sol.is_feasible)
+        self.assertTrue(sol.backend_optimal)
+        self.assertEqual(sol.backend_bound, sol.objective)
+        self.assertLessEqual(sol.lower_bound, sol.objective)
+
+    def test_time_limit(self):
+        start = time.perf_counter()
+        sol = ExactSolver().run(self.inst, {'backend': 'branch_and_bound', 'time_limit': 0.5})
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertTrue(sol.is_feasible)
+        self.assertLessEqual(sol.lower_bound, sol.objective)
+        self.assertTrue(0 <= sol.gap < 1)
+
+    def _jsp1_copy(self, tmpdir, **machine_values):
+        '''
+        Copie de jsp1 dans tmpdir, avec les valeurs données pour toutes les machines.
+        '''
+        folder = TEST_FOLDER_DATA + os.path.sep + "jsp1"
+        copy = os.path.join(tmpdir, "jsp1")
+        os.mkdir(copy)
+        with open(os.path.join(folder, "jsp1_op.csv")) as src, \
+             open(os.path.join(copy, "jsp1_op.csv"), 'w') as dst:
+            dst.write(src.read())
+        with open(os.path.join(folder, "jsp1_mach.csv")) as f:
+            rows = list(csv.DictReader(f))
+        with open(os.path.join(copy, "jsp1_mach.csv"), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(dict(row, **machine_values) for row in rows)
+        return Instance.from_file(copy)
+
+    def test_no_feasible_schedule(self):
+        # Machines à arrêter avant t=5 : aucun planning possible
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inst = self._jsp1_copy(tmpdir, end_time='5')
+
+        sol = ExactSolver().run(inst, {'backend': 'branch_and_bound', 'time_limit': 2})
+        self.assertEqual(sol.objective, math.inf)
+        self.assertFalse(sol.optimal)
+        self.assertFalse(sol.backend_optimal)
+        self.assertEqual(sol.backend_bound, math.inf)
+        self.assertEqual(sol.gap, math.inf)
+
+    def test_list_schedule_bound_not_reported_as_optimal(self):
+        # Avec une marche à vide chère, démarrer les machines plus tard que dans les
+        # plannings de liste est meilleur : l'optimum de liste n'est pas l'optimum
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inst = self._jsp1_copy(tmpdir, min_consumption='3')
+
+        sol = ExactSolver().run(inst, {'backend': 'branch_and_bound'})
+        self.assertTrue(sol.backend_optimal)
+        self.assertEqual(sol.backend_bound, sol.objective)
+        self.assertLess(sol.lower_bound, sol.objective)
+        self.assertFalse(sol.optimal)
+        self.assertGreater(sol.gap, 0)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            ExactSolver().run(self.small, {'backend': 'simplex'})
+
+    @unittest.skipUnless(cp_sat_available(), "OR-Tools is not installed")
+    def test_cp_sat(self):
+        sol = ExactSolver().run(self.small, {'backend': 'cp_sat', 'time_limit': 5})
+        self.assertTrue(sol.is_feasible)
+        self.assertTrue(sol.optimal)
+        # Les plannings de liste sont des plannings du modèle CP-SAT
+        self.assertLessEqual(sol.objective, ExactSolver().run(self.small, {'backend': 'branch_and_bound'}).objective)
+
+    @unittest.skipUnless(cp_sat_available(), "OR-Tools is not installed")
+    def test_cp_sat_infeasible(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inst = self._jsp1_copy(tmpdir, end_time='5')
+
+        sol = ExactSolver().run(inst, {'backend': 'cp_sat', 'time_limit': 2})
+        self.assertEqual(sol.objective, math.inf)
+        self.assertEqual(sol.backend_bound, math.inf)
+        self.assertEqual(sol.lower_bound, math.inf)
+        self.assertFalse(sol.optimal)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+'''
+Tests for the GRASP construction and multi-start search.
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import GraspConstruction
+from src.scheduling.optim.grasp import Grasp
+from src.scheduling.optim.neighborhoods import MyNeighborhood2
+from src.scheduling.optim.algorithms import run_algorithm
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestGrasp(unittest.TestCase):
+
+    def setUp(self):
+        self.inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+
+    def tearDown(self):
+        pass
+
+    def test_construction(self):
+        sol = GraspConstruction().run(self.inst, {'seed': 1})
+        self.assertTrue(sol.is_feasible)
+        self.assertEqual(len(sol.available_operations), 0)
+        with self.assertRaises(ValueError):
+            GraspConstruction().run(self.inst, {'alpha': 2})
+
+    def test_construction_randomized(self):
+        schedules = [GraspConstruction().run(self.inst, {'alpha': 1, 'seed': seed}).export_schedule()
+                     for seed in (1, 2)]
+        self.assertNotEqual(schedules[0], schedules[1])
+
+    def test_construction_reproducible_with_seed(self):
+        first = GraspConstruction().run(self.inst, {'alpha': 1, 'seed': 7}).export_schedule()
+        second = GraspConstruction().run(self.inst, {'alpha': 1, 'seed': 7}).export_schedule()
+        self.assertEqual(first, second)
+
+    def test_multi_start(self):
+        constructed = GraspConstruction().run(self.inst, {'seed': 3}).objective
+        sol = Grasp().run(self.inst, MyNeighborhood2, {'iterations': 5, 'seed': 3})
+        self.assertTrue(sol.is_feasible)
+        # Le premier départ reprend la même construction, améliorée par la recherche locale
+        self.assertLessEqual(sol.objective, constructed)
+
+        only_constructions = Grasp().run(self.inst, MyNeighborhood2, {'iterations': 5, 'seed': 3, 'search': None})
+        self.assertTrue(only_constructions.is_feasible)
+
+    def test_trace(self):
+        sol = Grasp().run(self.inst, MyNeighborhood2, {'iterations': 4, 'seed': 3, 'trace': True})
+        objectives = list(sol.trace.columns()['objective'])
+        self.assertGreaterEqual(len(objectives), 1)
+        # Un point par nouvelle meilleure solution, sur l'ensemble des départs
+        self.assertEqual(objectives, sorted(objectives, reverse=True))
+        self.assertEqual(len(set(objectives)), len(objectives))
+        self.assertEqual(objectives[-1], sol.objective)
+        evaluations = list(sol.trace.columns()['evaluations'])
+        self.assertEqual(evaluations, sorted(evaluations))
+
+    def test_registered(self):
+        sol = run_algorithm('grasp_voisinage2', self.inst, {'iterations': 2, 'seed': 0})
+        self.assertTrue(sol.is_feasible)
+
+
+if __name__ == "__main__":
+    unittest.main()
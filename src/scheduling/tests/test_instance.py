@@ -7,6 +7,8 @@ import unittest
 import os
 
 from src.scheduling.instance.instance import Instance
+from src.scheduling.instance.job import Job
+from src.scheduling.instance.operation import Operation
 from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
 
 
@@ -27,7 +29,40 @@ class TestInstances(unittest.TestCase):
         self.assertEqual(len(self.inst.machines), 4, 'wrong nb of machines')
         self.assertEqual(len(self.inst.jobs), 2, 'wrong nb of jobs')
         self.assertEqual(str(self.inst), 'jsp1_M4_J2_O4', 'wrong string representation of the instance')
-        
+
+    def test_lookup_tables(self):
+        # Opération 0 : durées (10, 12, 16, 8) et énergies (15, 12, 11, 15) sur les machines 0 à 3
+        self.assertEqual(self.inst.min_duration(0), 8)
+        self.assertEqual(self.inst.max_duration(0), 16)
+        self.assertEqual(self.inst.fastest_machine(0), 3)
+        self.assertEqual(self.inst.lowest_energy_machine(0), 2)
+        self.assertEqual(self.inst.min_energy(0), 11)
+        # Opération 1 : durée minimale 4, c'est la dernière opération du job 0
+        self.assertEqual(self.inst.tail_work(1), 4)
+        self.assertEqual(self.inst.tail_work(0), 8 + 4)
+        self.assertEqual(self.inst.tail_work(2), 5 + 7)
+
+    def test_lookup_tables_outside_from_file(self):
+        # Opération ajoutée après le chargement : les tables sont reconstruites au premier accès
+        job = Job(2)
+        op = Operation(job_id=2, operation_id=4)
+        op.add_machine_option(machine_id=0, duration=6, energy=9)
+        op.add_machine_option(machine_id=1, duration=3, energy=20)
+        job.add_operation(op)
+        self.inst._jobs.append(job)
+        self.inst._job_map[2] = job
+        self.inst._operations.append(op)
+        self.inst._operation_map[4] = op
+
+        self.assertEqual(self.inst.min_duration(4), 3)
+        self.assertEqual(self.inst.max_duration(4), 6)
+        self.assertEqual(self.inst.min_energy(4), 9)
+        self.assertEqual(self.inst.fastest_machine(4), 1)
+        self.assertEqual(self.inst.lowest_energy_machine(4), 0)
+        self.assertEqual(self.inst.tail_work(4), 3)
+        with self.assertRaises(KeyError):
+            self.inst.min_duration(99)
+
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
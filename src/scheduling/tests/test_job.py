@@ -138,6 +138,24 @@ class TestJob(unittest.TestCase):
         self.assertFalse(self.op1.assigned, "L'opération doit aussi être réinitialisée.")
         self.assertEqual(self.op1.start_time, -1)
 
+    def test_unschedule_operation(self):
+        self.job.add_operation(self.op1)
+        self.job.add_operation(self.op2)
+        self.op1.schedule(1, 0)
+        self.job.schedule_operation()
+        self.op2.schedule(1, 10)
+        self.job.schedule_operation()
+
+        # op1 retirée : elle redevient la prochaine opération, op2 reste planifiée
+        self.op1.reset()
+        self.job.unschedule_operation(self.op1)
+        self.assertEqual(self.job.next_operation, self.op1)
+
+        # Une fois op1 replanifiée, le job est de nouveau complet
+        self.op1.schedule(1, 0)
+        self.job.schedule_operation()
+        self.assertTrue(self.job.planned)
+
 
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
@@ -0,0 +1,195 @@
+'''
+Tests for the local searches.
+'''
+import unittest
+import os
+import random
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy, NonDeterminist
+from src.scheduling.optim.island import IslandModel
+from src.scheduling.optim.local_search import FirstNeighborLocalSearch, BestNeighborLocalSearch
+from src.scheduling.optim.neighborhoods import MyNeighborhood2
+from src.scheduling.optim.trace import ConvergenceTrace
+from src.scheduling.optim.evaluation_cache import EvaluationCache
+from src.scheduling.optim.rng import make_rng, spawn
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA, TEST_FOLDER
+
+
+class _DyingSearch(object):
+    '''
+    Recherche qui tue son processus, pour le modèle en îles.
+    '''
+
+    def run(self, instance, InitClass, NeighborClass, params):
+        os._exit(3)
+
+
+class TestLocalSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+
+    def tearDown(self):
+        pass
+
+    def test_stats_disabled_by_default(self):
+        sol = FirstNeighborLocalSearch().run(self.inst, Greedy, MyNeighborhood2)
+        self.assertIsNone(sol.stats, "Les compteurs ne doivent pas être collectés par défaut.")
+
+    def test_stats_collected(self):
+        sol = BestNeighborLocalSearch().run(self.inst, Greedy, MyNeighborhood2, {'instrument': True})
+        stats = sol.stats
+        self.assertIsNotNone(stats)
+        self.assertGreater(stats.schedules, 0, "La construction initiale planifie des opérations.")
+        self.assertGreater(stats.calls['evaluate'], 0)
+        self.assertGreaterEqual(stats.calls['is_feasible'], stats.calls['evaluate'])
+        self.assertEqual(stats.deepcopies, stats.neighbors_generated)
+        self.assertEqual(stats.neighbors_evaluated, stats.neighbors_generated)
+        self.assertIn('evaluate_time_s', stats.as_dict())
+
+    def test_evaluation_cache(self):
+        cache = EvaluationCache(max_size=1000)
+        objectives = []
+        for _ in range(3):
+            sol = FirstNeighborLocalSearch().run(self.inst, Greedy, MyNeighborhood2,
+                                                 {'cache': cache, 'instrument': True})
+            objectives.append(sol.objective)
+        # Les redémarrages depuis la même solution gloutonne retrouvent des plannings déjà évalués
+        self.assertGreater(cache.hits, 0)
+        # Une consultation par voisin, plus une pour la solution courante à chaque pas
+        stats = sol.stats
+        self.assertEqual(stats.cache_hits + stats.cache_misses,
+                         stats.neighbors_evaluated + stats.improvements + 1)
+        self.assertLessEqual(len(cache), 1000)
+
+    def test_cache_bounded(self):
+        cache = EvaluationCache(max_size=1)
+        sol = Greedy().run(self.inst)
+        value = cache.objective(sol)
+        self.assertEqual(cache.objective(sol), value)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertAlmostEqual(cache.hit_rate, 0.5)
+
+    def test_cache_follows_settings(self):
+        cache = EvaluationCache()
+        sol = Greedy().run(self.inst)
+        cache.objective(sol)
+
+        # Mêmes composantes, autres pondérations : la valeur en cache est re-pondérée
+        sol.weights = {'cmax': 1}
+        self.assertEqual(cache.objective(sol), sol.objective)
+        self.assertEqual(cache.hits, 1)
+
+        # Le même ordre avec d'autres dates de début est un autre planning
+        op_rows, machine_rows = sol.export_schedule()
+        op_id, machine_id, start = op_rows[-1]
+        sol.load_schedule(op_rows[:-1] + [(op_id, machine_id, start + 1)], machine_rows)
+        self.assertEqual(cache.objective(sol), sol.objective)
+
+        # Les arrêts des machines changent l'énergie
+        sol.load_schedule(op_rows, machine_rows)
+        sol.weights = {'energy': 1}
+        sol.power_cycles = True
+        self.assertEqual(cache.objective(sol), sol.objective)
+        self.assertEqual(cache.hits, 1)
+
+    def test_parallel_evaluation(self):
+        results = []
+        for workers in (1, 2):
+            inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+            random.seed(1)
+            sol = BestNeighborLocalSearch().run(inst, Greedy, MyNeighborhood2,
+                                                {'workers': workers, 'instrument': True})
+            results.append((sol.objective, sol.stats.neighbors_evaluated, sol.stats.improvements))
+        self.assertEqual(results[0], results[1], "L'évaluation parallèle doit donner la même recherche.")
+
+    def test_max_iterations_and_initial_solution(self):
+        start = Greedy().run(self.inst)
+        start_obj = start.objective
+        sol = FirstNeighborLocalSearch().run(self.inst, None, MyNeighborhood2,
+                                             {'initial_solution': start, 'max_iterations': 1, 'instrument': True})
+        self.assertLessEqual(sol.stats.improvements, 1)
+        self.assertLessEqual(sol.objective, start_obj)
+
+    def test_time_limit(self):
+        start = Greedy().run(self.inst)
+        start_rows = start.export_schedule()
+        sol = BestNeighborLocalSearch().run(self.inst, None, MyNeighborhood2,
+                                            {'initial_solution': start, 'time_limit': 0.0})
+        self.assertEqual(sol.export_schedule(), start_rows, "Échéance atteinte : la solution de départ est retournée.")
+
+    def test_reproducible_with_seed(self):
+        runs = []
+        for _ in range(2):
+            # Tirages du module random global entre les runs : sans effet sur des runs graines
+            random.random()
+            sol = FirstNeighborLocalSearch().run(self.inst, NonDeterminist, MyNeighborhood2, {'seed': 42})
+            runs.append(sol.export_schedule())
+        self.assertEqual(runs[0], runs[1])
+
+        streams = spawn(make_rng(42), 2)
+        self.assertNotEqual(streams[0].random(), streams[1].random(), "Les flux dérivés sont indépendants.")
+
+    def test_island_model(self):
+        sol = IslandModel().run(self.inst, NonDeterminist, MyNeighborhood2,
+                                {'islands': 2, 'epochs': 3, 'migration_interval': 5, 'seed': 0})
+        self.assertTrue(sol.is_feasible)
+        self.assertEqual(sol.inst, self.inst, "La solution retournée porte sur l'instance donnée.")
+
+        sol = IslandModel().run(self.inst, NonDeterminist, MyNeighborhood2,
+                                {'islands': 2, 'epochs': 2, 'seed': 0, 'search_params': {'power_cycles': True}})
+        self.assertTrue(sol.power_cycles, "Les réglages des recherches sont repris par la solution.")
+
+    def test_trace(self):
+        sol = FirstNeighborLocalSearch().run(self.inst, Greedy, MyNeighborhood2, {'trace': 2})
+        trace = sol.trace
+        self.assertIsNotNone(trace)
+        self.assertGreaterEqual(len(trace), 1, "La solution initiale doit être enregistrée.")
+        columns = trace.columns()
+        self.assertEqual(list(columns), list(ConvergenceTrace.COLUMNS))
+        self.assertEqual(columns['objective'][-1], sol.objective)
+        self.assertEqual(columns['cmax'][-1], sol.cmax)
+        # L'objectif de la solution courante ne fait que décroître
+        objectives = list(columns['objective'])
+        self.assertEqual(objectives, sorted(objectives, reverse=True))
+
+        # Une trace existante (vide, donc de longueur 0) est remplie et attachée à la solution
+        given = ConvergenceTrace()
+        sol = FirstNeighborLocalSearch().run(self.inst, Greedy, MyNeighborhood2, {'trace': given})
+        self.assertIs(sol.trace, given)
+        self.assertGreaterEqual(len(given), 1)
+
+    def test_island_model_trace(self):
+        sol = IslandModel().run(self.inst, NonDeterminist, MyNeighborhood2,
+                                {'islands': 2, 'epochs': 2, 'migration_interval': 5, 'seed': 0, 'trace': True})
+        objectives = list(sol.trace.columns()['objective'])
+        self.assertGreaterEqual(len(objectives), 1)
+        # Un point par nouvelle meilleure solution, toutes îles confondues
+        self.assertEqual(objectives, sorted(objectives, reverse=True))
+        self.assertEqual(objectives[-1], sol.objective)
+
+    def test_island_model_failure(self):
+        # Une île qui échoue fait échouer le modèle au lieu de le bloquer
+        with self.assertRaises(RuntimeError):
+            IslandModel().run(self.inst, None, MyNeighborhood2, {'islands': 2, 'epochs': 2, 'seed': 0})
+        with self.assertRaises(RuntimeError):
+            IslandModel().run(self.inst, NonDeterminist, MyNeighborhood2,
+                              {'islands': 2, 'epochs': 2, 'seed': 0, 'search': _DyingSearch})
+
+    def test_trace_grows_and_exports(self):
+        trace = ConvergenceTrace(capacity=1)
+        for i in range(5):
+            trace.record(i, 100 - i, 10, 90 - i)
+        self.assertEqual(len(trace), 5)
+        filepath = os.path.join(TEST_FOLDER, 'temp_trace.csv')
+        trace.to_csv(filepath)
+        with open(filepath) as f:
+            lines = f.read().splitlines()
+        os.remove(filepath)
+        self.assertEqual(lines[0], ",".join(ConvergenceTrace.COLUMNS))
+        self.assertEqual(len(lines), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+'''
+Tests for the lower bounds.
+'''
+import unittest
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.instance.job import Job
+from src.scheduling.instance.operation import Operation
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.optim.lower_bounds import LowerBounds
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestLowerBounds(unittest.TestCase):
+
+    def setUp(self):
+        self.inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        self.bounds = LowerBounds(self.inst)
+
+    def tearDown(self):
+        pass
+
+    def test_bounds_jsp1(self):
+        # Job 0 : set up minimal 12 (machine 2) + travail restant 8 + 4
+        # Job 1 : set up minimal 12 + travail restant 5 + 7
+        # Machines : 12 + ceil(24 / 4)
+        self.assertEqual(self.bounds.cmax, 24)
+        self.assertEqual(self.bounds.sum_ci, 48)
+        # Énergie minimale des opérations 11 + 5 + 7 + 9, plus un démarrage/arrêt (3 + 2)
+        self.assertEqual(self.bounds.energy, 37)
+        self.assertEqual(self.bounds.objective(), 37 + 24)
+        self.assertEqual(self.bounds.objective({'energy': 0, 'cmax': 0, 'sum_ci': 1}), 48)
+
+    def test_operation_without_machine(self):
+        # Un job dont l'opération n'a aucune machine possible ne change pas les bornes
+        job = Job(2)
+        op = Operation(job_id=2, operation_id=4)
+        job.add_operation(op)
+        self.inst._jobs.append(job)
+        self.inst._job_map[2] = job
+        self.inst._operations.append(op)
+        self.inst._operation_map[4] = op
+
+        bounds = LowerBounds(self.inst)
+        self.assertEqual(bounds.cmax, self.bounds.cmax)
+        self.assertEqual(bounds.energy, self.bounds.energy)
+        self.assertEqual(bounds.sum_ci, self.bounds.sum_ci)
+
+    def test_bounds_below_solutions(self):
+        for name in ("jsp1", "jsp10"):
+            inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + name)
+            bounds = LowerBounds(inst)
+            sol = Greedy().run(inst)
+            self.assertLessEqual(bounds.cmax, sol.cmax)
+            self.assertLessEqual(bounds.sum_ci, sol.sum_ci)
+            self.assertLessEqual(bounds.energy, sol.total_energy_consumption)
+            gap = bounds.gap(sol.objective)
+            self.assertGreaterEqual(gap, 0.0)
+            self.assertLess(gap, 1.0)
+
+    def test_gap(self):
+        bound = self.bounds.objective()
+        self.assertEqual(self.bounds.gap(bound), 0.0)
+        self.assertAlmostEqual(self.bounds.gap(2 * bound), 0.5)
+        self.assertEqual(self.bounds.gap(float('inf')), float('inf'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -117,6 +117,94 @@ class TestMachine(unittest.TestCase):
         except ValueError:
             self.fail("stop() ne devrait pas lever d'exception si appelée au temps de disponibilité.")
 
+    def test_find_gap_and_remove_operation(self):
+        self.machine.start(0)
+        self.op1.schedule(machine_id=1, at_time=10)   # [10, 30)
+        self.machine.add_operation(self.op1, 10)
+        self.op2.schedule(machine_id=1, at_time=60)   # [60, 90)
+        self.machine.add_operation(self.op2, 60)
+
+        # Trou [30, 60) : une opération de 25 prête à t=0 y commence à 30, une de 40 n'y tient pas
+        self.assertEqual(self.machine.find_gap(0, 25), (1, 30))
+        self.assertEqual(self.machine.find_gap(32, 25), (1, 32))
+        self.assertIsNone(self.machine.find_gap(0, 40))
+        self.assertIsNone(self.machine.find_gap(40, 25))
+
+        # Insertion dans le trou : les opérations restent triées
+        op3 = Operation(job_id=2, operation_id=3)
+        op3.add_machine_option(machine_id=1, duration=25, energy=10)
+        op3.schedule(1, 30)
+        self.machine.add_operation(op3, 30)
+        self.assertEqual(self.machine.scheduled_operations, [self.op1, op3, self.op2])
+
+        self.assertEqual(self.machine.remove_operation(op3), 1)
+        self.assertEqual(self.machine.scheduled_operations, [self.op1, self.op2])
+        with self.assertRaises(ValueError):
+            self.machine.remove_operation(op3)
+
+    def test_find_gap_across_periods(self):
+        self.op1.schedule(machine_id=1, at_time=10)   # [10, 30)
+        self.op2.schedule(machine_id=1, at_time=230)  # [230, 260)
+        # Machine arrêtée après op1 et redémarrée à 200 pour op2
+        self.machine.load([self.op1, self.op2], [0, 200], [35, 265])
+
+        # Le trou avant op2 commence à la fin du set up du redémarrage (210), pas à la fin de op1
+        self.assertEqual(self.machine.find_gap(0, 20), (1, 210))
+        self.assertIsNone(self.machine.find_gap(0, 25))
+
+    def test_power_cycle_idle_gaps(self):
+        self.machine.start(0)
+        self.op1.schedule(machine_id=1, at_time=10)   # [10, 30)
+        self.machine.add_operation(self.op1, 10)
+        self.op2.schedule(machine_id=1, at_time=200)  # [200, 230)
+        self.machine.add_operation(self.op2, 200)
+        energy = self.machine.total_energy_consumption
+
+        # Trou de 170 : 170 * 2 > 100 + 50, la machine est arrêtée puis redémarrée ; arrêt final après op2
+        saved = self.machine.power_cycle_idle_gaps()
+        self.assertEqual(self.machine.start_times, [0, 190])
+        self.assertEqual(self.machine.stop_times, [35, 235])
+        self.assertEqual(saved, energy - self.machine.total_energy_consumption)
+        self.assertGreater(saved, 0)
+
+        # Un trou trop court pour un arrêt et un redémarrage est conservé
+        self.machine.remove_operation(self.op2)
+        self.op2.schedule(machine_id=1, at_time=40)   # trou de 10 < 5 + 10
+        self.machine.add_operation(self.op2, 40)
+        self.machine.power_cycle_idle_gaps()
+        self.assertEqual(self.machine.start_times, [0])
+        self.assertEqual(self.machine.stop_times, [75])
+
+    def test_unschedule_and_reinsert(self):
+        self.machine.start(0)
+        self.op1.schedule(machine_id=1, at_time=10)
+        self.machine.add_operation(self.op1, 10)
+        self.op2.schedule(machine_id=1, at_time=30)
+        self.machine.add_operation(self.op2, 30)
+
+        self.assertEqual(self.machine.unschedule(self.op1), 0)
+        self.assertFalse(self.op1.assigned)
+        self.assertEqual(self.machine.scheduled_operations, [self.op2])
+        # op2 occupe encore la période de marche
+        self.assertEqual(self.machine.start_times, [0])
+
+        self.op1.schedule(machine_id=1, at_time=10)
+        with self.assertRaises(ValueError):
+            self.machine.reinsert(self.op1, 1)
+        self.machine.reinsert(self.op1, 0)
+        self.assertEqual(self.machine.scheduled_operations, [self.op1, self.op2])
+
+        # Machine vidée : elle n'a plus de période de marche
+        self.machine.unschedule(self.op1)
+        self.machine.unschedule(self.op2)
+        self.assertFalse(self.machine.start_times)
+        self.assertFalse(self.machine.stop_times)
+
+    def test_fits_horizon(self):
+        # L'opération doit finir, tear down compris, avant l'horizon de 1000
+        self.assertTrue(self.machine.fits_horizon(975, 20))
+        self.assertFalse(self.machine.fits_horizon(976, 20))
+
 if __name__ == "__main__":
     #import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+'''
+Tests for the Pareto archive.
+'''
+import unittest
+import csv
+import os
+import random
+import tempfile
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import NonDeterminist
+from src.scheduling.optim.local_search import FirstNeighborLocalSearch
+from src.scheduling.optim.neighborhoods import MyNeighborhood2
+from src.scheduling.optim.pareto import ParetoArchive
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestParetoArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.archive = ParetoArchive(max_size=4)
+
+    def tearDown(self):
+        pass
+
+    def test_dominance(self):
+        self.assertTrue(self.archive.add(10, 100))
+        self.assertTrue(self.archive.add(20, 50))
+        self.assertFalse(self.archive.add(25, 60), "Dominé par (20, 50).")
+        self.assertFalse(self.archive.add(20, 50), "Déjà dans l'archive.")
+        self.assertTrue(self.archive.add(15, 40))
+        # (15, 40) domine (20, 50)
+        self.assertEqual(self.archive.front(), [(10, 100), (15, 40)])
+        self.assertTrue(self.archive.add(10, 90))
+        self.assertEqual(self.archive.front(), [(10, 90), (15, 40)])
+
+    def test_bounded_by_crowding(self):
+        for cmax, energy in [(0, 100), (10, 60), (11, 59), (30, 30), (100, 0)]:
+            self.archive.add(cmax, energy)
+        self.assertEqual(len(self.archive), 4)
+        front = self.archive.front()
+        self.assertIn((0, 100), front, "Les extrémités du front sont conservées.")
+        self.assertIn((100, 0), front)
+        self.assertTrue((10, 60) not in front or (11, 59) not in front)
+
+    def test_best_and_csv(self):
+        for cmax, energy in [(10, 100), (20, 50), (40, 20)]:
+            self.archive.add(cmax, energy)
+        self.assertEqual(self.archive.best({'cmax': 1, 'energy': 1}), 2)
+        self.assertEqual(self.archive.best({'cmax': 10, 'energy': 1}), 0)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'front.csv')
+            self.archive.to_csv(path)
+            with open(path) as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual([(int(r['cmax']), int(r['energy'])) for r in rows], self.archive.front())
+
+    def test_fed_by_local_search(self):
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+        archive = ParetoArchive()
+        random.seed(0)
+        FirstNeighborLocalSearch().run(inst, NonDeterminist, MyNeighborhood2, {'archive': archive})
+        self.assertGreater(len(archive), 0)
+        front = archive.front()
+        for (c1, e1), (c2, e2) in zip(front, front[1:]):
+            self.assertLess(c1, c2)
+            self.assertGreater(e1, e2)
+
+        # Chaque point se reconstruit en une solution de mêmes critères
+        sol = archive.solution(0, inst)
+        self.assertEqual((sol.cmax, sol.total_energy_consumption), front[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+'''
+Tests for the instance features and the algorithm portfolio.
+'''
+import unittest
+import csv
+import os
+import tempfile
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.portfolio import FEATURES, PerformanceModel, Portfolio, instance_features
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestPortfolio(unittest.TestCase):
+
+    def setUp(self):
+        self.inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+
+    def tearDown(self):
+        pass
+
+    def write_results(self, tmpdir):
+        '''
+        Historique où le glouton est le meilleur sur jsp1 et la recherche locale sur jsp10.
+        '''
+        path = os.path.join(tmpdir, "results.csv")
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['instance', 'algorithme', 'valeur_objectif', 'temps_execution_s',
+                             'borne_inferieure', 'ecart_optimalite'])
+            writer.writerow(['jsp1', 'glouton', 150, 0.001, 100, 0.1])
+            writer.writerow(['jsp1', 'local_search_voisinage2', 'inf', 0.01, 100, 'inf'])
+            writer.writerow(['jsp10', 'glouton', 1400, 0.01, 300, 0.5])
+            writer.writerow(['jsp10', 'local_search_voisinage2', 900, 0.1, 300, 0.3])
+        return path
+
+    def test_features(self):
+        features = instance_features(self.inst)
+        self.assertEqual(tuple(features), FEATURES)
+        self.assertEqual(features['nb_operations'], self.inst.nb_operations)
+        self.assertEqual(features['nb_machines'], self.inst.nb_machines)
+        self.assertTrue(0 < features['flexibility'] <= 1)
+        self.assertGreater(features['duration_cv'], 0)
+        self.assertTrue(0 < features['horizon_tightness'] < 1)
+
+    def test_model(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model = PerformanceModel.from_results(self.write_results(tmpdir), TEST_FOLDER_DATA, k=1)
+        self.assertEqual(len(model), 2)
+        features = instance_features(self.inst)
+        self.assertEqual(model.neighbours(features), ['jsp10'])
+        self.assertEqual(model.rank(features), ['local_search_voisinage2', 'glouton'])
+        # Le budget de temps écarte la recherche locale
+        self.assertEqual(model.rank(features, time_budget=0.05), ['glouton', 'local_search_voisinage2'])
+        small = instance_features(Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1"))
+        self.assertEqual(model.predict(small)['local_search_voisinage2'][0], 1.0)
+
+    def test_run(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            params = {'results': self.write_results(tmpdir), 'data_dir': TEST_FOLDER_DATA, 'k': 1,
+                      'portfolio_size': 2, 'time_limit': 2, 'seed': 0}
+            sol = Portfolio().run(self.inst, params)
+        self.assertEqual(sol.algorithms, ['local_search_voisinage2', 'glouton'])
+        self.assertTrue(sol.is_feasible)
+
+    def test_run_without_history(self):
+        sol = Portfolio().run(self.inst, {'algorithms': ['glouton']})
+        self.assertEqual(sol.algorithms, ['glouton'])
+        self.assertTrue(sol.is_feasible)
+
+
+if __name__ == "__main__":
+    unittest.main()
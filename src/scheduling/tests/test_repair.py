@@ -0,0 +1,85 @@
+'''
+Tests for the incremental repair of a previous solution.
+'''
+import unittest
+import csv
+import os
+import tempfile
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.optim.repair import IncrementalRepair
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestIncrementalRepair(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = TEST_FOLDER_DATA + os.path.sep + "jsp10"
+        self.inst = Instance.from_file(self.folder)
+        self.previous = Greedy().run(self.inst)
+
+    def tearDown(self):
+        pass
+
+    def modified_instance(self, tmpdir):
+        '''
+        Copie de jsp10 où la dernière opération du dernier job est annulée, une opération est
+        ajoutée à la fin du job 0 et les durées de l'opération 1 sont augmentées.
+        '''
+        with open(os.path.join(self.folder, "jsp10_op.csv")) as f:
+            rows = list(csv.DictReader(f))
+        fieldnames = list(rows[0].keys())
+        last_job = max(int(row['job']) for row in rows)
+        cancelled = max(int(row['operation']) for row in rows if int(row['job']) == last_job)
+        new_op = max(int(row['operation']) for row in rows) + 1
+
+        rows = [row for row in rows if int(row['operation']) != cancelled]
+        for row in rows:
+            if row['operation'] == '1':
+                row['processing_time'] = str(int(row['processing_time']) + 5)
+        rows.append({'job': '0', 'operation': str(new_op), 'machine': '0',
+                     'processing_time': '7', 'energy_consumption': '3'})
+
+        folder = os.path.join(tmpdir, "jsp10")
+        os.mkdir(folder)
+        with open(os.path.join(folder, "jsp10_op.csv"), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        with open(os.path.join(self.folder, "jsp10_mach.csv")) as src, \
+             open(os.path.join(folder, "jsp10_mach.csv"), 'w') as dst:
+            dst.write(src.read())
+        return Instance.from_file(folder), cancelled, new_op
+
+    def test_unchanged_instance(self):
+        repaired = IncrementalRepair().repair(Instance.from_file(self.folder), self.previous)
+        self.assertEqual(repaired.objective, self.previous.objective)
+
+    def test_modified_instance(self):
+        previous_machines = {op.operation_id: op.assigned_to for op in self.inst.operations}
+        previous_starts = {op.operation_id: op.start_time for op in self.inst.operations}
+        resized_job = self.inst.get_operation(1).job_id
+        with tempfile.TemporaryDirectory() as tmpdir:
+            inst, cancelled, new_op = self.modified_instance(tmpdir)
+            sol = IncrementalRepair().run(inst, self.previous, {'max_iterations': 0})
+            self.assertTrue(sol.is_feasible)
+            self.assertTrue(inst.get_operation(new_op).assigned)
+            self.assertEqual(inst.get_operation(new_op).assigned_to, 0)
+            self.assertNotIn(cancelled, [op.operation_id for op in inst.operations])
+            for op in inst.operations:
+                if op.operation_id != new_op:
+                    self.assertEqual(op.assigned_to, previous_machines[op.operation_id],
+                                     "Les opérations conservées restent sur leur machine.")
+                if op.operation_id != new_op and op.job_id != resized_job:
+                    self.assertEqual(op.start_time, previous_starts[op.operation_id],
+                                     "Seules les opérations modifiées et leurs successeurs sont réinsérées.")
+            repaired_obj = sol.objective
+
+            improved = IncrementalRepair().run(inst, self.previous, {'max_iterations': 10})
+            self.assertTrue(improved.is_feasible)
+            self.assertLessEqual(improved.objective, repaired_obj)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+'''
+Tests for the solve service.
+'''
+import unittest
+import asyncio
+import json
+import os
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.algorithms import run_algorithm
+from src.scheduling.service import SolveService
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestSolveService(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = TEST_FOLDER_DATA + os.path.sep + "jsp10"
+
+    def tearDown(self):
+        pass
+
+    def test_run_algorithm(self):
+        inst = Instance.from_file(self.folder)
+        self.assertTrue(run_algorithm('glouton', inst).is_feasible)
+        with self.assertRaises(ValueError):
+            run_algorithm('inconnu', inst)
+
+    def test_batched_requests(self):
+        async def scenario():
+            async with SolveService(workers=1, batch_window=0.05) as service:
+                results = await asyncio.gather(
+                    service.solve(self.folder, 'glouton'),
+                    service.solve(self.folder, 'local_search_voisinage2', deadline=5.0),
+                    service.solve(self.folder, 'inconnu'))
+                return results, service.batches
+
+        (greedy, search, unknown), batches = asyncio.run(scenario())
+        self.assertEqual(batches, 1, "Les requêtes sur la même instance sont groupées.")
+        self.assertEqual(greedy['status'], 'ok')
+        self.assertEqual(search['status'], 'ok')
+        self.assertTrue(search['deadline_met'])
+        self.assertEqual(unknown['status'], 'error')
+
+        # Le planning renvoyé se recharge et donne le même objectif
+        sol = Solution(Instance.from_file(self.folder))
+        sol.load_schedule(search['operations'], search['machines'])
+        self.assertEqual(sol.objective, search['objective'])
+
+    def test_server(self):
+        async def scenario():
+            async with SolveService(workers=1) as service:
+                server = await service.serve(port=0)
+                port = server.sockets[0].getsockname()[1]
+                async with server:
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                    request = {'id': 7, 'instance': self.folder, 'algorithm': 'glouton', 'deadline': 5.0}
+                    writer.write(json.dumps(request).encode() + b'\n' + b'pas du json\n')
+                    await writer.drain()
+                    responses = [json.loads(await reader.readline()) for _ in range(2)]
+                    writer.close()
+                    return responses
+
+        responses = {response['id']: response for response in asyncio.run(scenario())}
+        self.assertEqual(responses[7]['status'], 'ok')
+        self.assertEqual(responses[None]['status'], 'error')
+
+
+if __name__ == "__main__":
+    unittest.main()
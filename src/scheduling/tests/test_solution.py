@@ -5,9 +5,16 @@ Test of the Solution class.
 '''
 import unittest
 import os
+import subprocess
+import sys
+import tempfile
 
 from src.scheduling.instance.instance import Instance
 from src.scheduling.solution import Solution
+from src.scheduling.feasibility import Violation
+from src.scheduling import instrumentation
+from src.scheduling.instrumentation import SearchStats
+from src.scheduling.optim.constructive import Greedy
 from src.scheduling.tests.test_utils import TEST_FOLDER_DATA, TEST_FOLDER
 
 
@@ -82,8 +89,46 @@ class TestSolution(unittest.TestCase):
         self.assertEqual(machine.start_times[0], 17)
         self.assertEqual(machine.stop_times[0], 100)
         self.assertTrue(sol.is_feasible, 'Solution should be feasible')
-        plt = sol.gantt('tab20')
-        plt.savefig(TEST_FOLDER + os.path.sep +  'temp.png')
+        # Les diagrammes sont écrits dans un dossier temporaire, pas dans l'arbre des sources
+        with tempfile.TemporaryDirectory() as output_dir:
+            plt = sol.gantt('tab20')
+            plt.savefig(os.path.join(output_dir, 'temp.png'))
+            svg_path = os.path.join(output_dir, 'temp.svg')
+            sol.save_gantt(svg_path, 'tab20', min_label_width=5)
+            self.assertTrue(os.path.getsize(svg_path) > 0, 'Gantt chart should be saved')
+
+    def test_unschedule_reinsert(self):
+        sol = Solution(self.inst1)
+        machine = self.inst1.machines[1]
+        op0, op2 = self.inst1.operations[0], self.inst1.operations[2]
+        sol.schedule(op0, machine)   # [20, 32)
+        sol.schedule(op2, machine)   # [32, 41)
+        objective = sol.objective
+
+        self.assertEqual(sol.unschedule(op0), 0)
+        self.assertFalse(op0.assigned)
+        self.assertIs(self.inst1.get_job(op0.job_id).next_operation, op0)
+        self.assertIn(op0, sol.available_operations)
+
+        # Replacée devant op2 : elle finit avant son début
+        self.assertEqual(sol.reinsert(op0, machine, 0), 20)
+        self.assertEqual(machine.scheduled_operations, [op0, op2])
+        self.assertEqual(sol.objective, objective)
+        with self.assertRaises(ValueError):
+            sol.reinsert(op0, machine, 0)
+
+        # Une opération qui ne tient pas avant la suivante est refusée
+        sol.unschedule(op0)
+        sol.unschedule(op2)
+        sol.reinsert(op2, machine)
+        with self.assertRaises(ValueError):
+            sol.reinsert(op0, machine, 0)
+        self.assertFalse(op0.assigned)
+
+        # Machine vidée puis réutilisée : une seule période de marche
+        sol.unschedule(op2)
+        sol.reinsert(op0, machine)
+        self.assertEqual(len(machine.start_times), 1)
 
     def test_objective(self):
         '''
@@ -168,6 +213,172 @@ class TestSolution(unittest.TestCase):
         m1.add_operation(op2, 0)
         self.assertFalse(self.sol.is_feasible, "Une solution violant la précédence doit être non faisable.")
 
+    def test_violations(self):
+        """
+        Vérifie que les contraintes violées sont détaillées.
+        """
+        while self.sol.available_operations:
+            op = sorted(self.sol.available_operations, key=lambda o: o.operation_id)[0]
+            machine_id = list(op.get_machine_options().keys())[0]
+            self.sol.schedule(op, self.inst1.get_machine(machine_id))
+        self.assertEqual(self.sol.violations, [])
+
+        # Chevauchement et précédence : op1 planifiée en même temps que son prédécesseur op0
+        self.sol.reset()
+        op0 = self.inst1.get_operation(0)
+        op1 = self.inst1.get_operation(1)
+        m1 = self.inst1.get_machine(1)
+        self.sol.schedule(op0, m1)
+        op1.schedule(m1.machine_id, op0.start_time, check_success=False)
+        m1.add_operation(op1, op0.start_time)
+        kinds = {v.kind for v in self.sol.violations}
+        self.assertIn(Violation.UNASSIGNED, kinds, "Les opérations du job 1 ne sont pas planifiées.")
+        self.assertIn(Violation.PRECEDENCE, kinds)
+        self.assertIn(Violation.OVERLAP, kinds)
+
+        # Horizon : opération qui se termine après l'arrêt obligatoire de la machine
+        self.sol.reset()
+        m1.start(0)
+        op1.schedule(m1.machine_id, m1.max_end_time - 1, check_success=False)
+        m1.add_operation(op1, m1.max_end_time - 1)
+        horizon = [v for v in self.sol.violations if v.kind == Violation.HORIZON]
+        self.assertEqual(len(horizon), 1)
+        self.assertEqual(horizon[0].operation_id, 1)
+        self.assertEqual(horizon[0].machine_id, 1)
+
+    def test_csv_round_trip(self):
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+        sol = Greedy().run(inst)
+        objective = sol.objective
+        rows = sol.export_schedule()
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            op_path, mach_path = sol.to_csv(output_dir)
+            sol.reset()
+            sol.from_csv(output_dir, os.path.basename(op_path), os.path.basename(mach_path))
+
+        self.assertEqual(sol.export_schedule(), rows)
+        self.assertTrue(all(job.planned for job in inst.jobs))
+        self.assertEqual(sol.evaluate, objective)
+
+    def test_binary_round_trip(self):
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+        sol = Greedy().run(inst)
+        objective = sol.objective
+        rows = sol.export_schedule()
+
+        with tempfile.TemporaryDirectory() as output_dir:
+            filepath = os.path.join(output_dir, "jsp10.bin")
+            sol.to_binary(filepath)
+            # 3 entiers de 4 octets par ligne, en plus de l'en-tête
+            self.assertEqual(os.path.getsize(filepath), 13 + 12 * (len(rows[0]) + len(rows[1])))
+            sol.reset()
+            sol.from_binary(filepath)
+
+        self.assertEqual(sol.export_schedule(), rows)
+        self.assertEqual(sol.evaluate, objective)
+
+    def test_load_schedule_without_machine_rows(self):
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+        sol = Greedy().run(inst)
+        objective = sol.objective
+        op_rows, machine_rows = sol.export_schedule()
+
+        sol.load_schedule(op_rows)
+
+        self.assertEqual(sol.export_schedule(), (op_rows, machine_rows))
+        self.assertEqual(sol.evaluate, objective)
+
+    def test_fingerprint(self):
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+        sol = Greedy().run(inst)
+        fingerprint = sol.fingerprint
+        op_rows, machine_rows = sol.export_schedule()
+
+        # Le même planning rechargé a la même empreinte
+        sol.load_schedule(op_rows, machine_rows)
+        self.assertEqual(sol.fingerprint, fingerprint)
+
+        # Changer la machine d'une opération change l'empreinte
+        op_id, machine_id, start = op_rows[-1]
+        other_machine = next(m for m in inst.get_operation(op_id).get_machine_options() if m != machine_id)
+        sol.load_schedule(op_rows[:-1] + [(op_id, other_machine, start)])
+        self.assertNotEqual(sol.fingerprint, fingerprint)
+
+    def test_heads_tails(self):
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+        sol = Greedy().run(inst)
+        heads_tails = sol.heads_tails()
+
+        # Le glouton planifie chaque opération au plus tôt : les têtes sont les dates de début
+        for op in inst.operations:
+            self.assertEqual(heads_tails.head(op.operation_id), op.start_time)
+        self.assertEqual(heads_tails.makespan, sol.cmax)
+        last_op = max(inst.operations, key=lambda op: op.end_time)
+        self.assertTrue(heads_tails.is_critical(last_op.operation_id))
+        self.assertEqual(heads_tails.tail(last_op.operation_id), 0)
+
+        # Une séquence contraire à l'ordre d'un job forme un cycle
+        job = inst.jobs[0]
+        first, second = job.operations[0], job.operations[1]
+        with self.assertRaises(ValueError):
+            heads_tails.compute([(0, [second.operation_id, first.operation_id])])
+
+        # Les arcs des jobs sont précalculés une seule fois par solution
+        self.assertIs(sol.heads_tails(), heads_tails)
+        self.assertEqual(heads_tails.makespan, sol.cmax)
+
+    def test_active_decoding(self):
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+        cmax_append = Greedy().run(inst).cmax
+        sol = Greedy().run(inst, {'decoding': 'active'})
+        self.assertEqual(sol.decoding, 'active')
+        self.assertTrue(sol.is_feasible)
+        self.assertLessEqual(sol.cmax, cmax_append, "Combler les temps morts n'allonge pas le planning.")
+        with self.assertRaises(ValueError):
+            sol.decoding = 'unknown'
+
+    def test_power_cycles(self):
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+        sol = Greedy().run(inst)
+        objective = sol.objective
+        energy = sol.total_energy_consumption
+
+        saved = sol.optimize_power_cycles()
+        self.assertGreater(saved, 0)
+        self.assertEqual(sol.total_energy_consumption, energy - saved)
+        self.assertEqual(sol.objective, objective - saved, "Les opérations ne sont pas déplacées.")
+        self.assertTrue(sol.is_feasible)
+
+        # Avec le paramètre, l'arrêt des machines est fait à chaque évaluation
+        self.assertEqual(Greedy().run(inst, {'power_cycles': True}).objective, objective - saved)
+
+    def test_weights(self):
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp10")
+        sol = Greedy().run(inst, {'weights': {'energy': 1}})
+        self.assertEqual(sol.weights, {'energy': 1, 'cmax': 0, 'sum_ci': 0})
+        self.assertEqual(sol.objective, sol.total_energy_consumption)
+
+        # Changer les pondérations d'une solution évaluée ne la réévalue pas
+        components = sol.components
+        stats = SearchStats()
+        with instrumentation.collecting(stats):
+            self.assertEqual(sol.reweight({'cmax': 2, 'sum_ci': 1}), 2 * components['cmax'] + components['sum_ci'])
+        self.assertEqual(stats.calls['evaluate'], 0)
+
+        with self.assertRaises(ValueError):
+            Solution(inst, {'makespan': 1})
+
+    def test_matplotlib_not_imported(self):
+        """
+        Vérifie que matplotlib n'est chargé qu'à la génération d'un Gantt.
+        """
+        code = ("import sys; import src.scheduling.solution; import src.scheduling.optim.local_search; "
+                "print(any(m.startswith('matplotlib') for m in sys.modules))")
+        root = os.path.dirname(os.path.dirname(os.path.dirname(TEST_FOLDER)))
+        output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "False")
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
@@ -0,0 +1,68 @@
+'''
+Gantt chart rendering of a solution.
+The bars of a machine are drawn as a single PolyCollection.
+'''
+from matplotlib import colormaps
+from matplotlib.collections import PolyCollection
+
+
+def draw_gantt(ax, solution, colormapname: str, min_label_width: float=0.0):
+    '''
+    Draws the planning of the solution on the given axes.
+    Standard colormaps can be found at https://matplotlib.org/stable/users/explain/colors/colormaps.html
+    @param min_label_width: bars narrower than this width (in time units) are not labelled
+    '''
+    colormap = colormaps[colormapname]
+    set_up_color = colormap(0)
+    tear_down_color = colormap(1)
+
+    for machine in solution.inst.machines:
+        y_low = machine.machine_id - 0.4
+        y_high = machine.machine_id + 0.4
+        bars = []
+        colors = []
+        labels = []
+
+        def add_bar(start, duration, color, label):
+            end = start + duration
+            bars.append(((start, y_low), (start, y_high), (end, y_high), (end, y_low)))
+            colors.append(color)
+            if duration >= min_label_width:
+                labels.append((start + duration / 2.0, label))
+
+        for operation in machine.scheduled_operations:
+            # Couleur en fonction du job
+            color = colormap((operation.job_id + 2) % colormap.N)
+            add_bar(operation.start_time, operation.processing_time, color,
+                    f"O{operation.operation_id}_J{operation.job_id}")
+
+        for start, stop in zip(machine.start_times, machine.stop_times):
+            add_bar(start, machine.set_up_time, set_up_color, "set up")
+            add_bar(stop, machine.tear_down_time, tear_down_color, "tear down")
+
+        if bars:
+            ax.add_collection(PolyCollection(bars, facecolors=colors, edgecolors='black'))
+        for x, label in labels:
+            ax.text(x, machine.machine_id, label, rotation=90, ha='center', va='center', fontsize=8)
+
+    ax.autoscale_view()
+    ax.set_yticks(range(solution.inst.nb_machines))
+    ax.set_yticklabels([f'M{machine_id+1}' for machine_id in range(solution.inst.nb_machines)])
+    ax.set_xlabel('Time')
+    ax.set_ylabel('Machine')
+    ax.set_title('Gantt Chart')
+    ax.grid(True)
+
+
+def save_gantt(solution, filepath, colormapname: str='tab20', min_label_width: float=0.0, dpi: int=100):
+    '''
+    Renders the Gantt chart of the solution to a file (png, svg, pdf... from the extension)
+    without pyplot: the figure is drawn with the Agg canvas and released afterwards.
+    '''
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(12, 6), dpi=dpi)
+    FigureCanvasAgg(fig)
+    draw_gantt(fig.add_subplot(), solution, colormapname, min_label_width)
+    fig.savefig(filepath)